@@ -0,0 +1,124 @@
+import os
+import sys
+import numpy as np
+import esistream
+
+## CONSTANTS:
+DESER_WIDTH = esistream.esistream_config()["deser_width"] # Raw capture word width (transceiver din, first received bit is bit 0).
+ALIGN_WORD_WIDTH = 64 # Comma search word width, the lane words are packed to 64-bit words.
+COMMA = 0x00FFFF00 # rx_frame_alignment.vhd COMMA generic: frame alignment sequence 0xFF00, 0x00FF frames.
+COMMA_LENGTH = 32
+COMMA_MASK = 2**COMMA_LENGTH - 1
+ALIGN_WINDOW = 2**12 # Words per window, slips are located with this resolution.
+ALIGN_CHUNK = 2**22 # Words per chunk (32 MiB).
+ALIGN_MIN_MATCHES = 4 # Minimum number of commas in a window to estimate the window offset.
+
+## FUNCTIONS:
+def capture_lane(filename, nb_lanes=1, lane=0):
+    """
+    Parameters:
+    * filename : string  : raw capture file, little-endian DESER_WIDTH-bit words, cycle major then lane.
+    * nb_lanes : integer : number of lanes of the capture.
+    * lane     : integer : lane index.
+    Return the read-only memory-mapped 64-bit words of the lane (strided view), the narrower DESER_WIDTH-bit words
+    are packed by ALIGN_WORD_WIDTH bits (copy, first received word in the low bits).
+    """
+    words = np.memmap(filename, dtype='<u%d' %(DESER_WIDTH // 8), mode='r')
+    cycles = words.size // nb_lanes
+    lane_words = words[:cycles * nb_lanes].reshape(cycles, nb_lanes)[:, lane]
+    if DESER_WIDTH == ALIGN_WORD_WIDTH:
+        return lane_words
+    group = ALIGN_WORD_WIDTH // DESER_WIDTH
+    lane_words = lane_words[:cycles // group * group].reshape(-1, group).astype(np.uint64)
+    packed = np.zeros(lane_words.shape[0], dtype=np.uint64)
+    for index in range(group):
+        packed |= lane_words[:, index] << np.uint64(index * DESER_WIDTH)
+    return packed
+
+def comma_count(words, window=ALIGN_WINDOW):
+    """
+    Parameters:
+    * words  : array   : uint64 raw words, the last word only completes the previous one.
+    * window : integer : words per window.
+    Bit-parallel comma search:
+    1- Candidate words: the 16 ones of a comma always hold a full 0xFF byte, a comma starting in word n
+       needs a 0xFF byte in word n or n+1 (zero byte of ~word, (v - 0x01..01) & ~v & 0x80..80).
+    2- For each shift s in 0 to 31, the candidate 64-bit words realigned by s bits,
+       (words[n] >> s) | (words[n+1] << (64-s)), hold the 32-bit candidates starting at bits s and s+32,
+       all the candidates are compared at once for each shift.
+    Return the comma counts, shape (windows, COMMA_LENGTH): comma start bit position modulo 32 of each window.
+    """
+    x = np.ascontiguousarray(words, dtype=np.uint64)
+    size = (x.size - 1) // window * window
+    windows = size // window
+    counts = np.zeros((windows, COMMA_LENGTH), dtype=np.int64)
+    if size == 0:
+        return counts
+    inverted = ~x
+    has_ff = ((inverted - np.uint64(0x0101010101010101)) & x & np.uint64(0x8080808080808080)) != 0
+    index = np.flatnonzero(has_ff[:size] | has_ff[1:size + 1])
+    low, high = x[index], x[index + 1]
+    window_index = index // window
+    realigned = np.empty(index.size, dtype=np.uint64)
+    candidate = np.empty(index.size, dtype=np.uint64)
+    for shift in range(COMMA_LENGTH):
+        if shift:
+            np.right_shift(low, np.uint64(shift), out=realigned)
+            np.bitwise_or(realigned, np.left_shift(high, np.uint64(64 - shift)), out=realigned)
+        else:
+            realigned[:] = low
+        np.bitwise_and(realigned, np.uint64(COMMA_MASK), out=candidate)
+        match = (candidate == COMMA).astype(np.int64)
+        np.right_shift(realigned, np.uint64(32), out=candidate)
+        match += candidate == COMMA
+        counts[:, shift] = np.bincount(window_index, weights=match, minlength=windows)
+    return counts
+
+def frame_alignment(words, window=ALIGN_WINDOW, chunk=ALIGN_CHUNK, min_matches=ALIGN_MIN_MATCHES):
+    """
+    Parameters:
+    * words       : array   : uint64 raw lane words, see capture_lane.
+    * window      : integer : words per window.
+    * chunk       : integer : words per chunk, multiple of window.
+    * min_matches : integer : minimum number of commas in a window to estimate the window offset.
+    Search the comma (frame alignment sequence) at all the bit offsets of the lane bitstream, chunk by chunk.
+    Return {"offset": comma start bit offset modulo 32 (rx_frame_alignment bitslip), "frame_offset": frame boundary
+    bit offset modulo 16, "matches": number of commas at frame_offset, "confidence": ratio of the commas at frame_offset,
+    "slips": [(bit position, previous frame_offset, new frame_offset), ...]}, None when no comma has been found.
+    """
+    chunk -= chunk % window
+    count_list = []
+    for start in range(0, words.size - 1, chunk):
+        count_list.append(comma_count(words[start:min(start + chunk + 1, words.size)], window))
+    counts = np.concatenate(count_list) if count_list else np.zeros((0, COMMA_LENGTH), dtype=np.int64)
+    total = counts.sum(axis=0)
+    if total.sum() == 0:
+        return None
+    offset = int(np.argmax(total))
+    # frame boundary: the comma starts on an even or odd frame, offsets s and s+16 are the same frame boundary
+    frame_counts = counts[:, :16] + counts[:, 16:]
+    frame_total = frame_counts.sum(axis=0)
+    frame_offset = int(np.argmax(frame_total))
+    # per window frame offset and slips
+    valid = np.flatnonzero(frame_counts.max(axis=1) >= min_matches)
+    window_offset = np.argmax(frame_counts[valid], axis=1)
+    change = np.flatnonzero(window_offset[1:] != window_offset[:-1]) + 1
+    slip_list = [(int(valid[idx]) * window * ALIGN_WORD_WIDTH, int(window_offset[idx-1]), int(window_offset[idx])) for idx in change]
+    return {"offset": offset, "frame_offset": frame_offset, "matches": int(frame_total[frame_offset]),
+            "confidence": float(frame_total[frame_offset] / frame_total.sum()), "slips": slip_list}
+
+## MAIN:
+if __name__ == "__main__":
+    # python align.py capture.bin [nb lanes] : frame alignment of each lane of a raw capture.
+    if len(sys.argv) < 2:
+        sys.exit("-- use 'python align.py capture_file [nb_lanes]'")
+    nb_lanes = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    for lane in range(nb_lanes):
+        result = frame_alignment(capture_lane(os.path.abspath(sys.argv[1]), nb_lanes, lane))
+        if result is None:
+            print("-- lane %d: no frame alignment sequence" %(lane))
+        else:
+            print("-- lane %d: offset %d, frame offset %d, %d commas, confidence %.3f, %d slips"
+                  %(lane, result["offset"], result["frame_offset"], result["matches"], result["confidence"], len(result["slips"])))
+            for position, previous, new in result["slips"]:
+                print("--   slip at bit %d: %d -> %d" %(position, previous, new))
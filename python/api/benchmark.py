@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+import os
+import sys
+import json
+import time
+import platform
+import tracemalloc
+import numpy as np
+import multiprocessing
+import esistream
+
+## CONSTANTS:
+# (pattern, rx_clk cycles): synthetic_capture ramp and PRBS (null data) patterns, 256 KiB, 4 MiB and 64 MiB of 8-lane 64b frames.
+BENCHMARK_SIZE_LIST = [(pattern, cycles) for pattern in ["ramp", "prbs"] for cycles in [2**12, 2**16, 2**20]]
+BENCHMARK_REPEAT = 5 # Best of, [runs].
+BENCHMARK_TOLERANCE = 0.25 # Regression threshold: throughput below or peak memory above the baseline by this ratio.
+BENCHMARK_SCALING_SIZE = 2**18 # rx_clk cycles per process.
+BENCHMARK_BASELINE_FILE = "benchmark_baseline.json" # In the working directory, machine specific.
+BENCHMARK_VERIFY_CYCLES = 2**10
+BENCHMARK_KERNEL_LIST = ["lfsr", "scramble", "descramble", "payload", "check"]
+
+## FUNCTIONS:
+def kernel_setup(name, cycles, config, pattern="ramp"):
+    """
+    Return (kernel function, kernel arguments, input bytes, frames) of the benchmark kernel name, cycles of synthetic
+    8-lane frames (pattern "ramp" or "prbs" null data, PRBS from the tx_lfsr polynomial, one PRBS index per lane,
+    10% disparity frames). The lfsr kernel does not depend on the pattern.
+    """
+    lanes, words = config["nb_lanes"], config["words"]
+    frames = cycles * lanes * words
+    index = [1000 * lane for lane in range(lanes)]
+    if name == "lfsr":
+        return esistream.prbs_table, (esistream.LFSR_INIT, frames), frames * 2, frames
+    prbs = esistream.prbs_extend(esistream.prbs_table(), cycles * words)
+    if name == "scramble":
+        data = esistream.ramp_data(cycles, lanes, words) if pattern == "ramp" else np.zeros((cycles, lanes, words), dtype=np.uint16)
+        return esistream.scramble, (data, prbs, np.empty_like(data), index), data.nbytes, frames
+    capture = esistream.synthetic_capture(cycles, lanes, words, pattern, index=index, disparity=0.1)[-cycles:]
+    # PRBS index of the first data frame, after the synchronization sequence
+    data_index = [lane_index + 2 * esistream.sync_prbs_cycles(config["ser_width"]) * words for lane_index in index]
+    if name == "descramble":
+        return esistream.descramble, (capture, prbs, np.empty_like(capture), data_index), capture.nbytes, frames
+    decoded = esistream.descramble(capture, prbs, np.empty_like(capture), data_index)
+    if name == "payload":
+        return esistream.payload, (decoded, np.empty(frames, dtype=np.int16)), decoded.nbytes, frames
+    return esistream.pattern_check, (decoded, config["deser_width"] // 8 if pattern == "ramp" else 0), decoded.nbytes, frames
+
+def measure(name, cycles, config, pattern="ramp", repeat=BENCHMARK_REPEAT):
+    """
+    Return {"cycles", "mbps" [MB/s of input], "fps" [frames/s], "peak" [bytes allocated by the kernel]}, best of repeat runs.
+    """
+    function, args, size, frames = kernel_setup(name, cycles, config, pattern)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"cycles": cycles, "mbps": size / best / 1e6, "fps": frames / best, "peak": peak}
+
+def scaling_worker(name, cycles, config, barrier, result_queue):
+    function, args, size, frames = kernel_setup(name, cycles, config)
+    function(*args)
+    barrier.wait()
+    start = time.perf_counter()
+    function(*args)
+    result_queue.put((size, time.perf_counter() - start))
+
+def scaling(name, config, processes_list, cycles=BENCHMARK_SCALING_SIZE):
+    """
+    Return {processes: {"mbps" (aggregate), "efficiency" (relative to processes x single process throughput)}}:
+    the processes run the kernel on their own input at the same time (barrier), the slowest one sets the duration.
+    """
+    ctx = multiprocessing.get_context()
+    result = {}
+    for processes in processes_list:
+        barrier, result_queue = ctx.Barrier(processes), ctx.Queue()
+        process_list = [ctx.Process(target=scaling_worker, args=(name, cycles, config, barrier, result_queue)) for _ in range(processes)]
+        for process in process_list:
+            process.start()
+        measure_list = [result_queue.get() for _ in process_list]
+        for process in process_list:
+            process.join()
+        mbps = sum(size for size, duration in measure_list) / max(duration for size, duration in measure_list) / 1e6
+        result[processes] = {"mbps": mbps, "efficiency": mbps / (processes * result[1]["mbps"]) if 1 in result else 1.0}
+    return result
+
+def verify(config, cycles=BENCHMARK_VERIFY_CYCLES):
+    """
+    Check the kernels against the bit exact references of the VHDL (esistream_pkg f_lfsr, tx_scrambling,
+    rx_decoding, txrx_frame_checking ramp) on a short synthetic capture.
+    Return {kernel: True when the outputs match}.
+    """
+    lanes, words = config["nb_lanes"], config["words"]
+    index = [1000 * lane for lane in range(lanes)]
+    table = esistream.prbs_table()
+    prbs = esistream.prbs_extend(table, cycles * words)
+    state, lfsr_ok = esistream.LFSR_INIT, True
+    for k in range(cycles * words):
+        lfsr_ok &= int(table[k]) == state & esistream.DATA_MASK
+        state = esistream.f_lfsr(state)
+    data = esistream.ramp_data(cycles, lanes, words)
+    frames = esistream.scramble(data, prbs, np.empty_like(data), index)
+    capture = frames.copy()
+    inverted = np.random.default_rng(0).random(capture.shape) < 0.5
+    capture[inverted] = (1 << esistream.DISPARITY_BIT) | (capture[inverted] ^ esistream.DISPARITY_MASK)
+    decoded = esistream.descramble(capture, prbs, np.empty_like(capture), index)
+    samples = esistream.payload(decoded, np.empty(data.size, dtype=np.int16))
+    scramble_ok, descramble_ok = True, True
+    for cycle in range(0, cycles, 61):
+        for lane in range(lanes):
+            for word in range(words):
+                prbs_frame = int(table[(index[lane] + cycle * words + word) % esistream.LFSR_PERIOD])
+                reference = esistream.tx_scrambling_frame(int(data[cycle, lane, word]), prbs_frame, int(word % 2 == 0))
+                scramble_ok &= int(frames[cycle, lane, word]) == reference
+                descramble_ok &= int(decoded[cycle, lane, word]) == esistream.rx_decoding_frame(int(capture[cycle, lane, word]), prbs_frame)
+    payload_ok = np.array_equal(samples.reshape(cycles, words, lanes).transpose(0, 2, 1) + esistream.SAMPLE_OFFSET, data)
+    be, cb = esistream.pattern_check(decoded, config["deser_width"] // 8)
+    decoded[cycles // 2, 1, 2] ^= 1
+    be_error, cb_error = esistream.pattern_check(decoded, config["deser_width"] // 8)
+    check_ok = not be.any() and not cb.any() and be_error.tolist() == [0, 2] + [0] * (lanes - 2) and not cb_error.any()
+    return {"lfsr": bool(lfsr_ok), "scramble": bool(scramble_ok), "descramble": bool(descramble_ok),
+            "payload": bool(payload_ok), "check": bool(check_ok)}
+
+def benchmark(size_list=BENCHMARK_SIZE_LIST, processes_list=None, kernel_list=BENCHMARK_KERNEL_LIST):
+    """
+    Return the benchmark report: {"platform", "config", "verify", "results": {"kernel/pattern/cycles": measure},
+    "scaling": {kernel: scaling}}.
+    """
+    config = esistream.esistream_config()
+    if processes_list is None:
+        processes_list = sorted(set([1, 2, 4, os.cpu_count() or 1]) & set(range(1, (os.cpu_count() or 1) + 1)))
+    report = {"platform": {"node": platform.node(), "machine": platform.machine(), "cpu_count": os.cpu_count(),
+                           "python": platform.python_version(), "numpy": np.__version__},
+              "config": config, "verify": verify(config), "results": {}, "scaling": {}}
+    for name in kernel_list:
+        for pattern, cycles in size_list:
+            if name == "lfsr" and pattern != "prbs":
+                continue
+            report["results"]["%s/%s/%d" %(name, pattern, cycles)] = measure(name, cycles, config, pattern)
+        report["scaling"][name] = scaling(name, config, processes_list)
+    return report
+
+def regression(report, baseline, tolerance=BENCHMARK_TOLERANCE):
+    """
+    Return the list of regressions of report against baseline: failed verification, throughput below
+    (1 - tolerance) x baseline, peak memory above (1 + tolerance) x baseline.
+    """
+    regression_list = ["%s: output mismatch" %(name) for name, ok in report["verify"].items() if not ok]
+    for key, reference in baseline["results"].items():
+        result = report["results"].get(key)
+        if result is None:
+            continue
+        if result["mbps"] < reference["mbps"] * (1 - tolerance):
+            regression_list.append("%s: %.1f MB/s, baseline %.1f MB/s" %(key, result["mbps"], reference["mbps"]))
+        if result["peak"] > reference["peak"] * (1 + tolerance) + 2**16:
+            regression_list.append("%s: peak memory %d bytes, baseline %d bytes" %(key, result["peak"], reference["peak"]))
+    return regression_list
+
+def report_print(report):
+    print("-- verify: %s" %(", ".join("%s %s" %(name, "ok" if ok else "FAILED") for name, ok in report["verify"].items())))
+    for key, result in report["results"].items():
+        print("-- %-23s %9.1f MB/s %12.4g frames/s peak %10d bytes" %(key, result["mbps"], result["fps"], result["peak"]))
+    for name, result in report["scaling"].items():
+        print("-- %-10s scaling: %s" %(name, ", ".join("%s proc. %.1f MB/s (%.0f%%)" %(processes, value["mbps"], 100 * value["efficiency"])
+                                                      for processes, value in result.items())))
+
+## MAIN:
+if __name__ == "__main__":
+    # python benchmark.py [run|save|check] [baseline file] : run the benchmark, save it as baseline or check it against the baseline.
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+    filename = os.path.abspath(sys.argv[2] if len(sys.argv) > 2 else BENCHMARK_BASELINE_FILE)
+    if command not in ["run", "save", "check"]:
+        sys.exit("-- use 'python benchmark.py [run|save|check] [baseline_file]'")
+    if command == "check" and not os.path.exists(filename):
+        sys.exit("-- no baseline %s, save one first with 'python benchmark.py save [baseline_file]'" %(filename))
+    report = benchmark()
+    report_print(report)
+    if command == "save":
+        with open(filename, "w") as f:
+            json.dump(report, f, indent=1)
+        print("-- baseline saved: %s" %(filename))
+    elif command == "check":
+        with open(filename) as f:
+            baseline = json.load(f)
+        regression_list = regression(report, baseline)
+        for line in regression_list:
+            print("-- regression: " + line)
+        if regression_list:
+            sys.exit(1)
+        print("-- no regression against %s" %(filename))
@@ -0,0 +1,129 @@
+import math
+
+## CONSTANTS:
+BER_BISECTION_ITERATIONS = 100
+
+## FUNCTIONS:
+def binomial_cdf(k, n, p):
+    """
+    Return P(X <= k) for X ~ Binomial(n, p).
+    """
+    if k < 0:
+        return 0.0
+    if k >= n or p <= 0.0:
+        return 1.0
+    if p >= 1.0:
+        return 0.0
+    log_p = math.log(p)
+    log_q = math.log1p(-p)
+    cdf = 0.0
+    for i in range(k+1):
+        cdf += math.exp(math.lgamma(n+1) - math.lgamma(i+1) - math.lgamma(n-i+1) + i*log_p + (n-i)*log_q)
+    return min(cdf, 1.0)
+
+def binomial_upper_bound(k, n, alpha):
+    """
+    One-sided Clopper-Pearson upper bound of the binomial probability: P(X <= k; n, p_upper) = alpha.
+    """
+    if k >= n:
+        return 1.0
+    if k == 0:
+        return 1.0 - alpha**(1.0/n)
+    lo, hi = 0.0, 1.0
+    for _ in range(BER_BISECTION_ITERATIONS):
+        mid = (lo + hi) / 2
+        if binomial_cdf(k, n, mid) > alpha:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+def binomial_lower_bound(k, n, alpha):
+    """
+    One-sided Clopper-Pearson lower bound of the binomial probability: P(X >= k; n, p_lower) = alpha.
+    """
+    if k <= 0:
+        return 0.0
+    if k >= n:
+        return alpha**(1.0/n)
+    return 1.0 - binomial_upper_bound(n-k, n, alpha)
+
+def ber_bounds(bits, intervals, error_intervals, alpha):
+    """
+    Parameters:
+    * bits            : float   : number of checked bits.
+    * intervals       : integer : number of polling intervals.
+    * error_intervals : integer : number of polling intervals with at least one error (sticky error status).
+    * alpha           : float   : one-sided risk of each bound.
+    Return the one-sided (lower, upper) bit error rate bounds.
+    The error status is a sticky bit: the number of errors of an interval is unknown, only the probability q of
+    an error interval is estimated (Clopper-Pearson). With Poisson distributed errors, q = 1-exp(-ber*b) and
+    ber = -ln(1-q)/b, b the mean number of bits per interval. Without error, the upper bound is the usual
+    -ln(alpha)/bits.
+    """
+    if intervals == 0 or bits <= 0:
+        return 0.0, float("inf")
+    b = bits / intervals
+    q_lower = binomial_lower_bound(error_intervals, intervals, alpha)
+    q_upper = binomial_upper_bound(error_intervals, intervals, alpha)
+    lower = -math.log1p(-q_lower) / b
+    upper = -math.log1p(-q_upper) / b if q_upper < 1.0 else float("inf")
+    return lower, upper
+
+def ber_summary(lane, result):
+    """
+    Return the one line summary of a lane result (ber_test.result).
+    """
+    return "lane %d: %-9s BER [%.3g, %.3g] (%.3g bits, %d/%d error intervals)" %(
+        lane, result["decision"], result["ber"][0], result["ber"][1], result["bits"], result["error_intervals"], result["intervals"])
+
+## CLASS:
+class ber_test:
+    """
+    Sequential bit error rate test of a single lane.
+    Decision looks are made when the number of checked bits doubles, the j-th look (j = 0, 1, ...) uses the
+    risk alpha/2**(j+1) (alpha spending) so that the overall risk of a wrong decision stays below alpha = 1-confidence
+    whatever the number of looks:
+    -       "pass" when the upper bound is below the target BER,
+    -       "fail" when the lower bound is above the target BER,
+    -       "undecided" until then.
+    The first look is made when a "pass" decision becomes possible, without error.
+    """
+    def __init__(self, target, confidence):
+        self.target = target
+        self.alpha = 1.0 - confidence
+        self.bits = 0.0
+        self.intervals = 0
+        self.error_intervals = 0
+        self.look = 0
+        self.look_bits = -math.log(self.alpha/2) / target
+        self.decision = "undecided"
+
+    def update(self, bits, error):
+        """
+        Parameters:
+        * bits  : float   : number of bits checked during the interval.
+        * error : boolean : error status of the interval.
+        Return the decision.
+        """
+        self.bits += bits
+        self.intervals += 1
+        self.error_intervals += bool(error)
+        if self.decision == "undecided" and self.bits >= self.look_bits:
+            alpha_look = self.alpha / 2**(self.look+1)
+            lower, upper = ber_bounds(self.bits, self.intervals, self.error_intervals, alpha_look)
+            if upper < self.target:
+                self.decision = "pass"
+            elif lower > self.target:
+                self.decision = "fail"
+            self.look += 1
+            self.look_bits = 2 * self.bits
+        return self.decision
+
+    def result(self):
+        """
+        Return the lane result dictionary, "ber" is the two-sided confidence interval [lower, upper].
+        """
+        lower, upper = ber_bounds(self.bits, self.intervals, self.error_intervals, self.alpha/2)
+        return {"decision": self.decision, "bits": self.bits, "intervals": self.intervals,
+                "error_intervals": self.error_intervals, "ber": [lower, upper]}
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+import os
+import sys
+import time
+from ev12aq600_daemon import connect
+from ber import ber_summary
+
+# python ber_measurement.py [target BER] [confidence] [timeout] : per lane BER measurement, ramp pattern.
+target = float(sys.argv[1]) if len(sys.argv) > 1 else 1e-12
+confidence = float(sys.argv[2]) if len(sys.argv) > 2 else 0.95
+timeout = float(sys.argv[3]) if len(sys.argv) > 3 else 3600.0
+
+app=connect()
+app.start_serial()
+app.deactivate_ev12aq600_rstn()
+app.sync_mode_training()
+app.sync_pulse()
+result_list = app.ber_measurement("ramp", target, confidence, timeout=timeout)
+if result_list is None:
+    print("-- BER measurement: link not valid, synchronize the link first")
+else:
+    for lane, result in enumerate(result_list):
+        print("-- " + ber_summary(lane, result))
+app.stop_serial()
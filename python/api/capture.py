@@ -0,0 +1,64 @@
+import os
+import sys
+import numpy as np
+import esistream
+
+## CONSTANTS:
+ESISTREAM_CONFIG = esistream.esistream_config() # NB_LANES and DESER_WIDTH from the HDL.
+NB_LANES = ESISTREAM_CONFIG["nb_lanes"]
+DESER_WIDTH = ESISTREAM_CONFIG["deser_width"]
+WORDS_PER_FRAME = ESISTREAM_CONFIG["words"] # 16-bit ESIstream frames per lane per rx_clk cycle.
+CHUNK_CYCLES = 2**16 # rx_clk cycles per chunk: 8 lanes x 4 frames x 2 bytes x 64 Ki = 4 MiB.
+CAPTURE_DTYPE = np.dtype('<u2')
+SAMPLE_DTYPE = np.dtype('<i2')
+
+## FUNCTIONS:
+def capture_open(filename):
+    """
+    Parameters:
+    * filename : string : capture file, little-endian 16-bit ESIstream frames, rx_clk cycle major,
+                          then lane, then frame (frame_out(lane)(frame) order, NB_LANES*WORDS_PER_FRAME frames per cycle).
+    Return the read-only memory-mapped capture, shape (cycles, NB_LANES, WORDS_PER_FRAME).
+    """
+    frames = np.memmap(filename, dtype=CAPTURE_DTYPE, mode='r')
+    cycles = frames.size // (NB_LANES * WORDS_PER_FRAME)
+    return frames[:cycles * NB_LANES * WORDS_PER_FRAME].reshape(cycles, NB_LANES, WORDS_PER_FRAME)
+
+def sample_open(filename, cycles):
+    """
+    Return a memory-mapped int16 sample file of cycles rx_clk cycles, shape (cycles*WORDS_PER_FRAME*NB_LANES,).
+    """
+    return np.memmap(filename, dtype=SAMPLE_DTYPE, mode='w+', shape=(cycles * WORDS_PER_FRAME * NB_LANES,))
+
+def reconstruct(frames, out=None, lane_order=None, disparity=False, signed=True, chunk_cycles=CHUNK_CYCLES):
+    """
+    Parameters:
+    * frames       : array   : uint16 ESIstream frames (cycles, NB_LANES, WORDS_PER_FRAME), see capture_open.
+    * out          : array   : preallocated or memory-mapped int16 output (see sample_open), allocated when None.
+    * chunk_cycles : integer : rx_clk cycles per chunk, a chunk of the input and output should fit in the CPU caches.
+    See esistream.payload for the other parameters.
+    Rebuild the time ordered sample stream, chunk by chunk (esistream.payload), captures of any length stream
+    through a memory map.
+    Return out.
+    """
+    cycles, lanes, words = frames.shape
+    samples_per_cycle = words * lanes
+    if out is None:
+        out = np.empty(cycles * samples_per_cycle, dtype=SAMPLE_DTYPE)
+    lane_order = None if lane_order is None else list(lane_order)
+    scratch = np.empty((min(chunk_cycles, cycles), words), dtype=SAMPLE_DTYPE) if disparity else None
+    for start in range(0, cycles, chunk_cycles):
+        stop = min(start + chunk_cycles, cycles)
+        esistream.payload(frames[start:stop], out[start*samples_per_cycle:stop*samples_per_cycle], lane_order, disparity, signed, scratch)
+    return out
+
+## MAIN:
+if __name__ == "__main__":
+    # python capture.py capture.bin samples.bin [unsigned] : rebuild the int16 time ordered sample stream.
+    if len(sys.argv) < 3:
+        sys.exit("-- use 'python capture.py capture_file sample_file [unsigned]'")
+    frames = capture_open(os.path.abspath(sys.argv[1]))
+    out = sample_open(os.path.abspath(sys.argv[2]), frames.shape[0])
+    reconstruct(frames, out, signed=not (len(sys.argv) > 3 and sys.argv[3] == "unsigned"))
+    out.flush()
+    print("-- %d samples written to %s" %(out.size, sys.argv[2]))
@@ -0,0 +1,13 @@
+import pytest
+
+@pytest.fixture
+def app():
+    """
+    ev12aq600 driver connected to the loopback device (transport.loopback_transport), journal disabled.
+    """
+    from ev12aq600 import ev12aq600
+    app = ev12aq600()
+    app.start_serial("loop://", journal_file="")
+    app.deactivate_ev12aq600_rstn()
+    yield app
+    app.stop_serial()
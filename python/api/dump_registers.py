@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+import os
+import sys
+import time
+from ev12aq600_daemon import connect
+from ev12aq600 import EV12AQ600_DUMP_ADDRESS_LIST, register_dump_lines
+
+app=connect()
+app.start_serial()
+
+app.deactivate_ev12aq600_rstn()
+app.spi_ss_ev12aq600()
+
+if len(sys.argv) > 2:
+    # python dump_registers.py first_address last_address (hexadecimal)
+    addr_list = list(range(int(sys.argv[1], 16), int(sys.argv[2], 16)+1))
+else:
+    addr_list = EV12AQ600_DUMP_ADDRESS_LIST
+
+rcv = app.ev12aq600_dump_registers(addr_list)
+print("-- EV12AQ600 registers dump:")
+for line in register_dump_lines(rcv):
+    print("-- " + line)
+
+app.stop_serial()
@@ -0,0 +1,304 @@
+import os
+import re
+import numpy as np
+
+## CONSTANTS:
+HDL_ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..")
+ESISTREAM_PKG_FILE = os.path.join(HDL_ROOT, "src_pkg", "esistream_pkg_64b.vhd")
+TOP_LEVEL_FILE = os.path.join(HDL_ROOT, "vivado_rx_ev12aq60x", "src_top", "rx_esistream_top.vhd")
+SER_WIDTH = 64 # esistream_pkg_64b.vhd
+DESER_WIDTH = 64
+NB_LANES = 8 # rx_esistream_top.vhd
+FRAME_WIDTH = 16
+LFSR_LENGTH = 17 # Polynomial X17+X3+1, Fibonacci LFSR, 14-bit steps (esistream_pkg f_lfsr).
+LFSR_TAP = 3
+LFSR_STEP = 14 # Data bits per frame.
+LFSR_INIT = 2**LFSR_LENGTH - 1 # tx_lfsr init_value default.
+LFSR_PERIOD = 2**LFSR_LENGTH - 1 # Maximum length sequence, 14 and 2**17-1 coprime: PRBS word period.
+DATA_MASK = 2**LFSR_STEP - 1
+DISPARITY_BIT = 15
+DISPARITY_MASK = 2**DISPARITY_BIT - 1 # bits 14..0 inverted when the disparity bit is high (rx_decoding.vhd).
+CLOCK_BIT = 14
+SAMPLE_WIDTH = 12
+SAMPLE_MASK = 2**SAMPLE_WIDTH - 1
+SAMPLE_OFFSET = 2**(SAMPLE_WIDTH-1)
+COMMA = 0xFF0000FF # tx_scrambling.vhd COMMA generic.
+COMMA_FRAME_LIST = [0x00FF, 0xFF00] # Frame alignment sequence frames (COMMA x"FF0000FF" or x"00FFFF00").
+DESCRAMBLE_BLOCK_CYCLES = 2**12 # descramble block [rx_clk cycles]: 256 KiB scratch buffer for 8 lanes of 64b frames.
+PATTERN_LIST = ["ramp", "pattern0"] # txrx_frame_checking.vhd d_ctrl: ramp step DESER_WIDTH/8 per rx_clk cycle, else constant.
+
+## FUNCTIONS:
+def esistream_config(pkg_file=ESISTREAM_PKG_FILE, top_level_file=TOP_LEVEL_FILE):
+    """
+    Return {"ser_width", "deser_width", "nb_lanes", "words" (frames per lane per rx_clk cycle)} read from the
+    ESIstream package and the top level NB_LANES generic, the 64b defaults when the HDL files are not available.
+    """
+    config = {"ser_width": SER_WIDTH, "deser_width": DESER_WIDTH, "nb_lanes": NB_LANES}
+    for filename, pattern_list in [(pkg_file, [("ser_width", "SER_WIDTH"), ("deser_width", "DESER_WIDTH")]),
+                                   (top_level_file, [("nb_lanes", "NB_LANES")])]:
+        if not os.path.exists(filename):
+            continue
+        with open(filename) as f:
+            text = re.sub(r"--.*", "", f.read())
+        for key, name in pattern_list:
+            match = re.search(r"\b%s\s*:\s*\w+[^:;]*:=\s*(\d+)\s*;" %(name), text, re.I)
+            if match:
+                config[key] = int(match.group(1))
+    config["words"] = config["deser_width"] // FRAME_WIDTH
+    return config
+
+def f_lfsr(state):
+    """
+    Bit exact f_lfsr of esistream_pkg: one 14-bit step of the 17-bit LFSR state.
+    """
+    bit = [(state >> idx) & 1 for idx in range(LFSR_LENGTH)]
+    new = bit[LFSR_STEP:] + [bit[idx] ^ bit[idx + LFSR_TAP] for idx in range(LFSR_STEP)]
+    return sum(value << idx for idx, value in enumerate(new))
+
+def tx_scrambling_frame(data, prbs, clock_bit, prbs_en=True):
+    """
+    Bit exact tx_scrambling normal operation frame: '0' & clock bit & (data xor PRBS).
+    """
+    return (clock_bit << CLOCK_BIT) | ((data ^ prbs) if prbs_en else data) & DATA_MASK
+
+def rx_decoding_frame(frame, prbs, prbs_en=True):
+    """
+    Bit exact rx_decoding frame: bits 14..0 inverted when the disparity bit is high, then bits 13..0 xor PRBS.
+    """
+    if frame >> DISPARITY_BIT:
+        frame ^= DISPARITY_MASK
+    return frame ^ (prbs & DATA_MASK if prbs_en else 0)
+
+def lfsr_bits(count, init=LFSR_INIT):
+    """
+    Parameters:
+    * count : integer : number of bits.
+    * init  : integer : 17-bit LFSR initial state.
+    The LFSR states are windows of the bit sequence b[n+17] = b[n] xor b[n+3] (state k bit i is b[14*k+i]).
+    The recurrence also holds for the squared polynomials, b[n+17*2**j] = b[n] xor b[n+3*2**j], so once
+    17*2**j bits are known, blocks of 14*2**j bits are generated with a single vector operation.
+    Return the uint8 bit sequence.
+    """
+    bits = np.zeros(max(count, LFSR_LENGTH), dtype=np.uint8)
+    bits[:LFSR_LENGTH] = [(init >> idx) & 1 for idx in range(LFSR_LENGTH)]
+    known, scale = LFSR_LENGTH, 1
+    while known < count:
+        if known >= 2 * LFSR_LENGTH * scale:
+            scale *= 2
+        length, tap = LFSR_LENGTH * scale, LFSR_TAP * scale
+        block = min((LFSR_LENGTH - LFSR_TAP) * scale, count - known)
+        start = known - length
+        np.bitwise_xor(bits[start:start + block], bits[start + tap:start + tap + block], out=bits[known:known + block])
+        known += block
+    return bits[:count]
+
+def prbs_table(init=LFSR_INIT, length=LFSR_PERIOD):
+    """
+    Return the uint16 PRBS frames (LFSR state bits 13..0) of the states f_lfsr**k(init), k = 0 to length-1.
+    The tx_lfsr frame i of a SER_WIDTH bits word is the next state of frame i-1, PRBS frames are consecutive table entries.
+    At most one period is generated, longer tables repeat it.
+    """
+    count = min(length, LFSR_PERIOD)
+    bits = lfsr_bits(count * LFSR_STEP, init).reshape(count, LFSR_STEP)
+    table = np.zeros(count, dtype=np.uint16)
+    for idx in range(LFSR_STEP):
+        table |= bits[:, idx].astype(np.uint16) << idx
+    return table if length == count else np.resize(table, length)
+
+def prbs_index_table(table):
+    """
+    Return the index of each 17-bit LFSR state in the PRBS table (state k: table[k] | (table[k+1] & 7) << 14).
+    """
+    state = table.astype(np.int32) | (np.roll(table, -1).astype(np.int32) & (2**LFSR_TAP - 1)) << LFSR_STEP
+    index = np.full(2**LFSR_LENGTH, -1, dtype=np.int32)
+    index[state] = np.arange(table.size, dtype=np.int32)
+    return index
+
+def prbs_lock(lane_frames, index_table):
+    """
+    Parameters:
+    * lane_frames : array : uint16 frames of a lane, shape (cycles, words), the capture starts with the synchronization sequence.
+    * index_table : array : see prbs_index_table.
+    The synchronization sequence frames following the frame alignment sequence are PRBS only frames
+    ('0' & clock bit & PRBS, tx_scrambling.vhd), two consecutive frames give the 17-bit LFSR state.
+    Return (PRBS table index of the first frame of the capture, first PRBS only frame position),
+    None when no synchronization sequence is found.
+    """
+    frames = np.asarray(lane_frames).reshape(-1)
+    comma = np.isin(frames, COMMA_FRAME_LIST)
+    start = np.flatnonzero(comma[:-2] & ~comma[1:-1])
+    if not start.size:
+        return None
+    position = int(start[0]) + 1
+    state = (int(frames[position]) & DATA_MASK) | (int(frames[position + 1]) & (2**LFSR_TAP - 1)) << LFSR_STEP
+    if index_table[state] < 0:
+        return None
+    return (int(index_table[state]) - position) % LFSR_PERIOD, position
+
+def sync_prbs_cycles(ser_width=SER_WIDTH):
+    """
+    Return the number of PRBS only cycles of the synchronization sequence, 2**CNT_SYNC_HIGH (tx_scrambling.vhd).
+    """
+    return 2**(6 - (int(np.log2(ser_width)) - 3))
+
+def prbs_extend(table, words):
+    """
+    Return the PRBS table followed by its first words entries: any range of words consecutive frames is a slice.
+    """
+    return np.concatenate((table, np.resize(table, words)))
+
+def clock_bits(cycles, words):
+    """
+    Return the uint16 clock bits of the frames, shape (cycles, 1, words): high for the even frames of a word
+    (tx_scrambling.vhd SER_WIDTH 32 and 64), toggling from a cycle to the next for SER_WIDTH 16.
+    """
+    if words == 1:
+        clock = np.arange(cycles) % 2 == 0
+    else:
+        clock = np.broadcast_to(np.arange(words) % 2 == 0, (cycles, words))
+    return (clock.astype(np.uint16) << CLOCK_BIT).reshape(cycles, 1, words)
+
+def scramble(data, prbs, out, index, prbs_en=True):
+    """
+    Parameters:
+    * data    : array   : uint16 14-bit data, shape (cycles, lanes, words).
+    * prbs    : array   : extended PRBS table, see prbs_extend.
+    * out     : array   : uint16 frames, same shape, may be data (in place).
+    * index   : list    : PRBS table index of the first frame of each lane.
+    * prbs_en : boolean : scrambling enable.
+    tx_scrambling.vhd normal operation: '0' & clock bit & (data xor PRBS).
+    Return out.
+    """
+    cycles, lanes, words = data.shape
+    np.bitwise_and(data, DATA_MASK, out=out)
+    if prbs_en:
+        for lane in range(lanes):
+            start = index[lane] % LFSR_PERIOD
+            np.bitwise_xor(out[:, lane, :], prbs[start:start + cycles * words].reshape(cycles, words), out=out[:, lane, :])
+    np.bitwise_or(out, clock_bits(cycles, words), out=out)
+    return out
+
+def descramble(frames, prbs, out, index=None, prbs_en=True, scratch=None):
+    """
+    Parameters:
+    * frames  : array   : uint16 aligned frames, shape (cycles, lanes, words).
+    * prbs    : array   : extended PRBS table, see prbs_extend.
+    * out     : array   : uint16 decoded frames, same shape, may be frames (in place).
+    * index   : list    : PRBS table index of the first frame of each lane.
+    * prbs_en : boolean : descrambling enable.
+    * scratch : array   : uint16 buffer, (block cycles, lanes, words), DESCRAMBLE_BLOCK_CYCLES block allocated when None.
+    rx_decoding.vhd: bits 14..0 inverted when the disparity bit is high, then bits 13..0 xor PRBS.
+    The frames are decoded by blocks of cycles: the disparity mask and the PRBS are combined in scratch
+    and applied with a single xor.
+    Return out.
+    """
+    cycles, lanes, words = frames.shape
+    if scratch is None:
+        scratch = np.empty((min(DESCRAMBLE_BLOCK_CYCLES, cycles), lanes, words), dtype=np.uint16)
+    block = scratch.shape[0]
+    for first in range(0, cycles, block):
+        last = min(first + block, cycles)
+        mask = scratch[:last - first]
+        np.right_shift(frames[first:last], DISPARITY_BIT, out=mask)
+        np.multiply(mask, DISPARITY_MASK, out=mask)
+        if prbs_en:
+            for lane in range(lanes):
+                start = (index[lane] + first * words) % LFSR_PERIOD
+                np.bitwise_xor(mask[:, lane, :], prbs[start:start + (last - first) * words].reshape(last - first, words), out=mask[:, lane, :])
+        np.bitwise_xor(frames[first:last], mask, out=out[first:last])
+    return out
+
+def payload(frames, out, lane_order=None, disparity=False, signed=True, scratch=None):
+    """
+    Parameters:
+    * frames     : array   : uint16 frames, shape (cycles, lanes, words), decoded (see descramble) or descrambled only.
+    * out        : array   : int16 samples, cycles*words*lanes, written in place.
+    * lane_order : list    : lane of each sample of a group of lanes consecutive samples, identity when None.
+    * disparity  : boolean : True when the frames are not disparity decoded (bit 15 high: bits 14..0 inverted).
+    * signed     : boolean : two's complement samples (offset binary - 2048), else offset binary.
+    * scratch    : array   : int16 disparity mask buffer, at least (cycles, words), allocated when None.
+    Payload extraction (frame bits 11..0). Sample n is frame n//lanes % words of lane lane_order[n % lanes], the lanes
+    are de-interleaved through a strided view of out, (cycles, words, lanes), each lane is written with a single
+    masking operation, without intermediate copy (the disparity mask of each lane is built in scratch).
+    Return out.
+    """
+    cycles, lanes, words = frames.shape
+    out_view = out.reshape(cycles, words, lanes)
+    if disparity:
+        scratch = np.empty((cycles, words), dtype=np.int16) if scratch is None else scratch[:cycles]
+    for position, lane in enumerate(range(lanes) if lane_order is None else lane_order):
+        dst = out_view[:, :, position]
+        np.bitwise_and(frames[:, lane, :], SAMPLE_MASK, out=dst, casting='unsafe')
+        if disparity:
+            # bits 11..0 inverted when the disparity bit is high
+            np.right_shift(frames[:, lane, :], DISPARITY_BIT, out=scratch, casting='unsafe')
+            np.multiply(scratch, SAMPLE_MASK, out=scratch)
+            np.bitwise_xor(dst, scratch, out=dst)
+    if signed:
+        np.subtract(out, SAMPLE_OFFSET, out=out)
+    return out
+
+def pattern_check(frames, step, cb_change=0):
+    """
+    Parameters:
+    * frames    : array   : uint16 decoded frames, shape (cycles, lanes, words).
+    * step      : integer : expected increment of the 12-bit data of a frame from a rx_clk cycle to the next (0: constant).
+    * cb_change : integer : expected clock bit change from a rx_clk cycle to the next (0 for DESER_WIDTH 32 and 64).
+    txrx_frame_checking.vhd data and clock bit checks, each frame is compared with the same frame of the previous cycle.
+    Return (bit error count per lane, clock bit error count per lane), number of erroneous frames.
+    """
+    diff = np.subtract(frames[1:], frames[:-1])
+    np.subtract(diff, step, out=diff)
+    np.bitwise_and(diff, SAMPLE_MASK, out=diff)
+    be = lane_count(diff)
+    np.bitwise_xor(frames[1:], frames[:-1], out=diff)
+    np.bitwise_and(diff, 1 << CLOCK_BIT, out=diff)
+    if cb_change:
+        np.bitwise_xor(diff, 1 << CLOCK_BIT, out=diff)
+    cb = lane_count(diff)
+    return be, cb
+
+def lane_count(frames):
+    """
+    Return the number of non-zero frames per lane, frames shape (cycles, lanes, words), errors are rare:
+    the whole array is tested first.
+    """
+    if not np.count_nonzero(frames):
+        return np.zeros(frames.shape[1], dtype=np.int64)
+    return np.count_nonzero(frames, axis=(0, 2)).astype(np.int64)
+
+def ramp_data(cycles, lanes=NB_LANES, words=DESER_WIDTH // FRAME_WIDTH, start=0):
+    """
+    Return the uint16 ramp data of tx_emu_data_gen.vhd, shape (cycles, lanes, words):
+    frame j of cycle c is start + words*2*c + j (12-bit), the same on all the lanes.
+    """
+    ramp = (start + 2 * words * np.arange(cycles, dtype=np.uint32)[:, None] + np.arange(words)) & SAMPLE_MASK
+    return np.ascontiguousarray(np.broadcast_to(ramp.astype(np.uint16)[:, None, :], (cycles, lanes, words)))
+
+def synthetic_capture(cycles, lanes=NB_LANES, words=DESER_WIDTH // FRAME_WIDTH, pattern="ramp", index=None, disparity=0.0, seed=0):
+    """
+    Parameters:
+    * cycles    : integer : data rx_clk cycles.
+    * lanes     : integer : number of lanes.
+    * words     : integer : frames per lane per cycle (DESER_WIDTH/16).
+    * pattern   : string  : "ramp" (tx_emu_data_gen ramp) or "prbs" (null data, PRBS frames).
+    * index     : list    : PRBS table index of the first frame of each lane, 0 (LFSR_INIT) when None.
+    * disparity : float   : ratio of frames sent inverted with the disparity bit high.
+    Return the uint16 aligned frames capture, shape (2*sync_prbs_cycles + cycles, lanes, words): synchronization sequence
+    (frame alignment sequence, PRBS only frames, tx_scrambling.vhd) then scrambled data, the LFSR steps on each frame.
+    """
+    index = [0] * lanes if index is None else index
+    sync = sync_prbs_cycles(words * FRAME_WIDTH)
+    total = 2 * sync + cycles
+    prbs = prbs_extend(prbs_table(), total * words)
+    data = np.zeros((total, lanes, words), dtype=np.uint16)
+    if pattern == "ramp":
+        data[2 * sync:] = ramp_data(cycles, lanes, words)
+    frames = scramble(data, prbs, data, index)
+    frames[:sync, :, 0::2] = COMMA & 0xFFFF
+    frames[:sync, :, 1::2] = COMMA >> FRAME_WIDTH
+    if disparity:
+        inverted = np.random.default_rng(seed).random(frames.shape) < disparity
+        inverted[:2 * sync] = False
+        frames[inverted] = (1 << DISPARITY_BIT) | (frames[inverted] ^ DISPARITY_MASK)
+    return frames
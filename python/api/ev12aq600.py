@@ -1,17 +1,25 @@
 import os
 import sys
 import time
-import serial
+import json
+import struct
 import logging
+from transport import open_transport
+from ber import ber_test
+from journal import DATA_DIR, JOURNAL_FILE
+from register_table import FIELD_DICT, read_frame, write_frame
 
 ## CONSTANTS:
+SERIAL_PORT = "COM16" # or "tcp://host:port" (serial-over-IP bridge), "loop://" (loopback device)
+SERIAL_BAUDRATE = 115200
 REG_NUMBER = 20 # Satus register can't be written (read only).
 REG_AQ600_NUMBER = 2**16 # Satus register can't be written (read only).
 REG_ADDRESS_LENGTH = 2
 REG_DATA_LENGTH = 4
+REG_SPI_FIFO_IN_ADDRESS = FIELD_DICT["fifo_in_din"].address
 REG_HDL_VERSION_ADDRESS = 8
-REG_SPI_FIFO_FLAGS_ADDRESS = 9
-REG_SPI_RD_FIFO_ADDRESS = 10
+REG_SPI_FIFO_FLAGS_ADDRESS = FIELD_DICT["fifo_out_empty"].address
+REG_SPI_RD_FIFO_ADDRESS = FIELD_DICT["fifo_out_dout"].address
 REG_STATUS_ADDRESS = 255
 REG_READ_MODE_ENABLE = 2**15 # Address field MSB high (bit 15).
 SPI_SLAVE_EV12AQ600 = 0x0
@@ -20,6 +28,72 @@ SYNC_MODE_NORMAL = 0x0
 SYNC_MODE_TRAINING = 0x1
 EV12AQ600_READ_OPERATION_MASK = 0x7FFF
 EV12AQ600_WRITE_OPERATION_MASK = 0x8000
+UART_ACK = b'\xAC'
+SPI_FIFO_DEPTH = 2**8-1 # SPI Master input and output FIFO depth (FIFO_DEPTH = 8 in rx_esistream_top.vhd).
+SPI_FIFO_OUT_EMPTY_MASK = FIELD_DICT["fifo_out_empty"].mask
+SPI_CLK_MHZ = 5.0 # SPI_CLK_MHz in rx_esistream_top.vhd.
+SPI_WORD_PERIOD = 40 / (SPI_CLK_MHZ*1e6) # 16-bit word + ncs high + pause (16 refclk) with margin [s].
+SPI_PLL_WORD_PERIOD = 48 / (SPI_CLK_MHZ*1e6) # 24-bit word + ncs high + pause (16 refclk) with margin [s].
+SPI_WORD_PERIOD_LIST = [SPI_WORD_PERIOD, SPI_PLL_WORD_PERIOD] # Indexed by SPI slave select.
+EV12AQ600_DUMP_ADDRESS_LIST = [0x000C, 0x000D, 0x0011, 0x0B07, 0x0B0A] # Registers used by this API.
+SYNC_ODELAY_TAP_MAX = FIELD_DICT["sync_odelay_i"].mask # ODELAYE3 CNTVALUEIN/CNTVALUEOUT 9-bit tap value (odelaye3_wrapper.vhd).
+SYNC_SAMPLING_EDGE_LIST = ["positive", "negative"]
+SYNC_CALIBRATION_COARSE_STEP = 32 # Must be smaller than the SYNC timing eye width [taps].
+SYNC_CALIBRATION_TEMPERATURE_STEP = 10 # Calibration cache temperature bucket [degree C].
+SYNC_CALIBRATION_CACHE_FILE = os.path.join(DATA_DIR, "sync_calibration.json")
+NB_LANES = 8
+LANE_RATE = 12.8e9 # HSSL lane rate [bps] (gty_8lanes_64b.xci RX_LINE_RATE).
+REG_LANE_STATUS_ADDRESS = FIELD_DICT["valid_status"].address
+LANE_STATUS_CB_SHIFT = FIELD_DICT["cb_lane_status"].lsb # Register 18: bit errors bits 7..0, clock bit errors bits 23..16, valid status bit 31.
+LANE_STATUS_VALID_MASK = FIELD_DICT["valid_status"].mask
+SYNC_COUNTER_MASK = FIELD_DICT["sync_rd_counter"].mask # Register 11 bits 7..0 sync_rd_counter, SYNCTRIG_COUNTER_WIDTH = 8.
+SYNC_COUNTER_BUSY_MASK = FIELD_DICT["sync_counter_busy"].mask
+SYNC_COUNTER_TIMEOUT = 1.0 # [s]
+RESYNC_SETTLE = 0.01 # Reset to SYNC delay [s].
+RESYNC_DWELL = 0.01 # Data check duration [s].
+RESYNC_TIMEOUT = 1.0 # Link ready timeout [s].
+# resync_cycle outcomes, RESYNC_OUTCOME_LIST index.
+RESYNC_PASS = 0
+RESYNC_NOT_READY = 1 # SYNC counter busy or lanes not valid at timeout.
+RESYNC_ERRORS = 2 # Data check bit or clock bit errors.
+RESYNC_LINK_LOST = 3 # Lanes not valid after the data check.
+RESYNC_OUTCOME_LIST = ["pass", "not ready", "errors", "link lost"]
+BER_TARGET = 1e-12
+BER_CONFIDENCE = 0.95
+BER_POLL_INTERVAL = 1.0 # [s]
+BER_TIMEOUT = 3600.0 # [s]
+SNAPSHOT_MAGIC = b'AQ6S'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER_FORMAT = '>4sBB' # magic, version, SPI slave select.
+# FPGA registers restored by snapshot_restore. Pulse bits (reset, spi_start, send_sync),
+# SPI FIFO IN data port and read only registers are masked out.
+SNAPSHOT_REG_MASK_LIST = [0xFFFFFFFF, 0xFFFFFFFF, 0xFFFFFFF4, 0xFFFFFFFD, 0x00000000, 0xFFFFFFFF, 0xFFFFFFFE, 0xFFFFFFFF,
+                          0x00000000, 0x00000000, 0x00000000, 0x00000000, 0xFFFFFFFF, 0xFFFFFFFF, 0xFFFFFFFF, 0xFFFFFFFF,
+                          0xFFFFFFFF, 0xFFFFFFFF, 0x00000000, 0x00000000]
+REG_READ_BACK_LIST = [0, 1, 2, 3, 5, 6, 7, 12] # Writable registers also readable (register_map.vhd).
+# snapshot_restore dependency order: board clocks and power, ADC reset, [PLL, ADC], RX IP and SYNC configuration.
+SNAPSHOT_BOARD_REG_LIST = [13, 14, 15, 16, 17, 2]
+SNAPSHOT_LINK_REG_LIST = [0, 1, 5, 6, 7, 12]
+
+# External PLL LMX2592 RFOUT A SPI commands (24-bit: 8-bit address, 16-bit data):
+EXTERNAL_PLL_6400_LIST = [0x00221E, 0x400077, 0x3E0000, 0x3D0001, 0x3B0000, 0x3003FC, 0x2F08CF, 0x2E17A3,
+                          0x2D0000, 0x2C0000, 0x2B0000, 0x2A0000, 0x2903E8, 0x280000, 0x278204, 0x260040,
+                          0x254000, 0x240811, 0x23021F, 0x22C3EA, 0x212A0A, 0x20210A, 0x1F0401, 0x1E0034,
+                          0x1D0084, 0x1C2924, 0x190000, 0x180509, 0x178842, 0x162300, 0x14012C, 0x130965,
+                          0x0E018C, 0x0D4000, 0x0C7001, 0x0B0018, 0x0A10D8, 0x090302, 0x081084, 0x0728B2,
+                          0x041943, 0x020500, 0x010808, 0x00221C]
+EXTERNAL_PLL_6250_LIST = [0x00221E, 0x400077, 0x3E0000, 0x3D0001, 0x3B0000, 0x3003FC, 0x2F08CF, 0x2E17A3,
+                          0x2D00FA, 0x2C0000, 0x2B0000, 0x2A0000, 0x2903E8, 0x280000, 0x278204, 0x26003E,
+                          0x254000, 0x240811, 0x23021F, 0x22C3EA, 0x212A0A, 0x20210A, 0x1F0401, 0x1E0034,
+                          0x1D0084, 0x1C2924, 0x190000, 0x180509, 0x178842, 0x162300, 0x14012C, 0x130965,
+                          0x0E018C, 0x0D4000, 0x0C7001, 0x0B0018, 0x0A10D8, 0x090302, 0x081084, 0x0728B2,
+                          0x041943, 0x020500, 0x010808, 0x00221C]
+EXTERNAL_PLL_5000_LIST = [0x00221E, 0x400077, 0x3E0000, 0x3D0001, 0x3B0000, 0x3003FC, 0x2F08CF, 0x2E17A3,
+                          0x2D0000, 0x2C0000, 0x2B0000, 0x2A0000, 0x2903E8, 0x280000, 0x278204, 0x260032,
+                          0x254000, 0x240011, 0x23021F, 0x22C3EA, 0x212A0A, 0x20210A, 0x1F0401, 0x1E0034,
+                          0x1D0084, 0x1C2924, 0x190000, 0x180509, 0x178842, 0x162300, 0x14012C, 0x130965,
+                          0x0E018C, 0x0D4000, 0x0C7001, 0x0B0018, 0x0A10D8, 0x090302, 0x081084, 0x0728B2,
+                          0x041943, 0x020500, 0x010808, 0x00221C]
 
 ## CLASS:
 class ev12aq600:
@@ -37,19 +111,38 @@ class ev12aq600:
         ADC registers base image 
         """
         self.reg_aq600_array = [0] * REG_AQ600_NUMBER
+        """
+        ADC registers written through SPI (reg_aq600_array addresses)
+        """
+        self.reg_aq600_written = set()
+        """
+        SPI commands pre-loaded in the SPI Master input FIFO and
+        external PLL LMX2592 SPI commands sent by the last spi_start
+        """
+        self.spi_fifo_in_list = []
+        self.external_pll_plan = []
+        """
+        SPI command scheduler: list of phases, each phase is a list of (SPI slave, SPI commands words) 
+        """
+        self.spi_schedule_list = [[]]
+        self.spi_schedule_deferred = False
 
     ##################################################################################################################################### 
     ## Serial port functions
     #####################################################################################################################################      
-    def start_serial(self):
+    def start_serial(self, port=SERIAL_PORT, baudrate=SERIAL_BAUDRATE, journal_file=JOURNAL_FILE):
         """
+        Parameters:
+        * port         : string  : serial port name, "tcp://host:port" or "loop://", see transport.open_transport.
+        * baudrate     : integer : serial port baud rate.
+        * journal_file : string  : UART frames journal file (EV12AQ600_JOURNAL environment variable, ~/.ev12aq600 by default, rotated), "" to disable it.
         Open serial port (UART):
         The FPGA design embeds a UART slave which uses the following configuration:
         -	Baud rate: 115200 
         -	Data Bits: 8
         -	No parity
         """
-        self.ser=serial.Serial("COM16", 115200, timeout=1)
+        self.ser=open_transport(port, baudrate, timeout=1, journal_file=journal_file)
         print("\r\n")
         print("--------------------------------------------------------")
         print("-- Serial communication opened... %s" %(self.ser.isOpen()))
@@ -82,8 +175,7 @@ class ev12aq600:
         -       Master read  --------------------------------------------------------------------------------------------------------------------< ACK byte: 0xAC >-----
         """
         rcv=self.ser.read(self.ser.inWaiting()) 
-        command = int(address).to_bytes(REG_ADDRESS_LENGTH, byteorder='big')
-        command = command + int(data).to_bytes(REG_DATA_LENGTH,byteorder='big')
+        command = write_frame(int(address), int(data)) # register_table.py cached frame
         self.ser.write(command)
         ack = self.wait_response() # Wait for slave acknowledgment ACK value = 0xAC (16) = 172 (10)
         return (int.from_bytes(ack, byteorder='big'))
@@ -106,28 +198,72 @@ class ev12aq600:
         -       Master write ----< Byte 1: 1 & Addr high >---------------------------------------------------------------------------------------------------------
         -       Master read  -------------------------------< Byte 2: Addr low >< Data byte 3 >< Data byte 2 >< Data byte 1 >< Data byte 0 >< ACK byte: 0xAC >-----
         """
-        command = (int(address)+REG_READ_MODE_ENABLE).to_bytes(REG_ADDRESS_LENGTH, byteorder='big')
+        command = read_frame(int(address)) # register_table.py precomputed frame
         self.ser.write(command)
         data = self.ser.read(size=REG_DATA_LENGTH)
         ack = self.wait_response() # Wait for slave acknowledgment ACK value = 0xAC = 172
         return (int.from_bytes(data, byteorder='big'))
 
+    def write_register_burst(self, address_data_list):
+        """
+        Parameters:
+        * address_data_list : list of (address, data) tuples : 15-bit address, 32-bit data.
+        write_register_burst sends all the write operation commands in a single serial write
+        and then collects one acknowledgment word per command. 
+        Same frames as write_register, without waiting for each acknowledgment.
+        Return the number of acknowledgment words received.
+        """
+        rcv=self.ser.read(self.ser.inWaiting()) 
+        command = b''.join([write_frame(int(address), int(data)) for address, data in address_data_list])
+        self.ser.write(command)
+        ack = self.ser.read(size=len(address_data_list))
+        ack_cntr = ack.count(UART_ACK)
+        if ack_cntr != len(address_data_list):
+            logging.error("-- write_register_burst: %d/%d ACK received" %(ack_cntr, len(address_data_list)))
+        return ack_cntr
+
+    def read_register_burst(self, address_list):
+        """
+        Parameters:
+        * address_list : list of positive integers : 15-bit FPGA register addresses.
+        read_register_burst sends all the read operation commands in a single serial write and then 
+        reads the data and acknowledgment words of all commands in a single serial read.
+        Same frames as read_register, pipelined.
+        Return the list of register values (None when the frame is not acknowledged).
+        """
+        rcv=self.ser.read(self.ser.inWaiting()) 
+        command = b''.join([read_frame(int(address)) for address in address_list])
+        self.ser.write(command)
+        frame_length = REG_DATA_LENGTH + len(UART_ACK)
+        rcv = self.ser.read(size=frame_length*len(address_list))
+        data_list = []
+        for idx in range(len(address_list)):
+            frame = rcv[idx*frame_length:(idx+1)*frame_length]
+            if len(frame) == frame_length and frame[REG_DATA_LENGTH:] == UART_ACK:
+                data_list.append(int.from_bytes(frame[:REG_DATA_LENGTH], byteorder='big'))
+            else:
+                data_list.append(None)
+        if None in data_list:
+            logging.error("-- read_register_burst: %d/%d frames not acknowledged" %(data_list.count(None), len(address_list)))
+        return data_list
+
     def wait_response(self, wtext=b'\xAC', timeSleep=0.05, timeOut=1, timeDisplayEnable=False):
         """
         After sending a UART frames layer protocol write or read operation command allows waiting for the acknowledgment word: 
         - Hexadecimal: 0xAC 
         - Decimal: 172
+        The acknowledgment word is read as soon as it is received (transport read timeout), 
+        timeSleep is kept for compatibility.
         """
-        ack=""
+        ack=b""
         waitResponse=True
-        timeCntr=0
+        timeStart=time.time()
         while(waitResponse):
-            time.sleep(timeSleep)
-            timeCntr = timeCntr+timeSleep
-            ack=self.ser.read(self.ser.inWaiting()) 
+            ack=ack+self.ser.read(size=len(wtext))
+            timeCntr=time.time()-timeStart
             if (wtext in ack):
                 waitResponse=False
-            elif (timeCntr == timeOut):
+            elif (timeCntr >= timeOut):
                 ack='-- Error: wait_response "%s" timeout %ds'%(wtext, timeOut)
                 waitResponse=False
             else:
@@ -175,17 +311,17 @@ class ev12aq600:
     #####################################################################################################################################      
     ## REG 0
     def ramp_check_enable(self):
-        reg_addr = 0
-        reg_data_bit = 1
+        reg_addr = FIELD_DICT["tx_emu_d_ctrl_1"].address
+        reg_data_bit = FIELD_DICT["tx_emu_d_ctrl_1"].lsb
         self.set_bit(reg_addr, reg_data_bit)
-        reg_data_bit = 0
+        reg_data_bit = FIELD_DICT["tx_emu_d_ctrl_0"].lsb
         self.unset_bit(reg_addr, reg_data_bit)
 
     def pattern0_check_enable(self):
-        reg_addr = 0
-        reg_data_bit = 1
+        reg_addr = FIELD_DICT["tx_emu_d_ctrl_1"].address
+        reg_data_bit = FIELD_DICT["tx_emu_d_ctrl_1"].lsb
         self.unset_bit(reg_addr, reg_data_bit)
-        reg_data_bit = 0
+        reg_data_bit = FIELD_DICT["tx_emu_d_ctrl_0"].lsb
         self.unset_bit(reg_addr, reg_data_bit)
         
     ## REG 1
@@ -193,8 +329,8 @@ class ev12aq600:
         """
         Enable ESIstream RX IP PRBS decoding.
         """
-        reg_addr = 1
-        reg_data_bit = 0
+        reg_addr = FIELD_DICT["rx_prbs_en"].address
+        reg_data_bit = FIELD_DICT["rx_prbs_en"].lsb
         self.set_bit(reg_addr, reg_data_bit)
      
     ## REG 1
@@ -202,8 +338,8 @@ class ev12aq600:
         """
         Disable ESIstream RX IP PRBS decoding.
         """
-        reg_addr = 1
-        reg_data_bit = 0
+        reg_addr = FIELD_DICT["rx_prbs_en"].address
+        reg_data_bit = FIELD_DICT["rx_prbs_en"].lsb
         self.unset_bit(reg_addr, reg_data_bit)
 
     ## REG 2
@@ -211,8 +347,8 @@ class ev12aq600:
         """
         Global software reset (active high reset).
         """
-        reg_addr = 2
-        reg_data_bit = 0
+        reg_addr = FIELD_DICT["rst"].address
+        reg_data_bit = FIELD_DICT["rst"].lsb
         self.set_bit(reg_addr, reg_data_bit)
         self.unset_bit(reg_addr, reg_data_bit)
 
@@ -222,8 +358,8 @@ class ev12aq600:
         Reset the RX data check module (active high reset).
         rst_check_pulse should be used after a sync pulse when the link is synchronized (lanes_ready high and data released) to check the decoded data are correct.  
         """
-        reg_addr = 2
-        reg_data_bit = 1
+        reg_addr = FIELD_DICT["rst_check"].address
+        reg_data_bit = FIELD_DICT["rst_check"].lsb
         self.set_bit(reg_addr, reg_data_bit)
         time.sleep(0.1)
         self.unset_bit(reg_addr, reg_data_bit)
@@ -233,8 +369,8 @@ class ev12aq600:
         """
         EV12AQ600 ADC reset (active low reset). 
         """
-        reg_addr = 2
-        reg_data_bit = 2
+        reg_addr = FIELD_DICT["aq600_rstn"].address
+        reg_data_bit = FIELD_DICT["aq600_rstn"].lsb
         self.unset_bit(reg_addr, reg_data_bit)
         self.set_bit(reg_addr, reg_data_bit)
 
@@ -242,16 +378,16 @@ class ev12aq600:
         """
         Deactivate ADC reset (active low reset).
         """
-        reg_addr = 2
-        reg_data_bit = 2
+        reg_addr = FIELD_DICT["aq600_rstn"].address
+        reg_data_bit = FIELD_DICT["aq600_rstn"].lsb
         self.set_bit(reg_addr, reg_data_bit)
         
     def active_ev12aq600_rstn(self):
         """
         Activate ADC reset (active low reset).
         """
-        reg_addr = 2
-        reg_data_bit = 2
+        reg_addr = FIELD_DICT["aq600_rstn"].address
+        reg_data_bit = FIELD_DICT["aq600_rstn"].lsb
         self.unset_bit(reg_addr, reg_data_bit)
         
     ## REG 2
@@ -259,8 +395,8 @@ class ev12aq600:
         """
         SYNC generator module reset (active high reset).
         """
-        reg_addr = 2
-        reg_data_bit = 3
+        reg_addr = FIELD_DICT["rx_sync_rst"].address
+        reg_data_bit = FIELD_DICT["rx_sync_rst"].lsb
         self.set_bit(reg_addr, reg_data_bit)
         self.unset_bit(reg_addr, reg_data_bit)
 
@@ -271,8 +407,8 @@ class ev12aq600:
         -	EV12AQ600 ADC when '0'
         -	External PLL LMX2592 when '1'
         """
-        reg_addr = 3
-        reg_data_bit = 0
+        reg_addr = FIELD_DICT["spi_ss"].address
+        reg_data_bit = FIELD_DICT["spi_ss"].lsb
         self.unset_bit(reg_addr, reg_data_bit)
         
     def spi_ss_external_pll(self):
@@ -281,8 +417,8 @@ class ev12aq600:
         -	EV12AQ600 ADC when '0'
         -	External PLL LMX2592 when '1'
         """
-        reg_addr = 3
-        reg_data_bit = 0
+        reg_addr = FIELD_DICT["spi_ss"].address
+        reg_data_bit = FIELD_DICT["spi_ss"].lsb
         self.set_bit(reg_addr, reg_data_bit)
 
     ## REG 3
@@ -290,10 +426,13 @@ class ev12aq600:
         """
         Send all SPI commands, pre-loaded in the SPI Master input FIFO, to the selected SPI slave.
         """
-        reg_addr = 3
-        reg_data_bit = 1
+        reg_addr = FIELD_DICT["spi_start"].address
+        reg_data_bit = FIELD_DICT["spi_start"].lsb
         self.set_bit(reg_addr, reg_data_bit)
         self.unset_bit(reg_addr, reg_data_bit)
+        if (self.reg_array[reg_addr] & 0x00000001) == SPI_SLAVE_EXTERNAL_PLL and self.spi_fifo_in_list:
+            self.external_pll_plan = self.spi_fifo_in_list
+        self.spi_fifo_in_list = []
 
     def spi_wr_fifo_in(self, spi_command):
         """
@@ -310,6 +449,7 @@ class ev12aq600:
         #
         reg_addr = 4
         self.reg_array[reg_addr] = spi_command & spi_command_mask
+        self.spi_fifo_in_list.append(self.reg_array[reg_addr])
         self.write_register(reg_addr, self.reg_array[reg_addr])
 
     ## REG 5
@@ -317,16 +457,16 @@ class ev12aq600:
         """
         Set SYNC Counter in training mode.
         """
-        reg_addr = 5
-        reg_data_bit = 0
+        reg_addr = FIELD_DICT["sync_mode"].address
+        reg_data_bit = FIELD_DICT["sync_mode"].lsb
         self.set_bit(reg_addr, reg_data_bit)
         
     def sync_mode_normal(self):
         """
         Set SYNC Counter in normal mode.
         """
-        reg_addr = 5
-        reg_data_bit = 0
+        reg_addr = FIELD_DICT["sync_mode"].address
+        reg_data_bit = FIELD_DICT["sync_mode"].lsb
         self.unset_bit(reg_addr, reg_data_bit)
     
     ## REG 6
@@ -338,23 +478,33 @@ class ev12aq600:
         and starts sending the SYNC pulse both to the ESIstream RX IP and to the ADC. 
         The SYNC pulse also starts the SYNC counter. 
         """
-        reg_addr = 6
-        reg_data_bit = 0
+        reg_addr = FIELD_DICT["send_sync"].address
+        reg_data_bit = FIELD_DICT["send_sync"].lsb
         self.set_bit(reg_addr, reg_data_bit)
         self.unset_bit(reg_addr, reg_data_bit)
 
     def set_sync_mode_to_manual(self):
-        reg_addr = 6
-        reg_data_bit = 1
+        reg_addr = FIELD_DICT["manual_mode"].address
+        reg_data_bit = FIELD_DICT["manual_mode"].lsb
         self.set_bit(reg_addr, reg_data_bit)
 
     def set_sync_mode_to_auto(self):
-        reg_addr = 6
-        reg_data_bit = 1
+        reg_addr = FIELD_DICT["manual_mode"].address
+        reg_data_bit = FIELD_DICT["manual_mode"].lsb
         self.unset_bit(reg_addr, reg_data_bit)   
 
     ## REG 7
-    """ Not yet implemented """
+    def set_sync_wr_counter(self, value):
+        """
+        Parameters:
+        * value : range 0 to 255 : SYNC counter end value [rx_clk cycles], normal mode data release time after the SYNC.
+        The value is loaded on the wr_en rising edge (register 7 bit 8), the three register write operations are sent 
+        in a single burst.
+        """
+        reg_addr = 7
+        value = value & SYNC_COUNTER_MASK
+        self.write_register_burst([(reg_addr, value), (reg_addr, value | 0x100), (reg_addr, value)])
+        self.reg_array[reg_addr] = value
     
     ## REG 8
     def get_hdl_version(self):
@@ -391,11 +541,59 @@ class ev12aq600:
         return rcv
     
     ## REG 11
-    """ Not yet implemented """
+    def get_sync_odelay(self):
+        """
+        Read the SYNC output ODELAYE3 tap value (CNTVALUEOUT, register 11 bits 24 down to 16).
+        """
+        rcv = self.read_register(11)
+        return (rcv >> 16) & SYNC_ODELAY_TAP_MAX
     
+    ## REG 11
+    def get_sync_counter(self):
+        """
+        Read the SYNC counter (sync_generator.vhd): training mode, rx_clk cycles from the SYNC to lanes ready;
+        normal mode, rx_clk cycles from the SYNC to data release.
+        Return (sync_rd_counter, counter_busy).
+        """
+        rcv = self.read_register(11)
+        return rcv & SYNC_COUNTER_MASK, bool(rcv & SYNC_COUNTER_BUSY_MASK)
+
+    def wait_sync_counter(self, timeOut=SYNC_COUNTER_TIMEOUT):
+        """
+        Poll the SYNC counter until it is no longer busy.
+        Return the SYNC counter value, None at timeout.
+        """
+        start = time.time()
+        while True:
+            counter, busy = self.get_sync_counter()
+            if not busy:
+                return counter
+            if time.time() - start >= timeOut:
+                logging.error("-- SYNC counter busy timeout")
+                return None
+
     ## REG 12
-    """ Not yet implemented """
+    def set_sync_odelay(self, tap):
+        """
+        Parameters:
+        * tap : range 0 to 511 : Positive integer, SYNC output ODELAYE3 tap value.
+        Set the SYNC output delay, the register write operation loads the new tap value (CNTVALUEIN).
+        """
+        reg_addr = 12
+        self.reg_array[reg_addr] = tap & SYNC_ODELAY_TAP_MAX
+        self.write_register(reg_addr, self.reg_array[reg_addr])
     
+    ## REG 18
+    def get_lane_status(self):
+        """
+        Read the RX data check status (txrx_frame_checking.vhd), sticky until the next rst_check_pulse.
+        Return (bit error lane list, clock bit error lane list, valid status), lane lists of booleans.
+        """
+        rcv = self.read_register(REG_LANE_STATUS_ADDRESS)
+        be_list = [bool((rcv >> lane) & 0x1) for lane in range(NB_LANES)]
+        cb_list = [bool((rcv >> (LANE_STATUS_CB_SHIFT + lane)) & 0x1) for lane in range(NB_LANES)]
+        return be_list, cb_list, bool(rcv & LANE_STATUS_VALID_MASK)
+
     ## REG 15
     def hw_adc_power_enable(self):
         reg_addr = 15
@@ -451,8 +649,8 @@ class ev12aq600:
             if (fifo_empty == 0):
                 # output fifo not empty
                 waitResponse=False
-            elif (timeCntr == timeOut):
-                ack='-- Error: wait_response "%s" timeout %ds'%(wtext, timeOut)
+            elif (timeCntr >= timeOut):
+                logging.error('-- Error: wait_spi_output_fifo_not_empty timeout %ds'%(timeOut))
                 waitResponse=False
             else:
                 waitResponse=True
@@ -503,6 +701,8 @@ class ev12aq600:
         # Check spi slave select, if external pll then changer for ev12aq600 adc.
         if (self.reg_array[3] & 0x00000001) == SPI_SLAVE_EXTERNAL_PLL:
             self.spi_ss_ev12aq600()
+        if reg_addr & EV12AQ600_WRITE_OPERATION_MASK:
+            self.reg_aq600_written.add(reg_addr)
         # Load register address in spi master input fifo
         self.spi_wr_fifo_in(reg_addr)
         # Load register data in spi master input fifo
@@ -512,8 +712,8 @@ class ev12aq600:
         reg_addr = 0x008B0A
         reg_data_bit = 0
         self.set_aq600_bit(reg_addr, reg_data_bit)
-        ## Load spi master fifo in with configuration data
-        self.spi_wr_fifo_aq600(reg_addr)
+        ## Schedule configuration data
+        self.spi_schedule_aq600(reg_addr)
         
         reg_addr = 0x008B07
         reg_data_bit = 0
@@ -522,18 +722,18 @@ class ev12aq600:
         self.set_aq600_bit(reg_addr, reg_data_bit)
         reg_data_bit = 2
         self.set_aq600_bit(reg_addr, reg_data_bit)
-        ## Load spi master fifo in with configuration data
-        self.spi_wr_fifo_aq600(reg_addr)
+        ## Schedule configuration data
+        self.spi_schedule_aq600(reg_addr)
         
-        ## Start spi write operation...
-        self.spi_start_pulse()
+        ## Start spi write operation, unless deferred...
+        self.spi_schedule_submit()
 
     def ev12aq600_configuration_normal_mode(self):
         reg_addr = 0x008B0A
         reg_data_bit = 0
         self.unset_aq600_bit(reg_addr, reg_data_bit)
-        ## Load spi master fifo in with configuration data
-        self.spi_wr_fifo_aq600(reg_addr)
+        ## Schedule configuration data
+        self.spi_schedule_aq600(reg_addr)
         
         reg_addr = 0x008B07
         reg_data_bit = 0
@@ -542,18 +742,18 @@ class ev12aq600:
         self.set_aq600_bit(reg_addr, reg_data_bit)
         reg_data_bit = 2
         self.set_aq600_bit(reg_addr, reg_data_bit)
-        ## Load spi master fifo in with configuration data
-        self.spi_wr_fifo_aq600(reg_addr)
+        ## Schedule configuration data
+        self.spi_schedule_aq600(reg_addr)
         
-        ## Start spi write operation...
-        self.spi_start_pulse()
+        ## Start spi write operation, unless deferred...
+        self.spi_schedule_submit()
         
     def ev12aq600_configuration_pattern0_mode(self):
         reg_addr = 0x008B0A
         reg_data_bit = 0
         self.unset_aq600_bit(reg_addr, reg_data_bit)
-        ## Load spi master fifo in with configuration data
-        self.spi_wr_fifo_aq600(reg_addr)
+        ## Schedule configuration data
+        self.spi_schedule_aq600(reg_addr)
         
         reg_addr = 0x008B07
         reg_data_bit = 0
@@ -562,20 +762,20 @@ class ev12aq600:
         self.unset_aq600_bit(reg_addr, reg_data_bit)
         reg_data_bit = 2
         self.set_aq600_bit(reg_addr, reg_data_bit)
-        ## Load spi master fifo in with configuration data
-        self.spi_wr_fifo_aq600(reg_addr)
+        ## Schedule configuration data
+        self.spi_schedule_aq600(reg_addr)
 
-        ## Start spi write operation...
-        self.spi_start_pulse()
+        ## Start spi write operation, unless deferred...
+        self.spi_schedule_submit()
 
     def ev12aq600_reset_sync_flag(self):
         # The flag is reset by writing at the SYNC_FLAG_RST register address:
         # bit [0] = 0 : reset the flag 
         reg_addr = 0x00000E | EV12AQ600_WRITE_OPERATION_MASK
         reg_data_bit = 0
-        self.spi_wr_fifo_aq600(reg_addr)
-        ## Start spi write operation...
-        self.spi_start_pulse()
+        self.spi_schedule_aq600(reg_addr)
+        ## Start spi write operation, unless deferred...
+        self.spi_schedule_submit()
         
     def ev12aq600_get_sync_flag(self):
         # bit [0] = Indicate timing violation on SYNC
@@ -583,15 +783,7 @@ class ev12aq600:
         # bit [0] = 1 :Timing violation on SYNC 
         #print ("-- spi fifo flags values: "+str(spi_fifo_flags))
         reg_addr = 0x00000D & EV12AQ600_READ_OPERATION_MASK
-        reg_data_bit = 0
-        self.spi_wr_fifo_aq600(reg_addr)
-        ## Start spi write operation...
-        self.spi_start_pulse() 
-        spi_fifo_flags = self.get_spi_fifo_flags()
-        fifo_empty = self.wait_spi_output_fifo_not_empty()
-        #print ("-- FIFO empty flag [1: empty, 0: not empty]: "+str(fifo_empty))
-        #
-        rcv = self.get_spi_fifo_rd_dout() 
+        rcv = self.ev12aq600_get_register_value(reg_addr)
         return rcv
     
     def ev12aq600_sync_sampling_on_negative_edge(self):
@@ -600,9 +792,9 @@ class ev12aq600:
         reg_addr = 0x00000C | EV12AQ600_WRITE_OPERATION_MASK
         reg_data_bit = 0
         self.set_aq600_bit(reg_addr, reg_data_bit)
-        self.spi_wr_fifo_aq600(reg_addr)
-        ## Start spi write operation...
-        self.spi_start_pulse()
+        self.spi_schedule_aq600(reg_addr)
+        ## Start spi write operation, unless deferred...
+        self.spi_schedule_submit()
         
     def ev12aq600_sync_sampling_on_positive_edge(self):
         # The flag is reset by writing at the SYNC_FLAG_RST register address:
@@ -610,85 +802,213 @@ class ev12aq600:
         reg_addr = 0x00000C | EV12AQ600_WRITE_OPERATION_MASK
         reg_data_bit = 0
         self.unset_aq600_bit(reg_addr, reg_data_bit)
-        self.spi_wr_fifo_aq600(reg_addr)
-        ## Start spi write operation...
-        self.spi_start_pulse()
+        self.spi_schedule_aq600(reg_addr)
+        ## Start spi write operation, unless deferred...
+        self.spi_schedule_submit()
         
     def ev12aq600_get_register_value(self, addr):
         """
-        
+        Parameters:
+        * addr : positive integer : EV12AQ600 ADC register address, see datasheet.
+        Read a single EV12AQ600 ADC register, see ev12aq600_get_register_values.
         """
         #Chip id @ 0x0011, should return 0x914 (hex) or 2324 (dec)  
-        print ("addr = "+str(addr))
-        spi_fifo_flags = self.get_spi_fifo_flags()
-        #print ("-- spi fifo flags values: "+str(spi_fifo_flags))
-        reg_addr = addr & EV12AQ600_READ_OPERATION_MASK
-        reg_data_bit = 0
-        self.spi_wr_fifo_aq600(reg_addr)
-        ## Start spi write operation...
-        self.spi_start_pulse() 
-        spi_fifo_flags = self.get_spi_fifo_flags()
-        #print ("-- spi fifo flags values: "+str(spi_fifo_flags))
-        rcv = self.get_spi_fifo_rd_dout()
-        spi_fifo_flags = self.get_spi_fifo_flags()
-        #print ("-- spi fifo flags values: "+str(spi_fifo_flags))
+        rcv = self.ev12aq600_get_register_values([addr])
+        return rcv[addr & EV12AQ600_READ_OPERATION_MASK]
+
+    def ev12aq600_get_register_values(self, addr_list):
+        """
+        Parameters:
+        * addr_list : list of positive integers : EV12AQ600 ADC register addresses, see datasheet.
+        Bulk read of EV12AQ600 ADC registers:
+        1- Preload up to SPI_FIFO_DEPTH/2 read commands (address word, dummy data word) in the SPI Master input FIFO.
+        2- Send all commands sending a single spi_start pulse.
+        Scheduled SPI commands are sent first, see spi_schedule_run.
+        3- Wait for the SPI Master output FIFO not empty (register 9) and flush the output FIFO (register 10) 
+           with pipelined UART read operations.
+        4- Check the output FIFO is empty (register 9) and repeat with the next commands.
+        Return a dictionary {address: value}, value is None when the read operation failed.
+        """
+        addr_list = [addr & EV12AQ600_READ_OPERATION_MASK for addr in addr_list]
+        # Scheduled SPI write operations first
+        if any(self.spi_schedule_list):
+            self.spi_schedule_run()
+        if (self.reg_array[3] & 0x00000001) == SPI_SLAVE_EXTERNAL_PLL:
+            self.spi_ss_ev12aq600()
+        # Flush SPI Master output FIFO remaining data (previous read operations)
+        for idx in range(SPI_FIFO_DEPTH):
+            if (self.get_spi_fifo_flags() & SPI_FIFO_OUT_EMPTY_MASK) != 0:
+                break
+            self.get_spi_fifo_rd_dout()
+        rcv = {}
+        batch_length = SPI_FIFO_DEPTH // 2
+        for idx in range(0, len(addr_list), batch_length):
+            batch = addr_list[idx:idx+batch_length]
+            # Load read commands in spi master input fifo: address word, then dummy data word
+            fifo_in_list = []
+            for addr in batch:
+                fifo_in_list.append((REG_SPI_FIFO_IN_ADDRESS, addr))
+                fifo_in_list.append((REG_SPI_FIFO_IN_ADDRESS, 0x0000))
+            self.write_register_burst(fifo_in_list)
+            self.reg_array[REG_SPI_FIFO_IN_ADDRESS] = 0x0000
+            ## Start spi read operations...
+            self.spi_start_pulse()
+            time.sleep(2*len(batch)*SPI_WORD_PERIOD)
+            fifo_empty = self.wait_spi_output_fifo_not_empty(timeSleep=0.001, timeOut=1)
+            data_list = self.read_register_burst([REG_SPI_RD_FIFO_ADDRESS]*len(batch))
+            for addr, data in zip(batch, data_list):
+                rcv[addr] = data
+            fifo_flags = self.get_spi_fifo_flags()
+            if fifo_empty or (fifo_flags & SPI_FIFO_OUT_EMPTY_MASK) == 0:
+                logging.error("-- ev12aq600_get_register_values: SPI Master output FIFO flags 0x%x" %(fifo_flags))
         return rcv
+
+    def ev12aq600_dump_registers(self, addr_list=EV12AQ600_DUMP_ADDRESS_LIST):
+        """
+        Parameters:
+        * addr_list : list of positive integers : EV12AQ600 ADC register addresses, see datasheet. 
+        Configuration dump for diagnostic, use range(0x0000, 0x8000) for the full address space.
+        Return a dictionary {address: value}, see register_dump_lines.
+        """
+        return self.ev12aq600_get_register_values(addr_list)
     
+    def ev12aq600_core_correction(self, correction_list, address_list, offset_lsb, gain_lsb, skew_lsb):
+        """
+        Parameters:
+        * correction_list : list of dictionaries : per core {"offset" [LSB], "gain", "skew" [s]}, see interleaving.correction_table.
+        * address_list    : list of tuples : per core (offset, gain, skew) EV12AQ600 register addresses, see datasheet.
+        * offset_lsb      : float : offset register LSB [ADC LSB].
+        * gain_lsb        : float : gain register LSB (relative gain).
+        * skew_lsb        : float : skew (phase) register LSB [s].
+        Convert the correction table to 16-bit two's complement register codes, (gain - 1) for the gain, and write
+        them through the SPI scheduler (single SPI burst).
+        Return the list of per core (offset, gain, skew) codes.
+        """
+        code_list = []
+        for correction, addresses in zip(correction_list, address_list):
+            codes = (int(round(correction["offset"] / offset_lsb)), 
+                     int(round((correction["gain"] - 1.0) / gain_lsb)), 
+                     int(round(correction["skew"] / skew_lsb)))
+            for reg_addr, code in zip(addresses, codes):
+                reg_addr = reg_addr | EV12AQ600_WRITE_OPERATION_MASK
+                self.reg_aq600_array[reg_addr] = code & 0xFFFF
+                self.spi_schedule_aq600(reg_addr)
+            code_list.append(codes)
+        ## Start spi write operation, unless deferred...
+        self.spi_schedule_submit()
+        return code_list
+
+    ##################################################################################################################################### 
+    ## SPI command scheduler
+    ##################################################################################################################################### 
+    def spi_schedule_aq600(self, reg_addr):
+        """
+        Parameters:
+        * reg_addr : positive integer : EV12AQ600 ADC register address, see datasheet.
+        Schedule the ADC register write: address word, then data word from the ADC registers base image (reg_aq600_array).
+        """
+        if reg_addr & EV12AQ600_WRITE_OPERATION_MASK:
+            self.reg_aq600_written.add(reg_addr)
+        self.spi_schedule_list[-1].append((SPI_SLAVE_EV12AQ600, [reg_addr & 0x0000FFFF, self.reg_aq600_array[reg_addr] & 0x0000FFFF]))
+
+    def spi_schedule_pll(self, spi_command_list):
+        """
+        Parameters:
+        * spi_command_list : list of positive integers : external PLL LMX2592 24-bit SPI commands.
+        Schedule the external PLL SPI commands, sent in the list order.
+        """
+        self.spi_schedule_list[-1].append((SPI_SLAVE_EXTERNAL_PLL, [spi_command & 0x00FFFFFF for spi_command in spi_command_list]))
+
+    def spi_schedule_barrier(self):
+        """
+        The SPI commands scheduled before the barrier are sent before the SPI commands scheduled after it.
+        Without barrier, the order of the commands of a same SPI slave is kept and the external PLL commands
+        are sent before the ADC commands (ADC master clock first).
+        """
+        if self.spi_schedule_list[-1]:
+            self.spi_schedule_list.append([])
+
+    def spi_schedule_defer(self):
+        """
+        Defer the scheduled SPI commands of the configuration functions until spi_schedule_run.
+        For instance, the external PLL and ADC configuration:
+        -        spi_schedule_defer()
+        -        external_pll_configuration_6400()
+        -        ev12aq600_configuration_ramp_mode() # sent after the PLL commands
+        -        ev12aq600_sync_sampling_on_negative_edge()
+        -        spi_schedule_run()
+        """
+        self.spi_schedule_deferred = True
+
+    def spi_schedule_submit(self):
+        """
+        Run the scheduled SPI commands unless deferred by spi_schedule_defer.
+        """
+        if not self.spi_schedule_deferred:
+            self.spi_schedule_run()
+
+    def spi_schedule_run(self):
+        """
+        Send the scheduled SPI commands:
+        1- Group the commands of each phase (see spi_schedule_barrier) by SPI slave, external PLL commands first:
+           the ADC is configured once its master clock is set up.
+        2- Merge the consecutive groups of a same slave.
+        3- Send each group as one burst of UART write operations: SPI Master input FIFO words, then SPI slave 
+           select with spi_start high and spi_start low. A group longer than the FIFO is split in several bursts.
+        4- Wait for the end of the SPI transfer before the next burst.
+        Return the number of SPI Master bursts (spi_start pulses).
+        """
+        self.spi_schedule_deferred = False
+        group_list = []
+        for phase in self.spi_schedule_list:
+            for phase_slave in [SPI_SLAVE_EXTERNAL_PLL, SPI_SLAVE_EV12AQ600]:
+                word_list = [word for command_slave, command in phase if command_slave == phase_slave for word in command]
+                if not word_list:
+                    continue
+                if group_list and group_list[-1][0] == phase_slave:
+                    group_list[-1][1].extend(word_list)
+                else:
+                    group_list.append([phase_slave, word_list])
+        self.spi_schedule_list = [[]]
+        #
+        burst_cntr = 0
+        burst_length = SPI_FIFO_DEPTH - (SPI_FIFO_DEPTH % 2) # ADC commands are not split.
+        for slave, word_list in group_list:
+            reg_3 = (self.reg_array[3] & 0xFFFFFFFC) | slave
+            for idx in range(0, len(word_list), burst_length):
+                burst = word_list[idx:idx+burst_length]
+                address_data_list = [(REG_SPI_FIFO_IN_ADDRESS, word) for word in burst]
+                address_data_list.append((3, reg_3 | 0x00000002))
+                address_data_list.append((3, reg_3))
+                self.write_register_burst(address_data_list)
+                self.reg_array[3] = reg_3
+                self.reg_array[REG_SPI_FIFO_IN_ADDRESS] = burst[-1]
+                time.sleep(len(burst)*SPI_WORD_PERIOD_LIST[slave])
+                burst_cntr += 1
+            if slave == SPI_SLAVE_EXTERNAL_PLL:
+                self.external_pll_plan = list(word_list)
+        return burst_cntr
+
     #####################################################################################################################################  
     ## External PLL LMX2592
     ##################################################################################################################################### 
+    def external_pll_configuration(self, spi_command_list):
+        """
+        Parameters:
+        * spi_command_list : list of positive integers : external PLL LMX2592 24-bit SPI commands.
+        Configure external PLL LMX2592:
+        1- Schedule all SPI commands, see spi_schedule_pll.
+        2- Send all commands in a single SPI Master burst, unless deferred by spi_schedule_defer. 
+        """
+        self.spi_schedule_pll(spi_command_list)
+        self.spi_schedule_submit()
+
     def external_pll_configuration_6400(self):
         """
         Configure external PLL LMX2592 RFOUT A to generate a 6.4 GHz ADC Master CLK.
-        1- Preload all SPI commands in the SPI Master input FIFO.
-        2- Send all commands sending a spi_start pulse. 
-        """
-        self.spi_wr_fifo_in(0x00221E)
-        self.spi_wr_fifo_in(0x400077)
-        self.spi_wr_fifo_in(0x3E0000)
-        self.spi_wr_fifo_in(0x3D0001)
-        self.spi_wr_fifo_in(0x3B0000)
-        self.spi_wr_fifo_in(0x3003FC)
-        self.spi_wr_fifo_in(0x2F08CF)
-        self.spi_wr_fifo_in(0x2E17A3)
-        self.spi_wr_fifo_in(0x2D0000)
-        self.spi_wr_fifo_in(0x2C0000)
-        self.spi_wr_fifo_in(0x2B0000)
-        self.spi_wr_fifo_in(0x2A0000)
-        self.spi_wr_fifo_in(0x2903E8)
-        self.spi_wr_fifo_in(0x280000)
-        self.spi_wr_fifo_in(0x278204)
-        self.spi_wr_fifo_in(0x260040)
-        self.spi_wr_fifo_in(0x254000)
-        self.spi_wr_fifo_in(0x240811)
-        self.spi_wr_fifo_in(0x23021F)
-        self.spi_wr_fifo_in(0x22C3EA)
-        self.spi_wr_fifo_in(0x212A0A)
-        self.spi_wr_fifo_in(0x20210A)
-        self.spi_wr_fifo_in(0x1F0401)
-        self.spi_wr_fifo_in(0x1E0034)
-        self.spi_wr_fifo_in(0x1D0084)
-        self.spi_wr_fifo_in(0x1C2924)
-        self.spi_wr_fifo_in(0x190000)
-        self.spi_wr_fifo_in(0x180509)
-        self.spi_wr_fifo_in(0x178842)
-        self.spi_wr_fifo_in(0x162300)
-        self.spi_wr_fifo_in(0x14012C)
-        self.spi_wr_fifo_in(0x130965)
-        self.spi_wr_fifo_in(0x0E018C)
-        self.spi_wr_fifo_in(0x0D4000)
-        self.spi_wr_fifo_in(0x0C7001)
-        self.spi_wr_fifo_in(0x0B0018)
-        self.spi_wr_fifo_in(0x0A10D8)
-        self.spi_wr_fifo_in(0x090302)
-        self.spi_wr_fifo_in(0x081084)
-        self.spi_wr_fifo_in(0x0728B2)
-        self.spi_wr_fifo_in(0x041943)
-        self.spi_wr_fifo_in(0x020500)
-        self.spi_wr_fifo_in(0x010808)
-        self.spi_wr_fifo_in(0x00221C)
-        # Start spi write operation...
-        self.spi_start_pulse()
+        See external_pll_configuration.
+        """
+        self.external_pll_configuration(EXTERNAL_PLL_6400_LIST)
     
     ##################################################################################################################################### 
     ## External PLL LMX2592
@@ -696,55 +1016,9 @@ class ev12aq600:
     def external_pll_configuration_6250(self):
         """
         Configure external PLL LMX2592 RFOUT A to generate a 6.25 GHz ADC Master CLK.
-        1- Preload all SPI commands in the SPI Master input FIFO.
-        2- Send all commands sending a spi_start pulse. 
-        """
-        self.spi_wr_fifo_in(0x00221E) 
-        self.spi_wr_fifo_in(0x400077) 
-        self.spi_wr_fifo_in(0x3E0000) 
-        self.spi_wr_fifo_in(0x3D0001) 
-        self.spi_wr_fifo_in(0x3B0000) 
-        self.spi_wr_fifo_in(0x3003FC) 
-        self.spi_wr_fifo_in(0x2F08CF) 
-        self.spi_wr_fifo_in(0x2E17A3) 
-        self.spi_wr_fifo_in(0x2D00FA) 
-        self.spi_wr_fifo_in(0x2C0000) 
-        self.spi_wr_fifo_in(0x2B0000) 
-        self.spi_wr_fifo_in(0x2A0000) 
-        self.spi_wr_fifo_in(0x2903E8) 
-        self.spi_wr_fifo_in(0x280000) 
-        self.spi_wr_fifo_in(0x278204) 
-        self.spi_wr_fifo_in(0x26003E) 
-        self.spi_wr_fifo_in(0x254000) 
-        self.spi_wr_fifo_in(0x240811) 
-        self.spi_wr_fifo_in(0x23021F) 
-        self.spi_wr_fifo_in(0x22C3EA) 
-        self.spi_wr_fifo_in(0x212A0A) 
-        self.spi_wr_fifo_in(0x20210A) 
-        self.spi_wr_fifo_in(0x1F0401) 
-        self.spi_wr_fifo_in(0x1E0034) 
-        self.spi_wr_fifo_in(0x1D0084) 
-        self.spi_wr_fifo_in(0x1C2924) 
-        self.spi_wr_fifo_in(0x190000) 
-        self.spi_wr_fifo_in(0x180509) 
-        self.spi_wr_fifo_in(0x178842) 
-        self.spi_wr_fifo_in(0x162300) 
-        self.spi_wr_fifo_in(0x14012C) 
-        self.spi_wr_fifo_in(0x130965) 
-        self.spi_wr_fifo_in(0x0E018C) 
-        self.spi_wr_fifo_in(0x0D4000) 
-        self.spi_wr_fifo_in(0x0C7001) 
-        self.spi_wr_fifo_in(0x0B0018) 
-        self.spi_wr_fifo_in(0x0A10D8) 
-        self.spi_wr_fifo_in(0x090302) 
-        self.spi_wr_fifo_in(0x081084) 
-        self.spi_wr_fifo_in(0x0728B2) 
-        self.spi_wr_fifo_in(0x041943) 
-        self.spi_wr_fifo_in(0x020500) 
-        self.spi_wr_fifo_in(0x010808) 
-        self.spi_wr_fifo_in(0x00221C) 
-        # Start spi write operation...
-        self.spi_start_pulse()
+        See external_pll_configuration.
+        """
+        self.external_pll_configuration(EXTERNAL_PLL_6250_LIST)
             
     ##################################################################################################################################### 
     ## External PLL LMX2592
@@ -752,52 +1026,431 @@ class ev12aq600:
     def external_pll_configuration_5000(self):
         """
         Configure external PLL LMX2592 RFOUT A to generate a 5 GHz ADC Master CLK.
-        1- Preload all SPI commands in the SPI Master input FIFO.
-        2- Send all commands sending a spi_start pulse. 
-        """
-        self.spi_wr_fifo_in(0x00221E)
-        self.spi_wr_fifo_in(0x400077)
-        self.spi_wr_fifo_in(0x3E0000)
-        self.spi_wr_fifo_in(0x3D0001)
-        self.spi_wr_fifo_in(0x3B0000)
-        self.spi_wr_fifo_in(0x3003FC)
-        self.spi_wr_fifo_in(0x2F08CF)
-        self.spi_wr_fifo_in(0x2E17A3)
-        self.spi_wr_fifo_in(0x2D0000)
-        self.spi_wr_fifo_in(0x2C0000)
-        self.spi_wr_fifo_in(0x2B0000)
-        self.spi_wr_fifo_in(0x2A0000)
-        self.spi_wr_fifo_in(0x2903E8)
-        self.spi_wr_fifo_in(0x280000)
-        self.spi_wr_fifo_in(0x278204)
-        self.spi_wr_fifo_in(0x260032)
-        self.spi_wr_fifo_in(0x254000)
-        self.spi_wr_fifo_in(0x240011)
-        self.spi_wr_fifo_in(0x23021F)
-        self.spi_wr_fifo_in(0x22C3EA)
-        self.spi_wr_fifo_in(0x212A0A)
-        self.spi_wr_fifo_in(0x20210A)
-        self.spi_wr_fifo_in(0x1F0401)
-        self.spi_wr_fifo_in(0x1E0034)
-        self.spi_wr_fifo_in(0x1D0084)
-        self.spi_wr_fifo_in(0x1C2924)
-        self.spi_wr_fifo_in(0x190000)
-        self.spi_wr_fifo_in(0x180509)
-        self.spi_wr_fifo_in(0x178842)
-        self.spi_wr_fifo_in(0x162300)
-        self.spi_wr_fifo_in(0x14012C)
-        self.spi_wr_fifo_in(0x130965)
-        self.spi_wr_fifo_in(0x0E018C)
-        self.spi_wr_fifo_in(0x0D4000)
-        self.spi_wr_fifo_in(0x0C7001)
-        self.spi_wr_fifo_in(0x0B0018)
-        self.spi_wr_fifo_in(0x0A10D8)
-        self.spi_wr_fifo_in(0x090302)
-        self.spi_wr_fifo_in(0x081084)
-        self.spi_wr_fifo_in(0x0728B2)
-        self.spi_wr_fifo_in(0x041943)
-        self.spi_wr_fifo_in(0x020500)
-        self.spi_wr_fifo_in(0x010808)
-        self.spi_wr_fifo_in(0x00221C) 
-        # Start spi write operation...
-        self.spi_start_pulse()
+        See external_pll_configuration.
+        """
+        self.external_pll_configuration(EXTERNAL_PLL_5000_LIST)
+
+    ##################################################################################################################################### 
+    ## SYNC timing calibration
+    ##################################################################################################################################### 
+    def sync_probe(self, tap):
+        """
+        Parameters:
+        * tap : range 0 to 511 : Positive integer, SYNC output ODELAYE3 tap value.
+        Set the SYNC delay, reset the EV12AQ600 SYNC flag, send a SYNC pulse and read the SYNC flag.
+        Return True when the SYNC has been correctly recovered (no timing violation).
+        """
+        self.set_sync_odelay(tap)
+        self.ev12aq600_reset_sync_flag()
+        self.sync_pulse()
+        rcv = self.ev12aq600_get_sync_flag()
+        return rcv is not None and (rcv & 0x1) == 0
+
+    def sync_calibration(self, board_id=None, temperature=None, cache_file=SYNC_CALIBRATION_CACHE_FILE, coarse_step=SYNC_CALIBRATION_COARSE_STEP):
+        """
+        Parameters:
+        * board_id    : string : board identifier, calibration cache key.
+        * temperature : float  : board temperature [degree C], calibration cache key (SYNC_CALIBRATION_TEMPERATURE_STEP bucket).
+        * cache_file  : string : calibration cache file path (json).
+        * coarse_step : positive integer : sync_eye_search coarse step [taps].
+        SYNC timing calibration, sweep ADC SYNC sampling edge x SYNC ODELAYE3 tap:
+        1- When board_id and temperature are provided and a cached calibration exists, apply it and check it with
+           a single SYNC probe.
+        2- Else, for each sampling edge, search the SYNC timing eye (see sync_eye_search), keep the edge with the 
+           largest margin, apply the eye centre and update the cache.
+        Return a dictionary {"edge": "positive" or "negative", "tap": eye centre, "margin": taps, "eye": [first, last]},
+        and "cache": cache key when the cached calibration is applied, None when no valid SYNC timing has been found.
+        See sync_calibration_summary.
+        """
+        cache = {}
+        key = None
+        if board_id is not None and temperature is not None:
+            key = "%s/%d" %(board_id, temperature // SYNC_CALIBRATION_TEMPERATURE_STEP)
+            if os.path.exists(cache_file):
+                with open(cache_file) as f:
+                    cache = json.load(f)
+            if key in cache:
+                result = cache[key]
+                self.sync_sampling_edge(result["edge"])
+                if self.sync_probe(result["tap"]):
+                    return dict(result, cache=key)
+        #
+        result = None
+        for edge in SYNC_SAMPLING_EDGE_LIST:
+            self.sync_sampling_edge(edge)
+            eye = sync_eye_search(self.sync_probe, SYNC_ODELAY_TAP_MAX, coarse_step)
+            if eye is not None:
+                margin = (eye[1] - eye[0]) // 2
+                if result is None or margin > result["margin"]:
+                    result = {"edge": edge, "tap": (eye[0] + eye[1]) // 2, "margin": margin, "eye": list(eye)}
+        if result is None:
+            logging.error("-- SYNC calibration: no valid SYNC timing")
+            return None
+        self.sync_sampling_edge(result["edge"])
+        self.set_sync_odelay(result["tap"])
+        if key is not None:
+            cache[key] = result
+            if os.path.dirname(cache_file):
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(cache_file, "w") as f:
+                json.dump(cache, f, indent=2)
+        return result
+
+    def sync_sampling_edge(self, edge):
+        """
+        Parameters:
+        * edge : string : "positive" or "negative", EV12AQ600 SYNC sampling edge.
+        """
+        if edge == "negative":
+            self.ev12aq600_sync_sampling_on_negative_edge()
+        else:
+            self.ev12aq600_sync_sampling_on_positive_edge()
+
+    ##################################################################################################################################### 
+    ## Bit error rate measurement
+    ##################################################################################################################################### 
+    def rst_check_rearm(self):
+        """
+        rst_check_pulse without delay, the set and unset register write operations are sent in a single burst.
+        """
+        reg_addr = 2
+        reg_data = self.reg_array[reg_addr]
+        self.write_register_burst([(reg_addr, reg_data | 0x2), (reg_addr, reg_data & ~0x2)])
+        self.reg_array[reg_addr] = reg_data & ~0x2
+
+    def ber_measurement(self, pattern="ramp", target=BER_TARGET, confidence=BER_CONFIDENCE, poll_interval=BER_POLL_INTERVAL, timeout=BER_TIMEOUT, lane_rate=LANE_RATE):
+        """
+        Parameters:
+        * pattern       : string : "ramp" or "pattern0", EV12AQ600 test pattern and RX data check mode.
+        * target        : float  : target bit error rate.
+        * confidence    : float  : confidence level of the decisions and of the reported intervals.
+        * poll_interval : float  : lane status polling period [s].
+        * timeout       : float  : maximum measurement duration [s].
+        * lane_rate     : float  : HSSL lane rate [bps].
+        Per lane bit error rate measurement with sequential early stopping (see ber.ber_test):
+        the lane status (register 18) is polled every poll_interval and the data check is re-armed, each lane
+        is tested until the target BER is proven (decision "pass") or disproven (decision "fail") at the 
+        confidence level, the measurement stops when all the lanes are decided or at timeout.
+        The link must be synchronized (see sync_pulse).
+        Return the list of lane result dictionaries {"decision", "bits", "intervals", "error_intervals", "ber": [lower, upper]},
+        None when the link is not valid, see ber.ber_summary.
+        """
+        if pattern == "pattern0":
+            self.ev12aq600_configuration_pattern0_mode()
+            self.pattern0_check_enable()
+        else:
+            self.ev12aq600_configuration_ramp_mode()
+            self.ramp_check_enable()
+        test_list = [ber_test(target, confidence) for lane in range(NB_LANES)]
+        start = time.time()
+        self.rst_check_rearm()
+        last = time.time()
+        while True:
+            time.sleep(poll_interval)
+            be_list, cb_list, valid = self.get_lane_status()
+            self.rst_check_rearm()
+            now = time.time()
+            if not valid:
+                logging.error("-- BER measurement: link not valid, synchronize the link first")
+                return None
+            bits = (now - last) * lane_rate
+            last = now
+            for lane, test in enumerate(test_list):
+                test.update(bits, be_list[lane] or cb_list[lane])
+            if all(test.decision != "undecided" for test in test_list) or now - start >= timeout:
+                break
+        return [test.result() for test in test_list]
+
+    ##################################################################################################################################### 
+    ## Link resync cycle
+    ##################################################################################################################################### 
+    def resync_cycle(self, settle=RESYNC_SETTLE, dwell=RESYNC_DWELL, timeOut=RESYNC_TIMEOUT):
+        """
+        Parameters:
+        * settle  : float : delay between the reset and the SYNC pulse [s].
+        * dwell   : float : data check duration [s].
+        * timeOut : float : link ready timeout [s].
+        Link resync cycle: reset, SYNC counter training mode, SYNC pulse, link ready, data check reset and data check status.
+        The register write operations of each step are sent in a single burst, link ready is polled (SYNC counter
+        not busy and valid status, registers 11 and 18 read in a single burst) instead of fixed delays.
+        Return {"outcome": RESYNC_OUTCOME_LIST index, "ready": SYNC to link ready time [s], "latency": SYNC counter,
+        "be": bit error lanes mask, "cb": clock bit error lanes mask, "duration": cycle duration [s]}.
+        """
+        start = time.time()
+        reg_2 = self.reg_array[2] & ~0x3
+        self.reg_array[5] = self.reg_array[5] | 0x1
+        self.reg_array[6] = self.reg_array[6] & ~0x1
+        self.write_register_burst([(2, reg_2 | 0x1), (2, reg_2), (5, self.reg_array[5])])
+        self.reg_array[2] = reg_2
+        if settle:
+            time.sleep(settle)
+        self.write_register_burst([(6, self.reg_array[6] | 0x1), (6, self.reg_array[6])])
+        sync = time.time()
+        result = {"outcome": RESYNC_NOT_READY, "ready": None, "latency": None, "be": 0, "cb": 0}
+        while time.time() - sync < timeOut:
+            reg_11, reg_18 = self.read_register_burst([11, REG_LANE_STATUS_ADDRESS])
+            if reg_11 is not None and reg_18 is not None and not reg_11 & SYNC_COUNTER_BUSY_MASK and reg_18 & LANE_STATUS_VALID_MASK:
+                result["ready"] = time.time() - sync
+                result["latency"] = reg_11 & SYNC_COUNTER_MASK
+                break
+        if result["ready"] is not None:
+            self.rst_check_rearm()
+            if dwell:
+                time.sleep(dwell)
+            be_list, cb_list, valid = self.get_lane_status()
+            result["be"] = sum(1 << lane for lane, error in enumerate(be_list) if error)
+            result["cb"] = sum(1 << lane for lane, error in enumerate(cb_list) if error)
+            result["outcome"] = RESYNC_LINK_LOST if not valid else RESYNC_ERRORS if result["be"] or result["cb"] else RESYNC_PASS
+        result["duration"] = time.time() - start
+        return result
+
+    ##################################################################################################################################### 
+    ## Deterministic latency
+    ##################################################################################################################################### 
+    def latency_check(self, iterations=100, capture=None, **kwargs):
+        """
+        Parameters:
+        * iterations : positive integer : number of resync iterations.
+        * capture    : function : capture() returns the decoded ramp frames (cycles, lanes, frames) captured after the 
+                       SYNC (ILA export, see capture.capture_open), None to check the SYNC counter only.
+        * kwargs     : resync_cycle parameters (settle, dwell, timeOut).
+        Deterministic latency check, at each iteration: link resync cycle (resync_cycle: reset, SYNC pulse in training
+        mode, link ready and data check), then, when the link is ready, SYNC counter value (SYNC to lanes ready) and
+        lane skews (latency.lane_skew_ramp) of the captured ramp.
+        Return the latency statistics (latency.latency_statistics, see latency.latency_summary) and the iteration records
+        (resync_cycle result and "skew").
+        """
+        from latency import latency_statistics, lane_skew_ramp
+        record_list = []
+        for iteration in range(iterations):
+            record = self.resync_cycle(**kwargs)
+            ready = record["outcome"] != RESYNC_NOT_READY
+            record["skew"] = lane_skew_ramp(capture()) if capture is not None and ready else None
+            record_list.append(record)
+        return latency_statistics(record_list), record_list
+
+    ##################################################################################################################################### 
+    ## Configuration snapshot
+    ##################################################################################################################################### 
+    def get_snapshot(self):
+        """
+        Return the device state as a snapshot dictionary:
+        -       reg_array  : FPGA registers base image, pulse bits and SPI FIFO data cleared (SNAPSHOT_REG_MASK_LIST)
+        -       reg_aq600  : ADC registers written through SPI {address: value}
+        -       pll_plan   : external PLL LMX2592 SPI commands
+        -       spi_slave  : selected SPI slave
+        """
+        snapshot = {}
+        snapshot["reg_array"] = [data & mask for data, mask in zip(self.reg_array, SNAPSHOT_REG_MASK_LIST)]
+        snapshot["reg_aq600"] = {addr: self.reg_aq600_array[addr] for addr in sorted(self.reg_aq600_written)}
+        snapshot["pll_plan"] = list(self.external_pll_plan)
+        snapshot["spi_slave"] = self.reg_array[3] & 0x00000001
+        return snapshot
+
+    def update_reg_array(self):
+        """
+        Read back the FPGA writable and readable registers (REG_READ_BACK_LIST) and update 
+        the FPGA registers base image (reg_array), pulse bits excepted.
+        """
+        read_list = self.read_register_burst(REG_READ_BACK_LIST)
+        for reg_addr, data in zip(REG_READ_BACK_LIST, read_list):
+            if data is not None:
+                self.reg_array[reg_addr] = data & SNAPSHOT_REG_MASK_LIST[reg_addr]
+
+    def snapshot_save(self, filename):
+        """
+        Parameters:
+        * filename : string : snapshot file path.
+        Save the device state in a snapshot file, see snapshot_pack.
+        """
+        with open(filename, "wb") as f:
+            f.write(snapshot_pack(self.get_snapshot()))
+        print("-- Snapshot saved... %s" %(filename))
+
+    def snapshot_load(self, filename):
+        """
+        Parameters:
+        * filename : string : snapshot file path.
+        Return the snapshot dictionary read from a snapshot file, see snapshot_unpack.
+        """
+        with open(filename, "rb") as f:
+            return snapshot_unpack(f.read())
+
+    def snapshot_restore(self, snapshot, live=None):
+        """
+        Parameters:
+        * snapshot : dictionary : snapshot to restore, see get_snapshot and snapshot_load.
+        * live     : dictionary : known device state, used for the state which can't be read back 
+                                  (write only FPGA registers and external PLL). When None, this state is written.
+        Restore the device state writing only the differences with the live state:
+        1- Read back FPGA registers, write board registers (clock selection, power, resets).
+        2- Write the external PLL LMX2592 plan when different, then reset the ADC (pulse skipped when the snapshot
+           holds the ADC in reset: the restored aq600_rstn value is kept).
+        3- Read back ADC registers (bulk read), write the different ones in a single SPI burst.
+        4- Write RX IP and SYNC configuration registers, then select the snapshot SPI slave.
+        Return the number of FPGA registers, external PLL SPI commands and ADC registers written.
+        """
+        diff_cntr = 0
+        live_reg_array = list(self.reg_array) if live is None else list(live["reg_array"])
+        read_list = self.read_register_burst(REG_READ_BACK_LIST)
+        for reg_addr, data in zip(REG_READ_BACK_LIST, read_list):
+            if data is not None:
+                live_reg_array[reg_addr] = data
+        # write only registers are written when unknown
+        unknown_list = [] if live is not None else [reg_addr for reg_addr in range(REG_NUMBER) if reg_addr not in REG_READ_BACK_LIST]
+        #
+        def reg_diff_list(reg_list):
+            address_data_list = []
+            for reg_addr in reg_list:
+                mask = SNAPSHOT_REG_MASK_LIST[reg_addr]
+                data = snapshot["reg_array"][reg_addr] & mask
+                if reg_addr in unknown_list or (live_reg_array[reg_addr] & mask) != data:
+                    address_data_list.append((reg_addr, data))
+                self.reg_array[reg_addr] = data
+            return address_data_list
+        #
+        ## 1- Board registers
+        address_data_list = reg_diff_list(SNAPSHOT_BOARD_REG_LIST)
+        if address_data_list:
+            diff_cntr += self.write_register_burst(address_data_list)
+        self.reg_array[3] = live_reg_array[3] & SNAPSHOT_REG_MASK_LIST[3]
+        ## 2- External PLL
+        live_pll_plan = None if live is None else list(live["pll_plan"])
+        adc_reset = False
+        if snapshot["pll_plan"] and snapshot["pll_plan"] != live_pll_plan:
+            self.spi_ss_external_pll()
+            self.write_register_burst([(REG_SPI_FIFO_IN_ADDRESS, spi_command) for spi_command in snapshot["pll_plan"]])
+            self.spi_fifo_in_list = list(snapshot["pll_plan"])
+            self.spi_start_pulse()
+            # ADC reset pulse, unless the snapshot holds the ADC in reset (already written with the board registers)
+            rstn = FIELD_DICT["aq600_rstn"]
+            if snapshot["reg_array"][rstn.address] & rstn.mask:
+                self.ev12aq600_rstn_pulse()
+            diff_cntr += len(snapshot["pll_plan"])
+            adc_reset = True
+        self.external_pll_plan = list(snapshot["pll_plan"])
+        ## 3- ADC registers
+        if snapshot["reg_aq600"]:
+            if adc_reset:
+                live_aq600 = {}
+            else:
+                live_aq600 = self.ev12aq600_get_register_values(list(snapshot["reg_aq600"]))
+            fifo_in_list = []
+            for reg_addr, data in snapshot["reg_aq600"].items():
+                self.reg_aq600_array[reg_addr] = data
+                self.reg_aq600_written.add(reg_addr)
+                if live_aq600.get(reg_addr & EV12AQ600_READ_OPERATION_MASK) != data:
+                    fifo_in_list.append((REG_SPI_FIFO_IN_ADDRESS, reg_addr))
+                    fifo_in_list.append((REG_SPI_FIFO_IN_ADDRESS, data))
+            if fifo_in_list:
+                if (self.reg_array[3] & 0x00000001) == SPI_SLAVE_EXTERNAL_PLL:
+                    self.spi_ss_ev12aq600()
+                diff_cntr += self.write_register_burst(fifo_in_list) // 2
+                self.spi_start_pulse()
+        ## 4- RX IP and SYNC configuration, SPI slave select
+        address_data_list = reg_diff_list(SNAPSHOT_LINK_REG_LIST)
+        if (self.reg_array[3] & 0x00000001) != snapshot["spi_slave"]:
+            address_data_list.append((3, (self.reg_array[3] & 0xFFFFFFFE) | snapshot["spi_slave"]))
+            self.reg_array[3] = address_data_list[-1][1]
+        if address_data_list:
+            diff_cntr += self.write_register_burst(address_data_list)
+        if adc_reset:
+            time.sleep(0.5)
+            self.esistream_reset_pulse()
+        print("-- Snapshot restored... %d differences written" %(diff_cntr))
+        return diff_cntr
+
+## FUNCTIONS:
+def register_dump_lines(rcv):
+    """
+    Return the register dump lines of a {address: value} dictionary (ev12aq600_dump_registers).
+    """
+    return ["0x%04X : error" %(addr) if value is None else "0x%04X : 0x%04X" %(addr, value) for addr, value in rcv.items()]
+
+def sync_calibration_summary(result):
+    """
+    Return the one line summary of sync_calibration.
+    """
+    if result is None:
+        return "SYNC calibration: no valid SYNC timing"
+    return "SYNC calibration%s: %s edge, tap %d, margin %d" %(" (cache %s)" %(result["cache"]) if "cache" in result else "",
+                                                             result["edge"], result["tap"], result["margin"])
+
+def sync_eye_search(probe, tap_max=SYNC_ODELAY_TAP_MAX, coarse_step=SYNC_CALIBRATION_COARSE_STEP):
+    """
+    Parameters:
+    * probe       : function : probe(tap) returns True when the SYNC timing is valid for this tap.
+    * tap_max     : positive integer : last tap value.
+    * coarse_step : positive integer : coarse search step [taps].
+    Coarse-to-fine search of the SYNC timing eye:
+    1- Coarse scan: probe every coarse_step taps (and tap_max).
+    2- Fine search: binary search of each pass/fail transition between two coarse probes.
+    3- Return the largest run of valid taps [first, last] (None when no valid tap), the taps between 
+       two valid probes are valid.
+    About tap_max/coarse_step + 2*log2(coarse_step) probes per transition instead of tap_max+1 probes.
+    """
+    results = {}
+    tap_list = list(range(0, tap_max+1, coarse_step))
+    if tap_list[-1] != tap_max:
+        tap_list.append(tap_max)
+    for tap in tap_list:
+        results[tap] = probe(tap)
+    for lo, hi in zip(tap_list[:-1], tap_list[1:]):
+        if results[lo] != results[hi]:
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                results[mid] = probe(mid)
+                if results[mid] == results[lo]:
+                    lo = mid
+                else:
+                    hi = mid
+    eye = None
+    first = None
+    for tap in sorted(results):
+        if results[tap]:
+            if first is None:
+                first = tap
+            if eye is None or tap - first > eye[1] - eye[0]:
+                eye = (first, tap)
+        else:
+            first = None
+    return eye
+
+def snapshot_pack(snapshot):
+    """
+    Parameters:
+    * snapshot : dictionary : see ev12aq600.get_snapshot.
+    Snapshot binary format (big endian), version 1:
+    -       header    : magic 'AQ6S' (4 bytes), version (1 byte), SPI slave select (1 byte)
+    -       reg_array : REG_NUMBER x 32-bit FPGA register values
+    -       pll_plan  : 16-bit commands number, then 32-bit external PLL SPI commands
+    -       reg_aq600 : 32-bit registers number, then (16-bit address, 16-bit value) ADC registers
+    """
+    data = struct.pack(SNAPSHOT_HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, snapshot["spi_slave"])
+    data += struct.pack(">%dI" %(REG_NUMBER), *snapshot["reg_array"])
+    data += struct.pack(">H%dI" %(len(snapshot["pll_plan"])), len(snapshot["pll_plan"]), *snapshot["pll_plan"])
+    data += struct.pack(">I", len(snapshot["reg_aq600"]))
+    for addr, value in snapshot["reg_aq600"].items():
+        data += struct.pack(">HH", addr, value & 0xFFFF)
+    return data
+
+def snapshot_unpack(data):
+    """
+    Parameters:
+    * data : bytes : snapshot binary format, see snapshot_pack.
+    Return the snapshot dictionary.
+    """
+    magic, version, spi_slave = struct.unpack_from(SNAPSHOT_HEADER_FORMAT, data, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError("-- Error: snapshot format %s version %d not supported" %(magic, version))
+    offset = struct.calcsize(SNAPSHOT_HEADER_FORMAT)
+    snapshot = {"spi_slave": spi_slave}
+    snapshot["reg_array"] = list(struct.unpack_from(">%dI" %(REG_NUMBER), data, offset))
+    offset += 4*REG_NUMBER
+    (length,) = struct.unpack_from(">H", data, offset)
+    snapshot["pll_plan"] = list(struct.unpack_from(">%dI" %(length), data, offset+2))
+    offset += 2 + 4*length
+    (length,) = struct.unpack_from(">I", data, offset)
+    values = struct.unpack_from(">%dH" %(2*length), data, offset+4)
+    snapshot["reg_aq600"] = dict(zip(values[0::2], values[1::2]))
+    return snapshot
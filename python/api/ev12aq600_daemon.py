@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+import os
+import sys
+import json
+import math
+import queue
+import signal
+import socket
+import logging
+import threading
+import socketserver
+
+## CONSTANTS:
+DAEMON_SOCKET_PATH = os.environ.get("EV12AQ600_DAEMON_SOCKET", "/tmp/ev12aq600.sock")
+DAEMON_METHODS = "__methods__"
+DAEMON_GETATTR = "__getattr__"
+DAEMON_LOCAL_METHODS = ["start_serial", "stop_serial"] # The daemon owns the serial session.
+# JSON message tags of the values without a JSON type.
+MESSAGE_TUPLE = "__tuple__"
+MESSAGE_DICT = "__dict__" # Dictionary with non-string keys, list of [key, value] items.
+MESSAGE_FLOAT = "__float__" # inf, -inf and nan.
+MESSAGE_TAG_LIST = [MESSAGE_TUPLE, MESSAGE_DICT, MESSAGE_FLOAT]
+
+## FUNCTIONS:
+def connect(socket_path=DAEMON_SOCKET_PATH):
+    """
+    Parameters:
+    * socket_path : string : daemon Unix socket path.
+    Return an ev12aq600_client connected to the daemon when it is running,
+    else a local ev12aq600 object (the script opens its own serial session).
+    """
+    if hasattr(socket, "AF_UNIX") and os.path.exists(socket_path):
+        try:
+            return ev12aq600_client(socket_path)
+        except OSError:
+            logging.warning("-- ev12aq600 daemon not reachable: %s" %(socket_path))
+    from ev12aq600 import ev12aq600
+    return ev12aq600()
+
+def encode_value(value):
+    """
+    Return value with JSON types only: tuples, dictionaries with non-string keys and non-finite floats are
+    tagged (MESSAGE_TAG_LIST), NumPy scalars and arrays are converted to Python numbers and lists.
+    """
+    if isinstance(value, float):
+        return float(value) if math.isfinite(value) else {MESSAGE_FLOAT: repr(float(value))}
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, list):
+        return [encode_value(item) for item in value]
+    if isinstance(value, tuple):
+        return {MESSAGE_TUPLE: [encode_value(item) for item in value]}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) and key not in MESSAGE_TAG_LIST for key in value):
+            return {key: encode_value(item) for key, item in value.items()}
+        return {MESSAGE_DICT: [[encode_value(key), encode_value(item)] for key, item in value.items()]}
+    if hasattr(value, "tolist"):
+        return encode_value(value.tolist())
+    raise TypeError("%s value cannot be sent" %(type(value).__name__))
+
+def decode_object(value):
+    if len(value) == 1:
+        tag, item = next(iter(value.items()))
+        if tag == MESSAGE_TUPLE:
+            return tuple(item)
+        if tag == MESSAGE_DICT:
+            return {key: item for key, item in item}
+        if tag == MESSAGE_FLOAT:
+            return float(item)
+    return value
+
+def encode(message):
+    """
+    Messages are JSON lines, see encode_value.
+    """
+    return (json.dumps(encode_value(message), allow_nan=False) + "\n").encode()
+
+def decode(line):
+    return json.loads(line.decode(), object_hook=decode_object)
+
+## CLASS:
+class ev12aq600_client:
+    """
+    Thin client of the ev12aq600 daemon, same API as the ev12aq600 class:
+    each method call is sent to the daemon and executed on its ev12aq600 object.
+    Attributes (reg_array, reg_aq600_array, ...) are read from the daemon, a missing attribute raises
+    AttributeError (hasattr and getattr with a default work as with ev12aq600).
+    """
+    def __init__(self, socket_path=DAEMON_SOCKET_PATH):
+        self.socket_path = socket_path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self.sock_file = self.sock.makefile("rb")
+        self.methods = self.call(DAEMON_METHODS)
+
+    def call(self, method, *args, **kwargs):
+        self.sock.sendall(encode((method, args, kwargs)))
+        line = self.sock_file.readline()
+        if not line:
+            raise ConnectionError("-- Error: ev12aq600 daemon connection closed")
+        result, error, error_type = decode(line)
+        if error is not None:
+            raise AttributeError(error) if error_type == "AttributeError" else RuntimeError(error)
+        return result
+
+    def __getattr__(self, name):
+        # private and special names (copy, pickle protocols...) are not forwarded, as ev12aq600 does not define them
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self.__dict__.get("methods", []):
+            return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+        return self.call(DAEMON_GETATTR, name)
+
+    def start_serial(self, *args, **kwargs):
+        print("-- ev12aq600 daemon connected... %s" %(self.socket_path))
+
+    def stop_serial(self):
+        self.sock_file.close()
+        self.sock.close()
+        print("-- ev12aq600 daemon disconnected... %s" %(self.socket_path))
+
+class ev12aq600_request_handler(socketserver.StreamRequestHandler):
+    """
+    Read the client requests and wait for their execution by the daemon command queue.
+    """
+    def handle(self):
+        for line in self.rfile:
+            try:
+                method, args, kwargs = decode(line)
+            except (ValueError, TypeError) as e:
+                self.wfile.write(encode((None, "-- Error: invalid request %s" %(e), type(e).__name__)))
+                continue
+            done = threading.Event()
+            response = []
+            self.server.command_queue.put((method, args, kwargs, response, done))
+            done.wait()
+            try:
+                line = encode(response[0])
+            except (TypeError, ValueError) as e:
+                logging.error("-- ev12aq600 daemon: %s %r" %(method, e))
+                line = encode((None, "%s: %r" %(method, e), type(e).__name__))
+            self.wfile.write(line)
+
+class ev12aq600_daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Own the serial session and the ev12aq600 object (FPGA and ADC registers base images) and serve the
+    commands of several clients over a local Unix socket.
+    Commands are executed one at a time from a single queue, a client never reads
+    the UART response of another client's command.
+    """
+    daemon_threads = True
+
+    def __init__(self, app, socket_path=DAEMON_SOCKET_PATH):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        # socket created owner only (no window with a world accessible socket between bind and chmod)
+        umask = os.umask(0o177)
+        try:
+            socketserver.UnixStreamServer.__init__(self, socket_path, ev12aq600_request_handler)
+        finally:
+            os.umask(umask)
+        self.app = app
+        self.socket_path = socket_path
+        self.command_queue = queue.Queue()
+        self.worker = threading.Thread(target=self.execute, daemon=True)
+        self.worker.start()
+
+    def execute(self):
+        while True:
+            method, args, kwargs, response, done = self.command_queue.get()
+            try:
+                if method == DAEMON_METHODS:
+                    result = [name for name in dir(self.app) if not name.startswith("_") and callable(getattr(self.app, name))]
+                    result = [name for name in result if name not in DAEMON_LOCAL_METHODS]
+                elif method == DAEMON_GETATTR:
+                    result = getattr(self.app, args[0])
+                elif method in DAEMON_LOCAL_METHODS or method.startswith("_"):
+                    raise AttributeError("method %s not available through the daemon" %(method))
+                else:
+                    result = getattr(self.app, method)(*args, **kwargs)
+                response.append((result, None, None))
+            except Exception as e:
+                # attribute lookups failing is the client hasattr/getattr default case, not an error
+                if not (method == DAEMON_GETATTR and isinstance(e, AttributeError)):
+                    logging.error("-- ev12aq600 daemon: %s %r" %(method, e))
+                response.append((None, "%s: %r" %(method, e), type(e).__name__))
+            done.set()
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+## MAIN:
+if __name__ == "__main__":
+    # python ev12aq600_daemon.py [serial port] [socket path]
+    from ev12aq600 import ev12aq600, SERIAL_PORT
+    port = sys.argv[1] if len(sys.argv) > 1 else SERIAL_PORT
+    socket_path = sys.argv[2] if len(sys.argv) > 2 else DAEMON_SOCKET_PATH
+    app=ev12aq600()
+    app.start_serial(port)
+    server = ev12aq600_daemon(app, socket_path)
+    print("-- ev12aq600 daemon listening... %s" %(socket_path))
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    server.server_close()
+    app.stop_serial()
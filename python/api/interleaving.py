@@ -0,0 +1,104 @@
+import os
+import sys
+import numpy as np
+
+## CONSTANTS:
+NB_CORES = 4 # EV12AQ600 interleaved cores A, B, C, D.
+INTERLEAVING_FS = 6.4e9 # [Sps]
+INTERLEAVING_CHUNK = 2**20 # Samples per chunk, multiple of NB_CORES.
+INTERLEAVING_FREQUENCY_SAMPLES = 2**16 # Samples used to estimate the input frequency.
+INTERLEAVING_FREQUENCY_ITERATIONS = 4 # Four-parameter sine fit iterations.
+
+## FUNCTIONS:
+def estimate_frequency(samples, iterations=INTERLEAVING_FREQUENCY_ITERATIONS):
+    """
+    Parameters:
+    * samples    : array   : input sine wave samples.
+    * iterations : integer : four-parameter sine fit iterations.
+    Return the normalized angular frequency [rad/sample]: Hann windowed FFT peak with parabolic interpolation,
+    then four-parameter least-squares sine fit (IEEE 1057).
+    """
+    x = np.asarray(samples, dtype=float)
+    n = np.arange(x.size)
+    spectrum = np.abs(np.fft.rfft((x - x.mean()) * np.hanning(x.size)))
+    spectrum[0] = 0
+    k = int(np.argmax(spectrum[:-1]))
+    k = max(k, 1)
+    a, b, c = np.log(spectrum[k-1:k+2] + 1e-30)
+    omega = 2 * np.pi * (k + 0.5 * (a - c) / (a - 2 * b + c)) / x.size
+    cos, sin = np.cos(omega * n), np.sin(omega * n)
+    a, b, _ = np.linalg.lstsq(np.column_stack((cos, sin, np.ones(x.size))), x, rcond=None)[0]
+    for _ in range(iterations):
+        # d/domega of a*cos + b*sin
+        derivative = n * (b * cos - a * sin)
+        a, b, _, delta = np.linalg.lstsq(np.column_stack((cos, sin, np.ones(x.size), derivative)), x, rcond=None)[0]
+        omega += delta
+        cos, sin = np.cos(omega * n), np.sin(omega * n)
+    return omega
+
+def mismatch_estimate(samples, fs=INTERLEAVING_FS, nb_cores=NB_CORES, omega=None, chunk=INTERLEAVING_CHUNK):
+    """
+    Parameters:
+    * samples  : array   : reconstructed sample stream (see capture.py), sample n from core n % nb_cores,
+                           sine wave input.
+    * fs       : float   : sampling frequency [Sps].
+    * nb_cores : integer : number of interleaved cores.
+    * omega    : float   : normalized angular frequency [rad/sample], estimated when None.
+    * chunk    : integer : samples per chunk.
+    Per core three-parameter sine fit, x[n] = a*cos(omega*n) + b*sin(omega*n) + c for n = core (mod nb_cores):
+    the least-squares normal equations of all the cores are accumulated chunk by chunk, exp(1j*omega*n) is
+    computed once for a chunk, the sums of the next chunks are rotated by exp(1j*omega*start).
+    Return the mismatch table, one dictionary per core:
+    {"offset" [LSB], "gain" (relative to the cores mean amplitude), "skew" [s] (relative to the cores mean phase)}.
+    """
+    if omega is None:
+        omega = estimate_frequency(samples[:INTERLEAVING_FREQUENCY_SAMPLES])
+    if abs(np.sin(omega * nb_cores / 2)) < 1e-3:
+        raise ValueError("input frequency multiple of fs/%d, core phases can't be estimated" %(nb_cores))
+    chunk -= chunk % nb_cores
+    base = np.exp(1j * omega * np.arange(chunk)).reshape(-1, nb_cores)
+    base_cos, base_sin = np.ascontiguousarray(base.real), np.ascontiguousarray(base.imag)
+    # normal equations sums per core, the rotation exp(1j*omega*start) is applied to the chunk sums:
+    # exp(1j*omega*n), exp(2j*omega*n), x*exp(1j*omega*n), x and count
+    s1, s2, sx1 = np.zeros(nb_cores, dtype=complex), np.zeros(nb_cores, dtype=complex), np.zeros(nb_cores, dtype=complex)
+    sx, count = np.zeros(nb_cores), np.zeros(nb_cores)
+    size = samples.size - samples.size % nb_cores
+    x = np.empty((chunk // nb_cores, nb_cores))
+    base_s1, base_s2 = base.sum(0), (base**2).sum(0)
+    for start in range(0, size, chunk):
+        rows = (min(start + chunk, size) - start) // nb_cores
+        np.copyto(x[:rows], np.reshape(samples[start:start + rows * nb_cores], (rows, nb_cores)))
+        rotation = np.exp(1j * omega * start)
+        if rows < x.shape[0]:
+            base_s1, base_s2 = base[:rows].sum(0), (base[:rows]**2).sum(0)
+        s1 += rotation * base_s1
+        s2 += rotation**2 * base_s2
+        sx1 += rotation * (np.einsum('mp,mp->p', x[:rows], base_cos[:rows]) + 1j * np.einsum('mp,mp->p', x[:rows], base_sin[:rows]))
+        sx += x[:rows].sum(0)
+        count += rows
+    scc, sss, scs = (count + s2.real) / 2, (count - s2.real) / 2, s2.imag / 2
+    sc, ss, sxc, sxs = s1.real, s1.imag, sx1.real, sx1.imag
+    normal = np.array([[scc, scs, sc], [scs, sss, ss], [sc, ss, count]]).transpose(2, 0, 1)
+    a, b, c = np.linalg.solve(normal, np.stack((sxc, sxs, sx), axis=1)[..., None])[..., 0].T
+    amplitude = np.hypot(a, b)
+    phase = np.arctan2(-b, a) # x = amplitude*cos(omega*n + phase)
+    mean_phase = np.angle(np.exp(1j * phase).mean())
+    skew = np.angle(np.exp(1j * (phase - mean_phase))) / omega / fs
+    gain = amplitude / amplitude.mean()
+    return [{"offset": float(c[core]), "gain": float(gain[core]), "skew": float(skew[core])} for core in range(nb_cores)]
+
+def correction_table(mismatch_list):
+    """
+    Return the correction table, one dictionary per core: {"offset" [LSB] to add, "gain" to apply, "skew" [s] to add}.
+    """
+    return [{"offset": -core["offset"], "gain": 1.0 / core["gain"], "skew": -core["skew"]} for core in mismatch_list]
+
+## MAIN:
+if __name__ == "__main__":
+    # python interleaving.py samples.bin [fs] : core mismatch of an int16 sample file, sine wave input.
+    if len(sys.argv) < 2:
+        sys.exit("-- use 'python interleaving.py sample_file [fs]'")
+    fs = float(sys.argv[2]) if len(sys.argv) > 2 else INTERLEAVING_FS
+    samples = np.memmap(os.path.abspath(sys.argv[1]), dtype='<i2', mode='r')
+    for core, mismatch in enumerate(mismatch_estimate(samples, fs)):
+        print("-- core %d: offset %.3f LSB, gain %.5f, skew %.3f ps" %(core, mismatch["offset"], mismatch["gain"], mismatch["skew"]*1e12))
@@ -0,0 +1,223 @@
+import os
+import sys
+import time
+import atexit
+import struct
+import logging
+import threading
+from collections import deque
+
+## CONSTANTS:
+DATA_DIR = os.environ.get("EV12AQ600_DATA_DIR", os.path.join(os.path.expanduser("~"), ".ev12aq600")) # Journal and calibration cache.
+JOURNAL_FILE = os.environ.get("EV12AQ600_JOURNAL", os.path.join(DATA_DIR, "ev12aq600_journal.bin"))
+JOURNAL_MAX_SIZE = 2**24 # Journal file size limit [bytes], the file is then rotated.
+JOURNAL_BACKUPS = 3 # Rotated journal files kept: journal.bin.1 (most recent) to journal.bin.3.
+JOURNAL_RECORDS = 2**16 # Ring buffer length [records].
+JOURNAL_FLUSH_PERIOD = 1.0 # [s]
+# Record: timestamp [s], direction, request (TX frame sequence number answered by the RX data), length, data.
+JOURNAL_RECORD_FORMAT = '<dBIB8s'
+JOURNAL_RECORD_LENGTH = struct.calcsize(JOURNAL_RECORD_FORMAT)
+JOURNAL_DATA_LENGTH = 8
+JOURNAL_SESSION = 0 # Session start record, data: journal format version.
+JOURNAL_TX = 1
+JOURNAL_RX = 2
+JOURNAL_VERSION = 1
+UART_READ_FRAME_LENGTH = 2 # Address with bit 15 high, answered by 4 data bytes and ACK.
+UART_WRITE_FRAME_LENGTH = 6 # Address and 4 data bytes, answered by ACK.
+UART_READ_RESPONSE_LENGTH = 5
+UART_WRITE_RESPONSE_LENGTH = 1
+
+## FUNCTIONS:
+def journal_read(filename):
+    """
+    Return the list of journal records (timestamp, direction, request, data bytes).
+    """
+    with open(filename, "rb") as f:
+        content = f.read()
+    count = len(content) // JOURNAL_RECORD_LENGTH
+    record_list = []
+    for timestamp, direction, request, length, data in struct.iter_unpack(JOURNAL_RECORD_FORMAT, content[:count * JOURNAL_RECORD_LENGTH]):
+        record_list.append((timestamp, direction, request, data[:length]))
+    return record_list
+
+def journal_sessions(record_list):
+    """
+    Split the records in sessions (one session per opened transport).
+    """
+    session_list = []
+    for record in record_list:
+        if record[1] == JOURNAL_SESSION or not session_list:
+            session_list.append([])
+        if record[1] != JOURNAL_SESSION:
+            session_list[-1].append(record)
+    return session_list
+
+def journal_replay(filename, port="loop://", timing=False, session=-1):
+    """
+    Parameters:
+    * filename : string  : journal file.
+    * port     : string  : stand-in device, see transport.open_transport.
+    * timing   : boolean : True to send the frames with the original timing, else as fast as possible.
+    * session  : integer : journal session index, the last session by default.
+    Send the TX frames of a journal session to the device, read the responses and compare them with the journal RX data.
+    Return {"frames", "mismatches", "duration" [s], "original_duration" [s]}.
+    """
+    from transport import open_transport
+    session_list = journal_sessions(journal_read(filename))
+    if not session_list:
+        logging.error("-- journal replay: empty journal %s" %(filename))
+        return None
+    record_list = session_list[session]
+    tx_list = [record for record in record_list if record[1] == JOURNAL_TX]
+    rx = {}
+    for timestamp, direction, request, data in record_list:
+        if direction == JOURNAL_RX:
+            rx[request] = rx.get(request, b'') + data
+    ser = open_transport(port, timeout=1)
+    mismatches = 0
+    start = time.time()
+    for timestamp, direction, request, frame in tx_list:
+        if timing:
+            delay = (timestamp - tx_list[0][0]) - (time.time() - start)
+            if delay > 0:
+                time.sleep(delay)
+        ser.write(frame)
+        length = UART_READ_RESPONSE_LENGTH if frame[0] & 0x80 else UART_WRITE_RESPONSE_LENGTH
+        if ser.read(length) != rx.get(request, b''):
+            mismatches += 1
+    duration = time.time() - start
+    ser.close()
+    original_duration = record_list[-1][0] - record_list[0][0] if record_list else 0.0
+    return {"frames": len(tx_list), "mismatches": mismatches, "duration": duration, "original_duration": original_duration}
+
+## CLASS:
+class journal:
+    """
+    Binary journal of the UART frames: preallocated ring buffer of fixed length records, written to
+    the journal file by a background thread (every JOURNAL_FLUSH_PERIOD or when the ring is half full).
+    -       TX data are split in frames (2-byte read frame, 6-byte write frame), each frame gets a sequence number.
+    -       RX data are matched to the oldest TX frame still waiting for its response (the FPGA answers in order).
+    Recording never blocks, when the ring is full the records are dropped and counted (dropped).
+    The journal file is rotated when it reaches max_size (filename.1 to filename.<backups>), the remaining
+    records are written at exit (atexit), including on an unhandled exception.
+    """
+    def __init__(self, filename=JOURNAL_FILE, records=JOURNAL_RECORDS, max_size=JOURNAL_MAX_SIZE, backups=JOURNAL_BACKUPS):
+        self.filename = filename
+        self.records = records
+        self.max_size = max_size
+        self.backups = backups
+        self.ring = bytearray(records * JOURNAL_RECORD_LENGTH)
+        self.head = 0 # next record written
+        self.tail = 0 # next record flushed
+        self.dropped = 0
+        self.sequence = 0
+        self.tx_partial = b''
+        self.pending = deque() # [sequence number, remaining response bytes]
+        if os.path.dirname(filename):
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+        self.file = open(filename, "ab")
+        self.lock = threading.Lock()
+        self.event = threading.Event()
+        self.running = True
+        self.record(JOURNAL_SESSION, 0, struct.pack('<B', JOURNAL_VERSION))
+        self.thread = threading.Thread(target=self.flush_loop, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def record(self, direction, request, data):
+        if self.head - self.tail >= self.records:
+            self.dropped += 1
+            return
+        struct.pack_into(JOURNAL_RECORD_FORMAT, self.ring, (self.head % self.records) * JOURNAL_RECORD_LENGTH,
+                         time.time(), direction, request, len(data), data)
+        self.head += 1
+        if self.head - self.tail == self.records // 2:
+            self.event.set()
+
+    def record_tx(self, data):
+        data = self.tx_partial + bytes(data)
+        idx = 0
+        while idx < len(data):
+            length = UART_READ_FRAME_LENGTH if data[idx] & 0x80 else UART_WRITE_FRAME_LENGTH
+            if idx + length > len(data):
+                break
+            self.sequence += 1
+            self.record(JOURNAL_TX, self.sequence, data[idx:idx + length])
+            self.pending.append([self.sequence, UART_READ_RESPONSE_LENGTH if data[idx] & 0x80 else UART_WRITE_RESPONSE_LENGTH])
+            idx += length
+        self.tx_partial = data[idx:]
+
+    def record_rx(self, data):
+        idx = 0
+        while idx < len(data):
+            if self.pending:
+                request, remaining = self.pending[0]
+                length = min(remaining, len(data) - idx, JOURNAL_DATA_LENGTH)
+                self.pending[0][1] -= length
+                if self.pending[0][1] == 0:
+                    self.pending.popleft()
+            else:
+                request, length = 0, min(len(data) - idx, JOURNAL_DATA_LENGTH) # unexpected data
+            self.record(JOURNAL_RX, request, data[idx:idx + length])
+            idx += length
+
+    def rotate(self):
+        self.file.close()
+        for idx in range(self.backups, 0, -1):
+            source = self.filename if idx == 1 else "%s.%d" %(self.filename, idx - 1)
+            if os.path.exists(source):
+                os.replace(source, "%s.%d" %(self.filename, idx))
+        if not self.backups:
+            os.remove(self.filename)
+        self.file = open(self.filename, "ab")
+
+    def flush(self):
+        with self.lock:
+            head = self.head
+            if head == self.tail or self.file.closed:
+                return
+            if self.file.tell() + (head - self.tail) * JOURNAL_RECORD_LENGTH > self.max_size and self.file.tell():
+                self.rotate()
+            first = (self.tail % self.records) * JOURNAL_RECORD_LENGTH
+            last = (head % self.records) * JOURNAL_RECORD_LENGTH
+            if last > first:
+                self.file.write(self.ring[first:last])
+            else:
+                self.file.write(self.ring[first:])
+                self.file.write(self.ring[:last])
+            self.file.flush()
+            self.tail = head
+
+    def flush_loop(self):
+        while self.running:
+            self.event.wait(JOURNAL_FLUSH_PERIOD)
+            self.event.clear()
+            self.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        atexit.unregister(self.close)
+        self.running = False
+        self.event.set()
+        self.thread.join()
+        self.flush()
+        self.file.close()
+        if self.dropped:
+            logging.warning("-- journal: %d records dropped" %(self.dropped))
+
+## MAIN:
+if __name__ == "__main__":
+    # python journal.py replay journal.bin [port] [timing] : replay the last journal session on the stand-in device.
+    # python journal.py dump journal.bin                    : print the journal records.
+    if len(sys.argv) < 3 or sys.argv[1] not in ["replay", "dump"]:
+        sys.exit("-- use 'python journal.py replay|dump filename [port] [timing]'")
+    if sys.argv[1] == "dump":
+        for timestamp, direction, request, data in journal_read(sys.argv[2]):
+            print("%.6f %s %6d %s" %(timestamp, ["SESSION", "TX", "RX"][direction], request, data.hex()))
+    else:
+        port = sys.argv[3] if len(sys.argv) > 3 else "loop://"
+        result = journal_replay(sys.argv[2], port, len(sys.argv) > 4 and sys.argv[4] == "timing")
+        if result is not None:
+            print("-- journal replay: %d frames, %d mismatches, %.3f s (original %.3f s)"
+                  %(result["frames"], result["mismatches"], result["duration"], result["original_duration"]))
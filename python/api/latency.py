@@ -0,0 +1,93 @@
+import numpy as np
+import esistream
+from ev12aq600 import RESYNC_OUTCOME_LIST, RESYNC_PASS
+
+## CONSTANTS:
+ESISTREAM_CONFIG = esistream.esistream_config() # NB_LANES and DESER_WIDTH from the HDL.
+NB_LANES = ESISTREAM_CONFIG["nb_lanes"]
+DESER_WIDTH = ESISTREAM_CONFIG["deser_width"]
+WORDS_PER_FRAME = ESISTREAM_CONFIG["words"]
+RAMP_MODULO = 2**12
+RAMP_STEP = DESER_WIDTH // 8 # Ramp increment of a lane frame per rx_clk cycle (txrx_frame_checking.vhd step/ADD_U12_LATENCY).
+LATENCY_MAX_LAG = 64 # Cross-correlation lag range [frames].
+
+## FUNCTIONS:
+def lane_skew_ramp(frames, step=RAMP_STEP, nominal=None):
+    """
+    Parameters:
+    * frames  : array : decoded ramp frames, shape (cycles, NB_LANES, WORDS_PER_FRAME), see capture.capture_open.
+    * step    : integer : ramp increment of a lane frame per rx_clk cycle.
+    * nominal : list  : ramp value difference of each lane with lane 0 when the lanes are aligned, 0 by default.
+    Ramp phase comparison: the ramp difference of each lane with lane 0 is computed for all the frames at once,
+    its most frequent value (histogram over the ramp range) gives the lane phase, robust to bit errors.
+    Return the lane skew list [rx_clk cycles] relative to lane 0, positive when the lane is late.
+    """
+    nb_lanes = frames.shape[1]
+    nominal = np.zeros(nb_lanes) if nominal is None else np.asarray(nominal)
+    ramp = np.bitwise_and(frames, RAMP_MODULO - 1).astype(np.int32)
+    diff = np.mod(ramp[:, :1, :] - ramp, RAMP_MODULO).transpose(1, 0, 2).reshape(nb_lanes, -1)
+    skew_list = []
+    for lane in range(nb_lanes):
+        phase = np.argmax(np.bincount(diff[lane], minlength=RAMP_MODULO)) - nominal[lane]
+        # wrap to [-RAMP_MODULO/2, RAMP_MODULO/2)
+        phase = (phase + RAMP_MODULO // 2) % RAMP_MODULO - RAMP_MODULO // 2
+        skew_list.append(float(phase) / step)
+    return skew_list
+
+def lane_skew_xcorr(frames, max_lag=LATENCY_MAX_LAG):
+    """
+    Parameters:
+    * frames  : array   : decoded frames, shape (cycles, NB_LANES, WORDS_PER_FRAME), any data.
+    * max_lag : integer : lag search range [frames].
+    Cross-correlation of each lane frame stream with lane 0, all the lanes at once (FFT along the frame axis).
+    Return the lane skew list [rx_clk cycles] relative to lane 0, positive when the lane is late.
+    """
+    cycles, nb_lanes, words = frames.shape
+    x = np.bitwise_and(frames, RAMP_MODULO - 1).astype(float).transpose(1, 0, 2).reshape(nb_lanes, -1)
+    x -= x.mean(axis=1, keepdims=True)
+    size = x.shape[1]
+    spectrum = np.fft.rfft(x, n=2 * size, axis=1)
+    xcorr = np.fft.irfft(spectrum * np.conj(spectrum[:1]), n=2 * size, axis=1)
+    lags = np.concatenate((np.arange(0, max_lag + 1), np.arange(-max_lag, 0)))
+    best = lags[np.argmax(xcorr[:, lags], axis=1)]
+    return [float(lag) / words for lag in best]
+
+def latency_statistics(record_list):
+    """
+    Parameters:
+    * record_list : list of dictionaries : one record per resync iteration (ev12aq600.latency_check),
+                    {"outcome": resync outcome (RESYNC_OUTCOME_LIST index), "latency": SYNC counter value
+                    [rx_clk cycles] or None when the link is not ready, "skew": lane skew list or None}.
+    Return {"iterations", "outcomes": {outcome name: count}, "failures" (resyncs without the pass outcome),
+    "latency": {value: count}, "latency_min", "latency_max", "skew_max" (largest lane skew),
+    "skew_variation" (largest skew change of a lane across iterations), "deterministic"}.
+    Deterministic latency: every resync passes, a single latency value and the same lane skews at each iteration.
+    """
+    outcome_count = [0] * len(RESYNC_OUTCOME_LIST)
+    for record in record_list:
+        outcome_count[record["outcome"]] += 1
+    latency = np.array([record["latency"] for record in record_list if record["latency"] is not None])
+    skew = np.array([record["skew"] for record in record_list if record.get("skew") is not None])
+    values, counts = np.unique(latency, return_counts=True)
+    statistics = {"iterations": len(record_list),
+                  "outcomes": {name: count for name, count in zip(RESYNC_OUTCOME_LIST, outcome_count)},
+                  "failures": len(record_list) - outcome_count[RESYNC_PASS],
+                  "latency": {int(value): int(count) for value, count in zip(values, counts)},
+                  "latency_min": int(latency.min()) if latency.size else None,
+                  "latency_max": int(latency.max()) if latency.size else None,
+                  "skew_max": float(np.abs(skew).max()) if skew.size else None,
+                  "skew_variation": float((skew.max(axis=0) - skew.min(axis=0)).max()) if skew.size else None}
+    statistics["deterministic"] = bool(statistics["failures"] == 0 and values.size == 1
+                                       and (not skew.size or statistics["skew_variation"] == 0))
+    return statistics
+
+def latency_summary(statistics):
+    """
+    Return the one line summary of latency_statistics.
+    """
+    line = "latency: %s, %s" %(statistics["latency"], "deterministic" if statistics["deterministic"] else "NOT deterministic")
+    if statistics["failures"]:
+        line += ", %d failed resyncs %s" %(statistics["failures"],
+                                          {name: count for name, count in statistics["outcomes"].items() if count and name != RESYNC_OUTCOME_LIST[RESYNC_PASS]})
+    return line
+
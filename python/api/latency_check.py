@@ -0,0 +1,17 @@
+#!/usr/bin/env python
+import os
+import sys
+import time
+from ev12aq600_daemon import connect
+from latency import latency_summary
+
+# python latency_check.py [iterations] : SYNC to lanes ready latency across resyncs (training mode).
+iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+app=connect()
+app.start_serial()
+app.deactivate_ev12aq600_rstn()
+app.sync_mode_training()
+statistics, record_list = app.latency_check(iterations)
+print("-- " + latency_summary(statistics))
+app.stop_serial()
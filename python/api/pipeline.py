@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+import os
+import sys
+import time
+import queue
+import logging
+import traceback
+import numpy as np
+import multiprocessing
+from multiprocessing import shared_memory
+import esistream
+
+## CONSTANTS:
+PIPELINE_CHUNK_CYCLES = 2**14 # rx_clk cycles per chunk: 8 lanes x 4 frames x 2 bytes x 16 Ki = 1 MiB.
+PIPELINE_SLOTS_PER_WORKER = 2 # Ring slots per worker: bounds the memory and the work in flight (backpressure).
+PIPELINE_POLL = 0.05 # Result queue polling period while waiting for the workers [s].
+PIPELINE_STAGE_LIST = ["descramble", "check", "payload"] # Stages after ingest, in order.
+CAPTURE_DTYPE = np.dtype('<u2')
+SAMPLE_DTYPE = np.dtype('<i2')
+
+## FUNCTIONS:
+def stage_descramble(frames, chunk, context):
+    """
+    rx_decoding.vhd, in place, the PRBS index of each lane is advanced to the first cycle of the chunk.
+    """
+    offset = (chunk["start"] - chunk["overlap"]) * frames.shape[2]
+    index = [lane_index + offset for lane_index in context["prbs_index"]]
+    esistream.descramble(frames, context["prbs"], frames, index, context["prbs_en"], context["scratch"])
+    return None
+
+def stage_check(frames, chunk, context):
+    """
+    txrx_frame_checking.vhd data and clock bit checks from the check_start cycle, the overlap cycle checks
+    the first cycle of the chunk.
+    """
+    first = max(context["check_start"] - (chunk["start"] - chunk["overlap"]), 0)
+    if frames.shape[0] - first < 2:
+        return None
+    be, cb = esistream.pattern_check(frames[first:], context["step"], context["cb_change"])
+    return {"be": be, "cb": cb}
+
+def stage_payload(frames, chunk, context):
+    """
+    Payload extraction to the output sample file (memory map shared by the workers, written at the chunk position).
+    """
+    if context["output"] is None:
+        return None
+    samples_per_cycle = frames.shape[1] * frames.shape[2]
+    start = chunk["start"] * samples_per_cycle
+    esistream.payload(frames[chunk["overlap"]:], context["output"][start:start + chunk["cycles"] * samples_per_cycle])
+    return None
+
+STAGE_FUNCTION_DICT = {"descramble": stage_descramble, "check": stage_check, "payload": stage_payload}
+
+def stage_context(config):
+    """
+    Return the worker context: PRBS table, descramble scratch buffer, check parameters and the output memory map
+    (opened in each worker).
+    """
+    context = dict(config)
+    context["scratch"] = np.empty((esistream.DESCRAMBLE_BLOCK_CYCLES, config["nb_lanes"], config["words"]), dtype=CAPTURE_DTYPE)
+    if config["prbs_en"]:
+        context["prbs"] = esistream.prbs_extend(esistream.prbs_table(), (config["chunk_cycles"] + 1) * config["words"])
+    context["step"] = config["deser_width"] // 8 if config["pattern"] == "ramp" else 0
+    context["cb_change"] = 0 if config["deser_width"] >= 32 else 1
+    context["output"] = None
+    if config["output_file"]:
+        context["output"] = np.memmap(config["output_file"], dtype=SAMPLE_DTYPE, mode='r+')
+    return context
+
+def stage_worker(name, ring, in_queue, out_queue, result_queue, config):
+    """
+    Stage worker process: processes the chunks of its input queue in place in the ring slots, then passes
+    the slot to the next stage (out_queue), or back to the free slots after the last stage (out_queue None). Stops on None.
+    Sends ("result", stage, chunk index, result) for the non-empty results and ("stats", stage, chunks, bytes,
+    busy time, wait time) when it stops, ("error", stage, traceback) and stops on an exception.
+    """
+    buffer = frames = None
+    try:
+        function = STAGE_FUNCTION_DICT[name]
+        context = stage_context(config)
+        buffer = ring.attach()
+        chunks, size, busy, wait = 0, 0, 0.0, 0.0
+        while True:
+            start = time.perf_counter()
+            message = in_queue.get()
+            wait += time.perf_counter() - start
+            if message is None:
+                break
+            slot, chunk = message
+            start = time.perf_counter()
+            frames = buffer[slot, :chunk["cycles"] + chunk["overlap"]]
+            result = function(frames, chunk, context)
+            busy += time.perf_counter() - start
+            chunks += 1
+            size += frames.nbytes
+            if result is not None:
+                result_queue.put(("result", name, chunk["index"], result))
+            if out_queue is None:
+                ring.free.put(slot)
+            else:
+                out_queue.put((slot, chunk))
+    except Exception:
+        result_queue.put(("error", name, traceback.format_exc()))
+        return
+    finally:
+        del buffer, frames
+        ring.close()
+    result_queue.put(("stats", name, chunks, size, busy, wait))
+
+def pipeline_config(pattern="ramp", prbs_en=True, prbs_index=None, check_start=0, chunk_cycles=PIPELINE_CHUNK_CYCLES, output_file=None, **kwargs):
+    """
+    Return the pipeline configuration: esistream_config (SER_WIDTH, DESER_WIDTH, NB_LANES from the HDL),
+    updated with the parameters, see pipeline_run.
+    """
+    config = esistream.esistream_config()
+    config.update(kwargs)
+    config["words"] = config["deser_width"] // esistream.FRAME_WIDTH
+    config.update({"pattern": pattern, "prbs_en": prbs_en, "prbs_index": prbs_index, "check_start": check_start, "chunk_cycles": chunk_cycles,
+                   "output_file": output_file})
+    return config
+
+def pipeline_run(filename, config=None, workers=None, slots=None):
+    """
+    Parameters:
+    * filename : string     : aligned lane frames capture (rx_decoding input), little-endian uint16,
+                              rx_clk cycle major, then lane, then frame.
+    * config   : dictionary : see pipeline_config, "prbs_index": PRBS table index of the first frame of each lane,
+                              found from the capture synchronization sequence when None (the checks then start
+                              at the first data cycle), "check_start": first checked cycle.
+    * workers  : dictionary : worker processes per stage, os.cpu_count() shared by the stages when None.
+    * slots    : integer    : ring slots, PIPELINE_SLOTS_PER_WORKER per worker when None.
+    Streaming pipeline: ingest (memory-mapped capture to ring slot), descramble, check, payload.
+    The chunks are handed from a stage to the next through shared memory slots (index queues, no copy), the
+    free slots queue bounds the work in flight: ingest waits for a free slot when the stages are slower.
+    Each chunk carries the last cycle of the previous chunk (overlap) for the checks.
+    Return {"cycles", "duration" [s], "be": bit errors per lane, "cb": clock bit errors per lane,
+    "stages": {stage: {"workers", "chunks", "bytes", "busy", "wait", "throughput" [B/s per worker]}}},
+    None when a worker fails (exception or process ended), the workers are then stopped and the shared memory released.
+    """
+    config = pipeline_config() if config is None else config
+    nb_lanes, words, chunk_cycles = config["nb_lanes"], config["words"], config["chunk_cycles"]
+    frames = np.memmap(filename, dtype=CAPTURE_DTYPE, mode='r')
+    cycles = frames.size // (nb_lanes * words)
+    frames = frames[:cycles * nb_lanes * words].reshape(cycles, nb_lanes, words)
+    if config["prbs_en"] and config["prbs_index"] is None:
+        index_table = esistream.prbs_index_table(esistream.prbs_table())
+        lock_list = [esistream.prbs_lock(frames[:min(cycles, 2**10), lane], index_table) for lane in range(nb_lanes)]
+        if None in lock_list:
+            logging.error("-- pipeline: no synchronization sequence, lanes %s" %([lane for lane, lock in enumerate(lock_list) if lock is None]))
+            return None
+        data_start = max(-(-position // words) for index, position in lock_list) + esistream.sync_prbs_cycles(config["ser_width"])
+        config = dict(config, prbs_index=[index for index, position in lock_list], check_start=max(config["check_start"], data_start))
+    if config["output_file"]:
+        np.memmap(config["output_file"], dtype=SAMPLE_DTYPE, mode='w+', shape=(cycles * nb_lanes * words,)).flush()
+    if workers is None:
+        count = max((os.cpu_count() or 1) // len(PIPELINE_STAGE_LIST), 1)
+        workers = {name: count for name in PIPELINE_STAGE_LIST}
+    slots = slots or PIPELINE_SLOTS_PER_WORKER * sum(workers.values())
+    ctx = multiprocessing.get_context()
+    ring = shm_ring(slots, (chunk_cycles + 1, nb_lanes, words), CAPTURE_DTYPE, ctx)
+    result_queue = ctx.Queue()
+    queue_list = [ctx.Queue() for _ in PIPELINE_STAGE_LIST] + [None]
+    process_list = []
+    summary = {"cycles": cycles, "be": np.zeros(nb_lanes, dtype=np.int64), "cb": np.zeros(nb_lanes, dtype=np.int64),
+               "stages": {"ingest": {"workers": 1, "chunks": 0, "bytes": 0, "busy": 0.0, "wait": 0.0}}}
+    error_list, ended_set = [], set()
+    def collect(timeout):
+        try:
+            while True:
+                message = result_queue.get(timeout=timeout)
+                if message[0] == "result":
+                    summary["be"] += message[3]["be"]
+                    summary["cb"] += message[3]["cb"]
+                elif message[0] == "error":
+                    error_list.append("%s worker: %s" %(message[1], message[2].strip()))
+                else:
+                    stats = summary["stages"].setdefault(message[1], {"workers": 0, "chunks": 0, "bytes": 0, "busy": 0.0, "wait": 0.0})
+                    stats["workers"] += 1
+                    for key, value in zip(["chunks", "bytes", "busy", "wait"], message[2:]):
+                        stats[key] += value
+                timeout = 0
+        except queue.Empty:
+            pass
+    def failed():
+        # worker exception, or worker process ended without stopping (killed): the pipeline cannot complete
+        for idx, stage_process_list in enumerate(process_list):
+            for process in stage_process_list:
+                if process.exitcode not in (None, 0) and process.pid not in ended_set:
+                    ended_set.add(process.pid)
+                    error_list.append("%s worker: exit code %d" %(PIPELINE_STAGE_LIST[idx], process.exitcode))
+        return bool(error_list)
+    buffer = None
+    try:
+        for idx, name in enumerate(PIPELINE_STAGE_LIST):
+            process_list.append([ctx.Process(target=stage_worker, args=(name, ring, queue_list[idx], queue_list[idx+1], result_queue, config), daemon=True)
+                                 for _ in range(workers[name])])
+            for process in process_list[-1]:
+                process.start()
+        start_time = time.perf_counter()
+        buffer = ring.attach()
+        ingest = summary["stages"]["ingest"]
+        for index, start in enumerate(range(0, cycles, chunk_cycles)):
+            stop = min(start + chunk_cycles, cycles)
+            overlap = 1 if start else 0
+            wait_start = time.perf_counter()
+            slot = None
+            while slot is None:
+                try:
+                    slot = ring.free.get(timeout=PIPELINE_POLL)
+                except queue.Empty:
+                    collect(0)
+                    if failed():
+                        break
+            if slot is None:
+                break
+            busy_start = time.perf_counter()
+            np.copyto(buffer[slot, :stop - start + overlap], frames[start - overlap:stop])
+            ingest["wait"] += busy_start - wait_start
+            ingest["busy"] += time.perf_counter() - busy_start
+            ingest["chunks"] += 1
+            ingest["bytes"] += (stop - start) * nb_lanes * words * CAPTURE_DTYPE.itemsize
+            queue_list[0].put((slot, {"index": index, "start": start, "cycles": stop - start, "overlap": overlap}))
+            collect(0)
+        # stop the stages in order, the results are collected while waiting
+        for idx, stage_process_list in enumerate(process_list):
+            if failed():
+                break
+            for _ in stage_process_list:
+                queue_list[idx].put(None)
+            while any(process.is_alive() for process in stage_process_list) and not failed():
+                collect(PIPELINE_POLL)
+                for process in stage_process_list:
+                    process.join(0)
+        collect(PIPELINE_POLL)
+        if failed():
+            for line in error_list:
+                logging.error("-- pipeline: " + line)
+            return None
+        summary["duration"] = time.perf_counter() - start_time
+        for stats in summary["stages"].values():
+            stats["throughput"] = stats["bytes"] / stats["busy"] if stats["busy"] else float("inf")
+        return summary
+    finally:
+        for stage_process_list in process_list:
+            for process in stage_process_list:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+        for stage_queue in queue_list[:-1] + [result_queue]:
+            stage_queue.cancel_join_thread()
+        del buffer
+        ring.close()
+        ring.unlink()
+
+## CLASS:
+class shm_ring:
+    """
+    Shared memory ring of fixed size slots, slots x shape array of dtype, and the free slots queue.
+    The object is passed to the worker processes (the shared memory is attached by name).
+    """
+    def __init__(self, slots, shape, dtype, ctx):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = slots * int(np.prod(self.shape)) * self.dtype.itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.free = ctx.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+
+    def attach(self):
+        return np.ndarray((self.slots,) + self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+## MAIN:
+if __name__ == "__main__":
+    # python pipeline.py capture.bin [samples.bin] [ramp|pattern0] [noprbs] : descramble, check and extract the samples of an aligned capture.
+    if len(sys.argv) < 2:
+        sys.exit("-- use 'python pipeline.py capture_file [sample_file] [ramp|pattern0] [noprbs]'")
+    output_file = os.path.abspath(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2] != "-" else None
+    pattern = sys.argv[3] if len(sys.argv) > 3 else "ramp"
+    config = pipeline_config(pattern, prbs_en=not (len(sys.argv) > 4 and sys.argv[4] == "noprbs"), output_file=output_file)
+    summary = pipeline_run(os.path.abspath(sys.argv[1]), config)
+    if summary is not None:
+        print("-- %d cycles, %.3f s, bit errors %s, clock bit errors %s" %(summary["cycles"], summary["duration"], summary["be"].tolist(), summary["cb"].tolist()))
+        for name, stats in summary["stages"].items():
+            print("-- %-10s %d workers, %d chunks, %.1f MB/s per worker, busy %.3f s, wait %.3f s"
+                  %(name, stats["workers"], stats["chunks"], stats["throughput"] / 1e6, stats["busy"], stats["wait"]))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+import os
+import re
+import sys
+import struct
+
+## CONSTANTS:
+HDL_ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..")
+REGISTER_MAP_FILE = os.path.join(HDL_ROOT, "src_common", "register_map.vhd")
+TOP_LEVEL_FILE = os.path.join(HDL_ROOT, "vivado_rx_ev12aq60x", "src_top", "rx_esistream_top.vhd")
+REGISTER_TABLE_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "register_table.py")
+REG_READ_MODE_ENABLE = 2**15 # Address field MSB high (bit 15).
+REG_DATA_WIDTH = 32
+# Top level signal name prefix and suffix removed from the field names (register copy and resynchronized signals).
+FIELD_PREFIX = "reg_"
+FIELD_SUFFIX = "_rs"
+VHDL_ADDRESS_RE = re.compile(r"constant\s+reg_(\w+)_addr\s*:\s*integer\s*:=\s*(\d+)\s*;", re.I)
+VHDL_WRITE_RE = re.compile(r"when\s+reg_(\w+)_addr\s*=>\s*reg_\w+_m\s*<=\s*reg_wdata", re.I)
+VHDL_READ_RE = re.compile(r"when\s+reg_(\w+)_addr\s*=>\s*reg_rdata\s*<=\s*(reg_\w+_m|x\"[0-9a-f]+\")", re.I)
+VHDL_PULSE_RE = re.compile(r"^\s*reg_(\d+)_os\s*:\s*out", re.I | re.M)
+VHDL_GENERIC_RE = re.compile(r"^\s*(\w+)\s*:\s*integer\s*:=\s*(\d+)\s*;", re.I | re.M)
+# name(index) <= reg_N(high downto low) [or ...] / reg_N(high downto low) <= name / reg_N <= x"constant"
+VHDL_FIELD_WRITE_RE = re.compile(r"^\s*(\w+)(?:\((\d+)\))?\s*<=\s*reg_(\d+)\(([^()]+)\)", re.I | re.M)
+VHDL_FIELD_READ_RE = re.compile(r"^\s*reg_(\d+)\(([^()]+)\)\s*<=\s*(\w+)\s*;", re.I | re.M)
+VHDL_CONSTANT_RE = re.compile(r"^\s*reg_(\d+)\s*<=\s*x\"([0-9a-f]+)\"\s*;", re.I | re.M)
+VHDL_TOKEN_RE = re.compile(r"\s*(?:(\d+)|([a-z]\w*)|([-+*]))", re.I) # Bound expression: integer, generic name or operator.
+
+## FUNCTIONS:
+def vhdl_strip_comments(text):
+    return re.sub(r"--.*", "", text)
+
+def vhdl_expression(text, generic_dict):
+    """
+    Return the value of a VHDL bound expression: integer literals and generic names (generic_dict values)
+    combined with the +, - and * operators, * first. Raise ValueError on any other expression.
+    """
+    token_list = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = VHDL_TOKEN_RE.match(text, position)
+        if match is None:
+            raise ValueError("invalid VHDL bound expression: %r" %(text))
+        number, name, operator = match.groups()
+        if name is not None and name not in generic_dict:
+            raise ValueError("unknown generic %s in VHDL bound expression: %r" %(name, text))
+        token_list.append(operator if operator is not None else int(number) if number is not None else int(generic_dict[name]))
+        position = match.end()
+    # operands at the even positions, operators at the odd positions
+    if not len(token_list) % 2 or any(isinstance(token, str) != bool(idx % 2) for idx, token in enumerate(token_list)):
+        raise ValueError("invalid VHDL bound expression: %r" %(text))
+    term_list = [token_list[0]]
+    for operator, operand in zip(token_list[1::2], token_list[2::2]):
+        if operator == "*":
+            term_list[-1] *= operand
+        else:
+            term_list.append(operand if operator == "+" else -operand)
+    return sum(term_list)
+
+def vhdl_range(text, generic_dict):
+    """
+    Return (lsb, width) of a VHDL bit index "n" or range "high downto low", generics are replaced by their value
+    (see vhdl_expression).
+    """
+    bound_list = [vhdl_expression(bound, generic_dict) for bound in re.split(r"\s+downto\s+", text.strip(), flags=re.I)]
+    return bound_list[-1], bound_list[0] - bound_list[-1] + 1
+
+def parse_register_map(register_map_file=REGISTER_MAP_FILE):
+    """
+    Return the register list of register_map.vhd, one dictionary per register:
+    {"name", "address", "readable", "writable", "pulse" (reg_N_os one-shot output), "value" (read-only constant or None)}.
+    """
+    with open(register_map_file) as f:
+        text = vhdl_strip_comments(f.read())
+    write_set = set(VHDL_WRITE_RE.findall(text))
+    read_dict = dict(VHDL_READ_RE.findall(text))
+    pulse_set = set(VHDL_PULSE_RE.findall(text))
+    register_list = []
+    for name, address in VHDL_ADDRESS_RE.findall(text):
+        source = read_dict.get(name)
+        register_list.append({"name": "reg_" + name, "address": int(address), "readable": source is not None,
+                              "writable": name in write_set, "pulse": name in pulse_set,
+                              "value": int(source[2:-1], 16) if source is not None and source.lower().startswith('x"') else None})
+    return register_list
+
+def parse_top_level(register_list, top_level_file=TOP_LEVEL_FILE):
+    """
+    Return the field list of the top level register bit assignments, one dictionary per field:
+    {"name", "address", "lsb", "width", "mask", "direction" ("w": register to logic, "r": logic to register)}.
+    Register constants (reg_8 firmware version) are stored in the register "value".
+    """
+    with open(top_level_file) as f:
+        text = vhdl_strip_comments(f.read())
+    generic_dict = {name: int(value) for name, value in VHDL_GENERIC_RE.findall(text)}
+    register_dict = {register["address"]: register for register in register_list}
+    field_list = []
+    def field(name, address, bits, direction):
+        lsb, width = vhdl_range(bits, generic_dict)
+        if name.startswith(FIELD_PREFIX):
+            name = name[len(FIELD_PREFIX):]
+        if name.endswith(FIELD_SUFFIX):
+            name = name[:-len(FIELD_SUFFIX)]
+        field_list.append({"name": name, "address": int(address), "lsb": lsb, "width": width,
+                           "mask": (2**width - 1) << lsb, "direction": direction})
+    for name, index, address, bits in VHDL_FIELD_WRITE_RE.findall(text):
+        field(name + ("_" + index if index else ""), address, bits, "w")
+    for address, bits, name in VHDL_FIELD_READ_RE.findall(text):
+        field(name, address, bits, "r")
+    for address, value in VHDL_CONSTANT_RE.findall(text):
+        register_dict[int(address)]["value"] = int(value, 16)
+    field_list.sort(key=lambda field: (field["address"], field["lsb"]))
+    return field_list
+
+def read_frame(address):
+    return struct.pack('>H', address + REG_READ_MODE_ENABLE)
+
+def register_table_source(register_list, field_list):
+    """
+    Return the register_table.py module source.
+    """
+    line_list = ["# Generated by register_map.py from src_common/register_map.vhd and rx_esistream_top.vhd, do not edit.",
+                 "# python register_map.py : regenerate after a register map change.",
+                 "import struct",
+                 "from collections import namedtuple",
+                 "",
+                 "## CONSTANTS:",
+                 "register = namedtuple(\"register\", \"name address readable writable pulse value\")",
+                 "field = namedtuple(\"field\", \"name address lsb width mask direction\")",
+                 "WRITE_FRAME = struct.Struct('>HI') # 15-bit address, 32-bit data.",
+                 "WRITE_FRAME_CACHE_SIZE = 2**12",
+                 "",
+                 "REGISTER_DICT = {"]
+    for reg in register_list:
+        line_list.append("    %d: register(%r, %d, %r, %r, %r, %s)," %(reg["address"], reg["name"], reg["address"], reg["readable"],
+                         reg["writable"], reg["pulse"], "None" if reg["value"] is None else "0x%08X" %(reg["value"])))
+    line_list += ["}", "", "FIELD_DICT = {"]
+    for fld in field_list:
+        line_list.append("    %r: field(%r, %d, %d, %d, 0x%08X, %r)," %(fld["name"], fld["name"], fld["address"], fld["lsb"],
+                         fld["width"], fld["mask"], fld["direction"]))
+    line_list += ["}", "", "# Read command frames of the readable registers.", "READ_FRAME_DICT = {"]
+    for reg in register_list:
+        if reg["readable"]:
+            line_list.append("    %d: %r," %(reg["address"], read_frame(reg["address"])))
+    line_list += ["}",
+                  "",
+                  "# Write command frames, preloaded with the reset value of the writable registers and the single bit fields.",
+                  "write_frame_cache = {(address, 0): WRITE_FRAME.pack(address, 0) for address, reg in REGISTER_DICT.items() if reg.writable}",
+                  "write_frame_cache.update({(fld.address, fld.mask): WRITE_FRAME.pack(fld.address, fld.mask) for fld in FIELD_DICT.values()",
+                  "                          if fld.direction == \"w\" and fld.width == 1})",
+                  "",
+                  "## FUNCTIONS:",
+                  "def read_frame(address):",
+                  "    frame = READ_FRAME_DICT.get(address)",
+                  "    return frame if frame is not None else struct.pack('>H', address | 0x8000)",
+                  "",
+                  "def write_frame(address, data):",
+                  "    key = (address, data)",
+                  "    frame = write_frame_cache.get(key)",
+                  "    if frame is None:",
+                  "        if len(write_frame_cache) >= WRITE_FRAME_CACHE_SIZE:",
+                  "            write_frame_cache.clear()",
+                  "        frame = write_frame_cache[key] = WRITE_FRAME.pack(address, data)",
+                  "    return frame",
+                  "",
+                  "def field_value(name, reg_value):",
+                  "    fld = FIELD_DICT[name]",
+                  "    return (reg_value & fld.mask) >> fld.lsb",
+                  "",
+                  "def field_update(name, reg_value, value):",
+                  "    fld = FIELD_DICT[name]",
+                  "    return (reg_value & ~fld.mask) | ((value << fld.lsb) & fld.mask)",
+                  ""]
+    return "\n".join(line_list)
+
+## MAIN:
+if __name__ == "__main__":
+    # python register_map.py [output file] : generate register_table.py from the HDL register map.
+    filename = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else REGISTER_TABLE_FILE
+    register_list = parse_register_map()
+    field_list = parse_top_level(register_list)
+    with open(filename, "w") as f:
+        f.write(register_table_source(register_list, field_list))
+    print("-- %s: %d registers, %d fields" %(filename, len(register_list), len(field_list)))
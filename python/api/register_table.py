@@ -0,0 +1,118 @@
+# Generated by register_map.py from src_common/register_map.vhd and rx_esistream_top.vhd, do not edit.
+# python register_map.py : regenerate after a register map change.
+import struct
+from collections import namedtuple
+
+## CONSTANTS:
+register = namedtuple("register", "name address readable writable pulse value")
+field = namedtuple("field", "name address lsb width mask direction")
+WRITE_FRAME = struct.Struct('>HI') # 15-bit address, 32-bit data.
+WRITE_FRAME_CACHE_SIZE = 2**12
+
+REGISTER_DICT = {
+    0: register('reg_0', 0, True, True, False, None),
+    1: register('reg_1', 1, True, True, False, None),
+    2: register('reg_2', 2, True, True, False, None),
+    3: register('reg_3', 3, True, True, False, None),
+    4: register('reg_4', 4, True, True, True, None),
+    5: register('reg_5', 5, True, True, True, None),
+    6: register('reg_6', 6, True, True, True, None),
+    7: register('reg_7', 7, True, True, True, None),
+    8: register('reg_8', 8, True, False, False, 0x00000301),
+    9: register('reg_9', 9, True, False, False, None),
+    10: register('reg_10', 10, True, False, True, None),
+    11: register('reg_11', 11, True, False, False, None),
+    12: register('reg_12', 12, True, True, True, None),
+    13: register('reg_13', 13, False, True, False, None),
+    14: register('reg_14', 14, False, True, False, None),
+    15: register('reg_15', 15, False, True, False, None),
+    16: register('reg_16', 16, False, True, False, None),
+    17: register('reg_17', 17, False, True, False, None),
+    18: register('reg_18', 18, True, False, False, None),
+    19: register('reg_19', 19, True, False, False, None),
+    255: register('reg_status', 255, True, False, False, 0x20152018),
+}
+
+FIELD_DICT = {
+    'tx_emu_d_ctrl_0': field('tx_emu_d_ctrl_0', 0, 0, 1, 0x00000001, 'w'),
+    'tx_emu_d_ctrl_1': field('tx_emu_d_ctrl_1', 0, 1, 1, 0x00000002, 'w'),
+    'rx_prbs_en': field('rx_prbs_en', 1, 0, 1, 0x00000001, 'w'),
+    'rst': field('rst', 2, 0, 1, 0x00000001, 'w'),
+    'rst_check': field('rst_check', 2, 1, 1, 0x00000002, 'w'),
+    'aq600_rstn': field('aq600_rstn', 2, 2, 1, 0x00000004, 'w'),
+    'rx_sync_rst': field('rx_sync_rst', 2, 3, 1, 0x00000008, 'w'),
+    'spi_ss': field('spi_ss', 3, 0, 1, 0x00000001, 'w'),
+    'spi_start': field('spi_start', 3, 1, 1, 0x00000002, 'w'),
+    'fifo_in_din': field('fifo_in_din', 4, 0, 24, 0x00FFFFFF, 'w'),
+    'sync_mode': field('sync_mode', 5, 0, 1, 0x00000001, 'w'),
+    'sync_delay': field('sync_delay', 5, 4, 4, 0x000000F0, 'w'),
+    'send_sync': field('send_sync', 6, 0, 1, 0x00000001, 'w'),
+    'manual_mode': field('manual_mode', 6, 1, 1, 0x00000002, 'w'),
+    'sync_wr_counter': field('sync_wr_counter', 7, 0, 8, 0x000000FF, 'w'),
+    'sync_wr_en': field('sync_wr_en', 7, 8, 1, 0x00000100, 'w'),
+    'fifo_in_full': field('fifo_in_full', 9, 0, 1, 0x00000001, 'r'),
+    'fifo_out_empty': field('fifo_out_empty', 9, 1, 1, 0x00000002, 'r'),
+    'fifo_out_dout': field('fifo_out_dout', 10, 0, 24, 0x00FFFFFF, 'r'),
+    'sync_rd_counter': field('sync_rd_counter', 11, 0, 8, 0x000000FF, 'r'),
+    'sync_counter_busy': field('sync_counter_busy', 11, 8, 1, 0x00000100, 'r'),
+    'sync_odelay_o': field('sync_odelay_o', 11, 16, 9, 0x01FF0000, 'r'),
+    'sync_odelay_i': field('sync_odelay_i', 12, 0, 9, 0x000001FF, 'w'),
+    'sync_get_odelay': field('sync_get_odelay', 12, 15, 1, 0x00008000, 'w'),
+    'hmc1031_d0': field('hmc1031_d0', 14, 0, 1, 0x00000001, 'w'),
+    'hmc1031_d1': field('hmc1031_d1', 14, 1, 1, 0x00000002, 'w'),
+    'sync_sel': field('sync_sel', 14, 2, 1, 0x00000004, 'w'),
+    'synco_sel': field('synco_sel', 14, 3, 1, 0x00000008, 'w'),
+    'clk_sel': field('clk_sel', 14, 4, 1, 0x00000010, 'w'),
+    'ref_sel': field('ref_sel', 14, 5, 1, 0x00000020, 'w'),
+    'ref_sel_ext': field('ref_sel_ext', 14, 6, 1, 0x00000040, 'w'),
+    'be_lane_status': field('be_lane_status', 18, 0, 8, 0x000000FF, 'r'),
+    'cb_lane_status': field('cb_lane_status', 18, 16, 8, 0x00FF0000, 'r'),
+    'valid_status': field('valid_status', 18, 31, 1, 0x80000000, 'r'),
+}
+
+# Read command frames of the readable registers.
+READ_FRAME_DICT = {
+    0: b'\x80\x00',
+    1: b'\x80\x01',
+    2: b'\x80\x02',
+    3: b'\x80\x03',
+    4: b'\x80\x04',
+    5: b'\x80\x05',
+    6: b'\x80\x06',
+    7: b'\x80\x07',
+    8: b'\x80\x08',
+    9: b'\x80\t',
+    10: b'\x80\n',
+    11: b'\x80\x0b',
+    12: b'\x80\x0c',
+    18: b'\x80\x12',
+    19: b'\x80\x13',
+    255: b'\x80\xff',
+}
+
+# Write command frames, preloaded with the reset value of the writable registers and the single bit fields.
+write_frame_cache = {(address, 0): WRITE_FRAME.pack(address, 0) for address, reg in REGISTER_DICT.items() if reg.writable}
+write_frame_cache.update({(fld.address, fld.mask): WRITE_FRAME.pack(fld.address, fld.mask) for fld in FIELD_DICT.values()
+                          if fld.direction == "w" and fld.width == 1})
+
+## FUNCTIONS:
+def read_frame(address):
+    frame = READ_FRAME_DICT.get(address)
+    return frame if frame is not None else struct.pack('>H', address | 0x8000)
+
+def write_frame(address, data):
+    key = (address, data)
+    frame = write_frame_cache.get(key)
+    if frame is None:
+        if len(write_frame_cache) >= WRITE_FRAME_CACHE_SIZE:
+            write_frame_cache.clear()
+        frame = write_frame_cache[key] = WRITE_FRAME.pack(address, data)
+    return frame
+
+def field_value(name, reg_value):
+    fld = FIELD_DICT[name]
+    return (reg_value & fld.mask) >> fld.lsb
+
+def field_update(name, reg_value, value):
+    fld = FIELD_DICT[name]
+    return (reg_value & ~fld.mask) | ((value << fld.lsb) & fld.mask)
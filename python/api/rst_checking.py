@@ -2,9 +2,9 @@
 import os
 import sys
 import time
-from ev12aq600 import ev12aq600
+from ev12aq600_daemon import connect
 
-app=ev12aq600()
+app=connect()
 
 app.start_serial()
 app.deactivate_ev12aq600_rstn()
@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+import os
+import sys
+import time
+from ev12aq600_daemon import connect
+
+# python snapshot.py save snapshot.bin     : read back and save the device state.
+# python snapshot.py restore snapshot.bin  : write only the differences between the snapshot and the device state.
+if len(sys.argv) < 3 or sys.argv[1] not in ["save", "restore"]:
+    sys.exit("-- use 'python snapshot.py save|restore filename'")
+
+app=connect()
+app.start_serial()
+
+if sys.argv[1] == "save":
+    app.update_reg_array()
+    app.snapshot_save(os.path.abspath(sys.argv[2]))
+else:
+    app.snapshot_restore(app.snapshot_load(os.path.abspath(sys.argv[2])))
+
+app.stop_serial()
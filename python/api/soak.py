@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+import os
+import sys
+import json
+import time
+from array import array
+from ev12aq600 import RESYNC_OUTCOME_LIST, RESYNC_PASS
+
+## CONSTANTS:
+SOAK_CYCLES = 1000
+SOAK_SUMMARY_PERIOD = 100 # Cycles between two failure summaries.
+SOAK_LOG_FILE = "soak_log.bin" # In the working directory.
+SOAK_NB_LANES = 8
+# Log columns: name, array typecode. Times in [s], ready -1.0 and latency -1 when the link is not ready.
+SOAK_COLUMN_LIST = [("start", 'd'), ("duration", 'f'), ("ready", 'f'), ("latency", 'h'), ("be", 'B'), ("cb", 'B'), ("outcome", 'B')]
+
+## FUNCTIONS:
+def soak_log_read(filename):
+    """
+    Return (header dictionary, {column name: array}) of a soak log file.
+    """
+    with open(filename, "rb") as f:
+        header = json.loads(f.readline().decode())
+        column_dict = {}
+        for name, typecode in header["columns"]:
+            column = array(typecode)
+            column.fromfile(f, header["cycles"])
+            column_dict[name] = column
+    return header, column_dict
+
+def soak(app, cycles=SOAK_CYCLES, summary_period=SOAK_SUMMARY_PERIOD, log=None, **kwargs):
+    """
+    Parameters:
+    * app            : ev12aq600 : connected driver (serial session started).
+    * cycles         : integer   : number of resync cycles.
+    * summary_period : integer   : cycles between two failure summaries, 0 to disable them.
+    * log            : soak_log  : log to append the cycles to, a new one when None.
+    * kwargs         : resync_cycle parameters (settle, dwell, timeOut).
+    Back-to-back link resync cycles (ev12aq600.resync_cycle), each cycle outcome and timing is appended to the log.
+    Return the soak_log.
+    """
+    log = soak_log() if log is None else log
+    for cycle in range(cycles):
+        log.append(app.resync_cycle(**kwargs))
+        if summary_period and (cycle + 1) % summary_period == 0:
+            print("-- " + log.summary())
+    return log
+
+## CLASS:
+class soak_log:
+    """
+    Columnar soak log: one typed array per column (SOAK_COLUMN_LIST), about 20 bytes per cycle, and running
+    failure counters (per outcome, per lane bit errors and clock bit errors) updated on each cycle.
+    The log file is a JSON header line followed by the raw column arrays.
+    """
+    def __init__(self, nb_lanes=SOAK_NB_LANES):
+        self.nb_lanes = nb_lanes
+        self.column_dict = {name: array(typecode) for name, typecode in SOAK_COLUMN_LIST}
+        self.outcome_count = [0] * len(RESYNC_OUTCOME_LIST)
+        self.be_count = [0] * nb_lanes
+        self.cb_count = [0] * nb_lanes
+        self.cycles = 0
+        self.start = time.time()
+
+    def append(self, result):
+        """
+        Parameters:
+        * result : dictionary : ev12aq600.resync_cycle result.
+        """
+        columns = self.column_dict
+        columns["start"].append(time.time() - result["duration"])
+        columns["duration"].append(result["duration"])
+        columns["ready"].append(-1.0 if result["ready"] is None else result["ready"])
+        columns["latency"].append(-1 if result["latency"] is None else result["latency"])
+        columns["be"].append(result["be"])
+        columns["cb"].append(result["cb"])
+        columns["outcome"].append(result["outcome"])
+        self.outcome_count[result["outcome"]] += 1
+        for lane in range(self.nb_lanes):
+            self.be_count[lane] += result["be"] >> lane & 1
+            self.cb_count[lane] += result["cb"] >> lane & 1
+        self.cycles += 1
+
+    def summary(self):
+        """
+        Return the one line failure summary.
+        """
+        elapsed = time.time() - self.start
+        failures = self.cycles - self.outcome_count[RESYNC_PASS]
+        line = "%d cycles, %.1f cycles/s, %d failures (%.3g)" %(
+            self.cycles, self.cycles / elapsed if elapsed else 0.0, failures, failures / self.cycles if self.cycles else 0.0)
+        for outcome, name in enumerate(RESYNC_OUTCOME_LIST):
+            if outcome != RESYNC_PASS:
+                line += ", %s %d" %(name, self.outcome_count[outcome])
+        if any(self.be_count) or any(self.cb_count):
+            line += ", lane errors be %s cb %s" %(self.be_count, self.cb_count)
+        return line
+
+    def save(self, filename=SOAK_LOG_FILE):
+        header = {"cycles": self.cycles, "columns": SOAK_COLUMN_LIST, "outcomes": RESYNC_OUTCOME_LIST, "nb_lanes": self.nb_lanes}
+        with open(filename, "wb") as f:
+            f.write((json.dumps(header) + "\n").encode())
+            for name, typecode in SOAK_COLUMN_LIST:
+                self.column_dict[name].tofile(f)
+
+## MAIN:
+if __name__ == "__main__":
+    # python soak.py [cycles] [log file] [dwell] : link resync soak test, real board or stand-in device (daemon or local session).
+    from ev12aq600_daemon import connect
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else SOAK_CYCLES
+    filename = os.path.abspath(sys.argv[2] if len(sys.argv) > 2 else SOAK_LOG_FILE)
+    kwargs = {"dwell": float(sys.argv[3])} if len(sys.argv) > 3 else {}
+    app=connect()
+    app.start_serial()
+    app.deactivate_ev12aq600_rstn()
+    log = soak_log()
+    try:
+        soak(app, cycles, log=log, **kwargs)
+    except KeyboardInterrupt:
+        print("-- soak test interrupted")
+    print("-- " + log.summary())
+    log.save(filename)
+    print("-- soak log: %s" %(filename))
+    app.stop_serial()
@@ -0,0 +1,223 @@
+import os
+import sys
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+## CONSTANTS:
+SPECTRUM_NFFT = 2**16
+SPECTRUM_FULL_SCALE = 2**11 # 12-bit two's complement full scale sine amplitude [LSB].
+SPECTRUM_DC_BINS = 8 # Bins excluded around DC (window main lobe).
+SPECTRUM_LOBE_BINS = 4 # Window main lobe half width [bins], 4-term Blackman-Harris.
+SPECTRUM_TONE_BINS = SPECTRUM_LOBE_BINS + 1 # Carrier and harmonic half width [bins]: main lobe of a tone between two bins.
+SPECTRUM_CHECK_SFDR = 85.0 # spectrum_check minimum SFDR of a clean 12-bit tone [dBc], window sidelobes -92 dB.
+SPECTRUM_CHECK_TOLERANCE = 1.0 # spectrum_check harmonic and spur level tolerance [dB].
+# spectrum_check cases: name, tone offset from a bin [bins], 3rd harmonic [dBc], non-harmonic spur [dBc] (None: clean tone).
+SPECTRUM_CHECK_CASE_LIST = [("coherent", 0.0, None, None), ("offset 0.25", 0.25, None, None), ("offset 0.5", 0.5, None, None),
+                            ("harmonic", 0.5, -60.0, -80.0)]
+SPECTRUM_HARMONICS = 5 # Harmonics 2 to 5.
+SPECTRUM_SPURS = 5
+SPECTRUM_FS = 6.4e9 # [Sps]
+SPECTRUM_BATCH = 16 # Segments per FFT call.
+BLACKMAN_HARRIS_LIST = [0.35875, 0.48829, 0.14128, 0.01168]
+
+## FUNCTIONS:
+def blackman_harris(nfft):
+    n = np.arange(nfft) * 2 * np.pi / nfft
+    window = np.zeros(nfft)
+    for k, a in enumerate(BLACKMAN_HARRIS_LIST):
+        window += (-1)**k * a * np.cos(k * n)
+    return window
+
+def welch_range(args):
+    """
+    Process pool worker: Welch accumulation of the segments [first, last) of a sample file.
+    Return (power sum, number of segments).
+    """
+    filename, nfft, first, last = args
+    samples = np.memmap(filename, dtype='<i2', mode='r')
+    analyzer = spectrum_analyzer(nfft)
+    analyzer.update(samples[first * analyzer.step:(last - 1) * analyzer.step + nfft])
+    return analyzer.power, analyzer.segments
+
+def welch_file(filename, fs=SPECTRUM_FS, nfft=SPECTRUM_NFFT, processes=None):
+    """
+    Parameters:
+    * filename  : string  : int16 sample file (see capture.py).
+    * fs        : float   : sampling frequency [Sps].
+    * nfft      : integer : FFT length.
+    * processes : integer : process pool size, None for a single process.
+    Return the spectrum_analyzer of the whole file.
+    """
+    analyzer = spectrum_analyzer(nfft, fs)
+    samples = np.memmap(filename, dtype='<i2', mode='r')
+    if not processes:
+        analyzer.update(samples)
+        return analyzer
+    segments = (samples.size - nfft) // analyzer.step + 1
+    bounds = np.linspace(0, segments, processes + 1).astype(int)
+    jobs = [(filename, nfft, first, last) for first, last in zip(bounds[:-1], bounds[1:]) if last > first]
+    with ProcessPoolExecutor(processes) as pool:
+        for power, count in pool.map(welch_range, jobs):
+            analyzer.power += power
+            analyzer.segments += count
+    return analyzer
+
+def spectrum_summary(metrics):
+    """
+    Return the one line summary of spectrum_analyzer.metrics.
+    """
+    return "fin %.6g MHz, %.2f dBFS, SNR %.2f dB, SINAD %.2f dB, SFDR %.2f dBc, ENOB %.2f bits" %(
+        metrics["fin"]/1e6, metrics["carrier"], metrics["snr"], metrics["sinad"], metrics["sfdr"], metrics["enob"])
+
+def spectrum_check(nfft=SPECTRUM_NFFT, fs=SPECTRUM_FS, segments=32):
+    """
+    Metrics check on synthetic 12-bit sine waves (SPECTRUM_CHECK_CASE_LIST): clean tones, coherent and between two bins,
+    the carrier window lobe is neither reported as a spur nor limits the SFDR, and a tone with a 3rd harmonic and
+    a non-harmonic spur, the SFDR is set by the largest of both.
+    Return {case name: True when the metrics are correct}.
+    """
+    index = np.arange((segments + 1) * nfft // 2)
+    result = {}
+    for name, offset, harmonic, spur in SPECTRUM_CHECK_CASE_LIST:
+        fin_bin = nfft // 53 + offset
+        signal = np.sin(2 * np.pi * fin_bin / nfft * index)
+        if harmonic is not None:
+            signal += 10**(harmonic / 20) * np.sin(2 * np.pi * 3 * fin_bin / nfft * index)
+        if spur is not None:
+            signal += 10**(spur / 20) * np.sin(2 * np.pi * (nfft // 7 + 0.3) / nfft * index)
+        samples = np.round((SPECTRUM_FULL_SCALE - 1) / np.abs(signal).max() * signal).astype('<i2')
+        analyzer = spectrum_analyzer(nfft, fs)
+        analyzer.update(samples)
+        metrics = analyzer.metrics()
+        ok = abs(metrics["fin"] * nfft / fs - fin_bin) <= 0.5
+        if harmonic is None and spur is None:
+            ok &= metrics["sfdr"] > SPECTRUM_CHECK_SFDR
+        else:
+            ok &= abs(metrics["sfdr"] + max(harmonic, spur)) <= SPECTRUM_CHECK_TOLERANCE
+            ok &= any(order == 3 and abs(level - harmonic) <= SPECTRUM_CHECK_TOLERANCE for order, frequency, level in metrics["harmonics"])
+            ok &= abs(metrics["spurs"][0][1] - spur) <= SPECTRUM_CHECK_TOLERANCE
+        result[name] = bool(ok)
+    return result
+
+## CLASS:
+class spectrum_analyzer:
+    """
+    Streaming Welch spectrum: Blackman-Harris window, 50% overlap, average power spectrum.
+    Sample chunks of any length are passed to update, the overlap samples are kept between two chunks.
+    The window, the windowed segments buffer and the power accumulator are allocated once, the overlapping
+    segments are a strided view of the chunk and are transformed SPECTRUM_BATCH at a time.
+    """
+    def __init__(self, nfft=SPECTRUM_NFFT, fs=SPECTRUM_FS, full_scale=SPECTRUM_FULL_SCALE):
+        self.nfft = nfft
+        self.fs = fs
+        self.step = nfft // 2
+        self.window = blackman_harris(nfft)
+        # full scale sine: peak bin power and total power (Parseval)
+        self.power_fs = (full_scale * self.window.sum() / 2)**2
+        self.energy_fs = nfft * full_scale**2 * (self.window**2).sum() / 4
+        self.segment = np.empty((SPECTRUM_BATCH, nfft))
+        self.power = np.zeros(nfft // 2 + 1)
+        self.segments = 0
+        self.tail = np.empty(0, dtype='<i2')
+
+    def update(self, samples):
+        """
+        Parameters:
+        * samples : array : next samples of the stream.
+        """
+        if self.tail.size:
+            samples = np.concatenate((self.tail, samples))
+        count = max((samples.size - self.nfft) // self.step + 1, 0)
+        if count:
+            view = np.lib.stride_tricks.as_strided(samples, shape=(count, self.nfft), 
+                                                   strides=(self.step * samples.strides[0], samples.strides[0]), writeable=False)
+            for start in range(0, count, SPECTRUM_BATCH):
+                batch = min(SPECTRUM_BATCH, count - start)
+                segment = self.segment[:batch]
+                np.multiply(view[start:start + batch], self.window, out=segment)
+                spectrum = np.fft.rfft(segment, axis=1)
+                self.power += (spectrum.real**2 + spectrum.imag**2).sum(axis=0)
+        self.segments += count
+        self.tail = np.array(samples[count * self.step:])
+
+    def psd(self):
+        """
+        Return (frequency list [Hz], averaged power spectrum [dBFS]).
+        """
+        power = self.power / max(self.segments, 1)
+        return np.arange(self.power.size) * self.fs / self.nfft, 10 * np.log10(np.maximum(power / self.power_fs, 1e-30))
+
+    def metrics(self, harmonics=SPECTRUM_HARMONICS, spurs=SPECTRUM_SPURS):
+        """
+        Parameters:
+        * harmonics : integer : highest harmonic order, harmonics are folded in the first Nyquist zone.
+        * spurs     : integer : number of reported spurs.
+        Return {"fin", "carrier" [dBFS], "snr", "sinad", "sfdr" [dB], "enob" [bits], "harmonics": [(order, frequency [Hz], dBc), ...],
+        "spurs": [(frequency [Hz], dBc), ...]}.
+        Noise excludes DC, the carrier and the harmonics, SINAD includes the harmonics, SFDR is set by the largest
+        harmonic or non-harmonic spur.
+        """
+        power = self.power / max(self.segments, 1)
+        size = power.size
+        used = np.zeros(size, dtype=bool)
+        used[:SPECTRUM_DC_BINS] = True
+        search = power.copy()
+        search[used] = 0
+        fin_bin = int(np.argmax(search))
+        def lobe(center, width=SPECTRUM_LOBE_BINS):
+            return slice(max(center - width, 0), min(center + width + 1, size))
+        carrier = power[lobe(fin_bin, SPECTRUM_TONE_BINS)].sum()
+        used[lobe(fin_bin, SPECTRUM_TONE_BINS)] = True
+        harmonic_power = 0.0
+        harmonic_list = []
+        for order in range(2, harmonics + 1):
+            h_bin = (order * fin_bin) % self.nfft
+            if h_bin > self.nfft // 2:
+                h_bin = self.nfft - h_bin
+            if not used[h_bin]:
+                h_lobe = lobe(h_bin, SPECTRUM_TONE_BINS)
+                h_power = power[h_lobe][~used[h_lobe]].sum()
+                harmonic_power += h_power
+                harmonic_list.append((order, h_bin * self.fs / self.nfft, 10 * np.log10(max(h_power, 1e-30) / carrier)))
+                used[h_lobe] = True
+        noise = power[~used].sum()
+        # Spurs: highest lobes outside DC, the carrier, the harmonics and the previous spurs (bins claimed once)
+        spur_list = []
+        search = np.where(used, 0, power)
+        for _ in range(spurs):
+            s_bin = int(np.argmax(search))
+            if search[s_bin] <= 0:
+                break
+            spur = lobe(s_bin)
+            spur_list.append((s_bin * self.fs / self.nfft, 10 * np.log10(power[spur][~used[spur]].sum() / carrier)))
+            used[spur] = True
+            search[spur] = 0
+        snr = 10 * np.log10(carrier / noise)
+        sinad = 10 * np.log10(carrier / (noise + harmonic_power))
+        level_list = [level for order, frequency, level in harmonic_list] + [level for frequency, level in spur_list]
+        return {"fin": fin_bin * self.fs / self.nfft,
+                "carrier": 10 * np.log10(carrier / self.energy_fs),
+                "snr": snr,
+                "sinad": sinad,
+                "sfdr": -max(level_list) if level_list else float("inf"),
+                "enob": (sinad - 1.76) / 6.02,
+                "harmonics": harmonic_list,
+                "spurs": spur_list}
+
+## MAIN:
+if __name__ == "__main__":
+    # python spectrum.py samples.bin [fs] [processes] : Welch spectrum metrics of an int16 sample file.
+    # python spectrum.py check : metrics check on synthetic tones (see spectrum_check).
+    if len(sys.argv) < 2:
+        sys.exit("-- use 'python spectrum.py sample_file [fs] [processes]' or 'python spectrum.py check'")
+    if sys.argv[1] == "check":
+        result = spectrum_check()
+        print("-- spectrum check: %s" %(", ".join("%s %s" %(name, "ok" if ok else "FAILED") for name, ok in result.items())))
+        sys.exit(0 if all(result.values()) else 1)
+    fs = float(sys.argv[2]) if len(sys.argv) > 2 else SPECTRUM_FS
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    analyzer = welch_file(os.path.abspath(sys.argv[1]), fs, processes=processes)
+    metrics = analyzer.metrics()
+    print("-- " + spectrum_summary(metrics))
+    for frequency, level in metrics["spurs"]:
+        print("-- spur %.6g MHz %.2f dBc" %(frequency/1e6, level))
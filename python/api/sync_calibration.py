@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+import os
+import sys
+import time
+from ev12aq600_daemon import connect
+from ev12aq600 import sync_calibration_summary
+
+# python sync_calibration.py [board id] [temperature]  : SYNC sampling edge and SYNC delay calibration,
+# the result is cached per board and temperature bucket when both are provided.
+board_id = sys.argv[1] if len(sys.argv) > 1 else None
+temperature = float(sys.argv[2]) if len(sys.argv) > 2 else None
+
+app=connect()
+app.start_serial()
+app.deactivate_ev12aq600_rstn()
+app.sync_mode_training()
+print("-- " + sync_calibration_summary(app.sync_calibration(board_id, temperature)))
+app.stop_serial()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import align
+
+COMMA_FRAMES = np.array([align.COMMA & 0xFFFF, align.COMMA >> 16] * 2**16, dtype=np.uint16)
+
+def bitstream_words(frames, shift, slip=None):
+    """
+    Return the 64-bit words of the frames bitstream (first received bit is bit 0) delayed by shift bits,
+    slip=(frame, bits) inserts bits extra bits before the frame.
+    """
+    bits = np.unpackbits(frames.astype('<u2').view(np.uint8), bitorder='little')
+    if slip is not None:
+        frame, extra = slip
+        bits = np.insert(bits, frame * 16, np.zeros(extra, dtype=np.uint8))
+    bits = np.concatenate((np.random.default_rng(shift).integers(0, 2, shift, dtype=np.uint8), bits))
+    bits = bits[:bits.size // 64 * 64]
+    return np.packbits(bits, bitorder='little').view('<u8')
+
+@pytest.mark.parametrize("shift", [0, 1, 7, 15, 16, 31, 33, 63])
+def test_frame_alignment_offset(shift):
+    result = align.frame_alignment(bitstream_words(COMMA_FRAMES, shift))
+    assert result["frame_offset"] == shift % 16
+    assert result["offset"] % 16 == shift % 16
+    assert result["confidence"] == 1.0 and not result["slips"]
+
+def test_frame_alignment_random_data():
+    frames = np.random.default_rng(0).integers(0, 2**16, 2**17, dtype=np.uint16)
+    frames[::64] = align.COMMA & 0xFFFF
+    frames[1::64] = align.COMMA >> 16
+    result = align.frame_alignment(bitstream_words(frames, 5))
+    assert result["frame_offset"] == 5 and result["confidence"] > 0.9
+
+def test_frame_alignment_slip():
+    result = align.frame_alignment(bitstream_words(COMMA_FRAMES, 3, slip=(COMMA_FRAMES.size // 2, 4)))
+    assert len(result["slips"]) == 1
+    position, previous, new = result["slips"][0]
+    assert (previous, new) == (3, 7)
+    assert abs(position - COMMA_FRAMES.size // 2 * 16) <= align.ALIGN_WINDOW * align.ALIGN_WORD_WIDTH
+
+def test_frame_alignment_no_comma():
+    words = np.random.default_rng(0).integers(0, 2**16, 2**16, dtype=np.uint16)
+    words[(words & 0xFF) == 0xFF] = 0 # no 0xFF byte
+    words[(words >> 8) == 0xFF] = 0
+    assert align.frame_alignment(bitstream_words(words, 0)) is None
+
+def test_comma_count_chunks():
+    words = bitstream_words(COMMA_FRAMES, 9)
+    single = align.frame_alignment(words, chunk=words.size)
+    chunked = align.frame_alignment(words, chunk=2 * align.ALIGN_WINDOW)
+    assert chunked["matches"] == single["matches"] and chunked["frame_offset"] == single["frame_offset"]
+
+def test_capture_lane(tmp_path):
+    nb_lanes = 3
+    words = np.arange(nb_lanes * 100, dtype='<u%d' %(align.DESER_WIDTH // 8))
+    filename = str(tmp_path / "capture.bin")
+    words.tofile(filename)
+    lane_words = align.capture_lane(filename, nb_lanes, 1)
+    group = align.ALIGN_WORD_WIDTH // align.DESER_WIDTH
+    assert lane_words.dtype == np.uint64 and lane_words.size == 100 // group
+    assert int(lane_words[0]) & (2**align.DESER_WIDTH - 1) == 1
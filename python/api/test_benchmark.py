@@ -0,0 +1,34 @@
+import pytest
+import esistream
+import benchmark
+
+@pytest.fixture(scope="module")
+def config():
+    return esistream.esistream_config()
+
+def test_verify(config):
+    assert benchmark.verify(config) == {name: True for name in benchmark.BENCHMARK_KERNEL_LIST}
+
+@pytest.mark.parametrize("name", benchmark.BENCHMARK_KERNEL_LIST)
+def test_measure(config, name):
+    result = benchmark.measure(name, 2**8, config, "prbs", repeat=1)
+    assert result["cycles"] == 2**8 and result["mbps"] > 0 and result["peak"] >= 0
+
+def test_kernel_setup_prbs_index(config):
+    # the descramble kernel input is the data part of the capture: null data once descrambled
+    function, args, size, frames = benchmark.kernel_setup("descramble", 2**8, config, "prbs")
+    decoded = function(*args)
+    assert not (decoded & esistream.SAMPLE_MASK).any()
+
+def test_regression():
+    baseline = {"results": {"payload/ramp/4096": {"mbps": 1000.0, "peak": 2**20}}}
+    report = {"verify": {"payload": True}, "results": {"payload/ramp/4096": {"mbps": 900.0, "peak": 2**20}}}
+    assert benchmark.regression(report, baseline) == []
+    report["results"]["payload/ramp/4096"] = {"mbps": 500.0, "peak": 2**22}
+    report["verify"]["payload"] = False
+    regression_list = benchmark.regression(report, baseline)
+    assert len(regression_list) == 3 and regression_list[0] == "payload: output mismatch"
+
+def test_scaling(config):
+    result = benchmark.scaling("payload", config, [1, 2], cycles=2**10)
+    assert list(result) == [1, 2] and result[1]["efficiency"] == 1.0 and result[2]["mbps"] > 0
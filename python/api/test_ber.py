@@ -0,0 +1,66 @@
+import math
+import pytest
+import ber
+
+@pytest.mark.parametrize("k, n, p", [(0, 10, 0.1), (3, 20, 0.2), (10, 50, 0.3), (5, 5, 0.5)])
+def test_binomial_cdf(k, n, p):
+    reference = sum(math.comb(n, i) * p**i * (1-p)**(n-i) for i in range(k+1))
+    assert ber.binomial_cdf(k, n, p) == pytest.approx(reference, rel=1e-9)
+
+@pytest.mark.parametrize("k, n", [(0, 10), (1, 10), (5, 20), (19, 20)])
+def test_binomial_bounds(k, n):
+    alpha = 0.025
+    upper = ber.binomial_upper_bound(k, n, alpha)
+    lower = ber.binomial_lower_bound(k, n, alpha)
+    assert lower <= k / n <= upper
+    assert ber.binomial_cdf(k, n, upper) == pytest.approx(alpha, abs=1e-9)
+    if k:
+        assert 1 - ber.binomial_cdf(k - 1, n, lower) == pytest.approx(alpha, abs=1e-9)
+
+def test_ber_bounds_no_error():
+    lower, upper = ber.ber_bounds(1e12, 100, 0, 0.05)
+    assert lower == 0.0
+    assert upper == pytest.approx(-math.log(0.05) / 1e12, rel=1e-3) # rule of three
+    assert ber.ber_bounds(0, 0, 0, 0.05) == (0.0, float("inf"))
+
+def test_ber_bounds_all_intervals_in_error():
+    lower, upper = ber.ber_bounds(1e6, 10, 10, 0.05)
+    assert lower > 0 and upper == float("inf")
+
+def test_ber_bounds_contain_rate():
+    # 1e-9 BER, 1e8 bits per interval: q = 1 - exp(-0.1), about 95 error intervals out of 1000
+    lower, upper = ber.ber_bounds(1e11, 1000, 95, 0.025)
+    assert lower < 1e-9 < upper
+
+def test_ber_test_pass():
+    test = ber.ber_test(1e-12, 0.95)
+    intervals = 0
+    while test.update(1e12, False) == "undecided":
+        intervals += 1
+    assert test.decision == "pass" and intervals < 10
+    result = test.result()
+    assert result["error_intervals"] == 0 and result["ber"][1] < 1e-12
+
+def test_ber_test_fail():
+    test = ber.ber_test(1e-12, 0.95)
+    while test.update(1e12, True) == "undecided":
+        pass
+    assert test.decision == "fail" and test.result()["ber"][0] > 1e-12
+
+def test_ber_test_decision_kept():
+    test = ber.ber_test(1e-12, 0.95)
+    while test.update(1e12, False) == "undecided":
+        pass
+    for interval in range(10):
+        test.update(1e12, True)
+    assert test.decision == "pass" and test.result()["error_intervals"] == 10
+
+def test_ber_measurement(app):
+    app.ser.lane_ber_list[3] = 1e-3
+    result_list = app.ber_measurement(target=1e-6, poll_interval=0.001, timeout=1.0, lane_rate=1e9)
+    assert [result["decision"] for result in result_list] == ["pass"] * 3 + ["fail"] + ["pass"] * 4
+    assert "fail" in ber.ber_summary(3, result_list[3])
+
+def test_ber_measurement_link_not_valid(app):
+    app.ser.link_valid = False
+    assert app.ber_measurement(target=1e-6, poll_interval=0.001, timeout=0.1) is None
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+import capture
+import esistream
+
+CYCLES = 1000
+
+@pytest.fixture
+def frames():
+    data = esistream.ramp_data(CYCLES, capture.NB_LANES, capture.WORDS_PER_FRAME)
+    data += np.arange(capture.NB_LANES, dtype=np.uint16)[None, :, None] << esistream.SAMPLE_WIDTH
+    return data
+
+@pytest.mark.parametrize("signed", [True, False])
+def test_reconstruct_chunks(frames, signed):
+    reference = esistream.payload(frames, np.empty(frames.size, dtype=capture.SAMPLE_DTYPE), signed=signed)
+    np.testing.assert_array_equal(capture.reconstruct(frames, signed=signed, chunk_cycles=96), reference)
+
+def test_reconstruct_disparity(frames):
+    reference = capture.reconstruct(frames)
+    inverted = frames.copy()
+    inverted[::3] = (1 << esistream.DISPARITY_BIT) | (inverted[::3] ^ esistream.DISPARITY_MASK)
+    np.testing.assert_array_equal(capture.reconstruct(inverted, disparity=True, chunk_cycles=96), reference)
+
+def test_reconstruct_lane_order(frames):
+    lane_order = list(reversed(range(capture.NB_LANES)))
+    samples = capture.reconstruct(frames, lane_order=lane_order, signed=False, chunk_cycles=96)
+    np.testing.assert_array_equal(samples.reshape(CYCLES, capture.WORDS_PER_FRAME, capture.NB_LANES),
+                                  frames.transpose(0, 2, 1)[:, :, lane_order] & esistream.SAMPLE_MASK)
+
+def test_capture_file(tmp_path, frames):
+    capture_file, sample_file = str(tmp_path / "capture.bin"), str(tmp_path / "samples.bin")
+    frames.astype(capture.CAPTURE_DTYPE).tofile(capture_file)
+    with open(capture_file, "ab") as f:
+        f.write(b"\x00\x00") # incomplete rx_clk cycle, ignored
+    mapped = capture.capture_open(capture_file)
+    assert mapped.shape == frames.shape
+    out = capture.sample_open(sample_file, mapped.shape[0])
+    capture.reconstruct(mapped, out, chunk_cycles=96)
+    out.flush()
+    np.testing.assert_array_equal(np.fromfile(sample_file, dtype=capture.SAMPLE_DTYPE), capture.reconstruct(frames))
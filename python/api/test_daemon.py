@@ -0,0 +1,63 @@
+import os
+import stat
+import math
+import shutil
+import tempfile
+import threading
+import numpy as np
+import pytest
+from ev12aq600_daemon import encode, decode, ev12aq600_client, ev12aq600_daemon as daemon
+
+@pytest.mark.parametrize("value", [None, True, 3, -1.5, "text", [1, [2, 3]], (1, (2, "a")), {"a": 1, "b": [None]},
+                                   {17: 0x914, 18: None}, {(1, 2): "tuple key"}, {"__tuple__": 1}, ([False] * 8, [True] * 8, True)])
+def test_encode_round_trip(value):
+    assert decode(encode(value)) == value
+
+def test_encode_non_finite():
+    inf, minus_inf, nan = decode(encode([float("inf"), -float("inf"), float("nan")]))
+    assert inf == float("inf") and minus_inf == -float("inf") and math.isnan(nan)
+
+def test_encode_numpy():
+    value = decode(encode({"be": np.zeros(3, dtype=np.int64), "ber": np.float64(np.inf), "count": np.int64(7)}))
+    assert value == {"be": [0, 0, 0], "ber": float("inf"), "count": 7}
+    assert type(value["count"]) is int
+
+def test_encode_unsupported():
+    with pytest.raises(TypeError):
+        encode(object())
+
+@pytest.fixture
+def client(app):
+    # short directory: AF_UNIX socket path length limit
+    directory = tempfile.mkdtemp(prefix="aq6")
+    socket_path = os.path.join(directory, "daemon.sock")
+    server = daemon(app, socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = ev12aq600_client(socket_path)
+    yield client
+    client.stop_serial()
+    server.shutdown()
+    server.server_close()
+    shutil.rmtree(directory)
+
+def test_socket_owner_only(client):
+    assert stat.S_IMODE(os.stat(client.socket_path).st_mode) & 0o077 == 0
+
+def test_client_calls(client, app):
+    assert client.get_lane_status() == app.get_lane_status()
+    assert client.ev12aq600_get_register_values([0x11]) == {0x11: 0x914}
+    assert client.reg_array == app.reg_array
+
+def test_client_attribute_error(client):
+    assert not hasattr(client, "no_such_attribute")
+    assert getattr(client, "no_such_attribute", 42) == 42
+    assert hasattr(client, "reg_array")
+    with pytest.raises(AttributeError):
+        client.no_such_attribute
+    with pytest.raises(AttributeError):
+        client.__deepcopy__
+
+def test_client_remote_error(client):
+    with pytest.raises(RuntimeError):
+        client.call("set_bit", 2)
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+import esistream
+
+LANES = 4
+WORDS = 4
+CYCLES = esistream.DESCRAMBLE_BLOCK_CYCLES + 123 # more than one descramble block
+
+@pytest.fixture(scope="module")
+def table():
+    return esistream.prbs_table()
+
+def descrambled(frames, table, index):
+    sync = esistream.sync_prbs_cycles(WORDS * esistream.FRAME_WIDTH)
+    data = frames[2 * sync:]
+    prbs = esistream.prbs_extend(table, data.shape[0] * WORDS)
+    data_index = [(lane_index + 2 * sync * WORDS) % esistream.LFSR_PERIOD for lane_index in index]
+    return esistream.descramble(data, prbs, np.empty_like(data), data_index)
+
+def test_esistream_config():
+    config = esistream.esistream_config()
+    assert config["words"] == config["deser_width"] // esistream.FRAME_WIDTH
+    assert config["nb_lanes"] > 0
+
+def test_lfsr_table(table):
+    state = esistream.LFSR_INIT
+    for k in range(1000):
+        assert int(table[k]) == state & esistream.DATA_MASK
+        state = esistream.f_lfsr(state)
+
+def test_prbs_lock(table):
+    index_table = esistream.prbs_index_table(table)
+    frames = esistream.synthetic_capture(16, LANES, WORDS, pattern="prbs", index=[0, 100, 5000, 70000])
+    sync = esistream.sync_prbs_cycles(WORDS * esistream.FRAME_WIDTH)
+    for lane, index in enumerate([0, 100, 5000, 70000]):
+        assert esistream.prbs_lock(frames[:, lane], index_table) == (index, sync * WORDS)
+
+@pytest.mark.parametrize("disparity", [0.0, 0.5])
+def test_descramble_ramp(table, disparity):
+    index = [0, 1000, 2000, 3000]
+    frames = esistream.synthetic_capture(CYCLES, LANES, WORDS, index=index, disparity=disparity)
+    decoded = descrambled(frames, table, index)
+    np.testing.assert_array_equal(decoded & esistream.SAMPLE_MASK, esistream.ramp_data(CYCLES, LANES, WORDS))
+    be, cb = esistream.pattern_check(decoded, 2 * WORDS)
+    assert not be.any() and not cb.any()
+
+def test_descramble_reference(table):
+    index = [7, 11, 13, 17]
+    frames = esistream.synthetic_capture(64, LANES, WORDS, index=index, disparity=0.5)
+    sync = esistream.sync_prbs_cycles(WORDS * esistream.FRAME_WIDTH)
+    decoded = descrambled(frames, table, index)
+    for cycle in range(0, 64, 7):
+        for lane in range(LANES):
+            for word in range(WORDS):
+                prbs = int(table[(index[lane] + (2 * sync + cycle) * WORDS + word) % esistream.LFSR_PERIOD])
+                frame = int(frames[2 * sync + cycle, lane, word])
+                assert int(decoded[cycle, lane, word]) == esistream.rx_decoding_frame(frame, prbs)
+
+def test_descramble_scratch(table):
+    index = [0, 1000, 2000, 3000]
+    frames = esistream.synthetic_capture(1000, LANES, WORDS, index=index, disparity=0.5)
+    prbs = esistream.prbs_extend(table, frames.shape[0] * WORDS)
+    reference = esistream.descramble(frames, prbs, np.empty_like(frames), index)
+    scratch = np.empty((97, LANES, WORDS), dtype=np.uint16)
+    np.testing.assert_array_equal(esistream.descramble(frames, prbs, np.empty_like(frames), index, scratch=scratch), reference)
+    in_place = frames.copy()
+    esistream.descramble(in_place, prbs, in_place, index)
+    np.testing.assert_array_equal(in_place, reference)
+
+def test_payload_order():
+    data = esistream.ramp_data(100, LANES, WORDS)
+    data[:, :, :] += np.arange(LANES, dtype=np.uint16)[None, :, None] * 512
+    samples = esistream.payload(data, np.empty(data.size, dtype=np.int16))
+    np.testing.assert_array_equal(samples.reshape(100, WORDS, LANES).transpose(0, 2, 1) + esistream.SAMPLE_OFFSET, data & esistream.SAMPLE_MASK)
+    lane_order = [2, 0, 3, 1]
+    ordered = esistream.payload(data, np.empty(data.size, dtype=np.int16), lane_order, signed=False)
+    np.testing.assert_array_equal(ordered.reshape(100, WORDS, LANES), data.transpose(0, 2, 1)[:, :, lane_order] & esistream.SAMPLE_MASK)
+
+def test_payload_disparity():
+    data = esistream.ramp_data(100, LANES, WORDS)
+    frames = data.copy()
+    inverted = np.random.default_rng(0).random(frames.shape) < 0.5
+    frames[inverted] = (1 << esistream.DISPARITY_BIT) | (frames[inverted] ^ esistream.DISPARITY_MASK)
+    reference = esistream.payload(data, np.empty(data.size, dtype=np.int16))
+    np.testing.assert_array_equal(esistream.payload(frames, np.empty(data.size, dtype=np.int16), disparity=True), reference)
+    scratch = np.empty((200, WORDS), dtype=np.int16)
+    np.testing.assert_array_equal(esistream.payload(frames, np.empty(data.size, dtype=np.int16), disparity=True, scratch=scratch), reference)
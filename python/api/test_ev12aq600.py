@@ -0,0 +1,109 @@
+import pytest
+from ev12aq600 import register_dump_lines, sync_eye_search, sync_calibration_summary, EV12AQ600_DUMP_ADDRESS_LIST, SPI_FIFO_DEPTH
+from ev12aq600 import SPI_SLAVE_EV12AQ600, SPI_SLAVE_EXTERNAL_PLL, EV12AQ600_WRITE_OPERATION_MASK
+from transport import LOOPBACK_SYNC_EYE_LIST
+
+def spi_bursts(app):
+    """
+    Return the list of the (SPI slave, input FIFO words) bursts received by the loopback device.
+    """
+    burst_list = []
+    spi_start = app.ser.spi_start
+    def record():
+        burst_list.append((app.ser.reg_array[3] & 0x1, list(app.ser.spi_fifo_in)))
+        spi_start()
+    app.ser.spi_start = record
+    return burst_list
+
+def schedule_aq600(app, address, data):
+    address |= EV12AQ600_WRITE_OPERATION_MASK
+    app.reg_aq600_array[address] = data
+    app.spi_schedule_aq600(address)
+
+def test_get_register_value(app):
+    assert app.ev12aq600_get_register_value(0x0011) == 0x0914 # Chip ID
+
+def test_get_register_values(app):
+    address_list = list(range(0x0100, 0x0100 + SPI_FIFO_DEPTH)) # two SPI Master batches
+    app.ser.reg_aq600.update({address: address ^ 0x5A5A for address in address_list})
+    rcv = app.ev12aq600_get_register_values(address_list + [0x8011]) # write operation bit ignored
+    assert list(rcv) == address_list + [0x0011]
+    assert all(rcv[address] == address ^ 0x5A5A for address in address_list) and rcv[0x0011] == 0x0914
+    assert not app.ser.spi_fifo_out
+
+def test_get_register_values_stale_fifo(app):
+    app.ser.spi_fifo_out.extend([0xDEAD, 0xBEEF]) # previous read operation data
+    assert app.ev12aq600_get_register_values([0x0011]) == {0x0011: 0x0914}
+
+def test_dump_registers(app):
+    rcv = app.ev12aq600_dump_registers()
+    assert list(rcv) == EV12AQ600_DUMP_ADDRESS_LIST
+    lines = register_dump_lines({0x0011: 0x0914, 0x0B07: None})
+    assert lines == ["0x0011 : 0x0914", "0x0B07 : error"]
+
+def test_schedule_pll_first(app):
+    burst_list = spi_bursts(app)
+    app.spi_schedule_defer()
+    schedule_aq600(app, 0x000C, 0x1)
+    app.external_pll_configuration([0x010001, 0x020002]) # deferred
+    schedule_aq600(app, 0x0B07, 0x2)
+    assert not burst_list
+    assert app.spi_schedule_run() == 2
+    assert burst_list == [(SPI_SLAVE_EXTERNAL_PLL, [0x010001, 0x020002]),
+                          (SPI_SLAVE_EV12AQ600, [0x800C, 0x1, 0x8B07, 0x2])]
+    assert app.ser.reg_aq600[0x000C] == 0x1 and app.ser.reg_pll == {0x01: 0x0001, 0x02: 0x0002}
+
+def test_schedule_barrier(app):
+    burst_list = spi_bursts(app)
+    app.spi_schedule_defer()
+    schedule_aq600(app, 0x000C, 0x1)
+    app.spi_schedule_barrier()
+    app.spi_schedule_pll([0x000003])
+    app.spi_schedule_barrier()
+    schedule_aq600(app, 0x000C, 0x0)
+    schedule_aq600(app, 0x0B07, 0x2)
+    assert app.spi_schedule_run() == 3
+    assert [slave for slave, words in burst_list] == [SPI_SLAVE_EV12AQ600, SPI_SLAVE_EXTERNAL_PLL, SPI_SLAVE_EV12AQ600]
+    assert app.ser.reg_aq600[0x000C] == 0x0
+
+def test_schedule_merge_and_split(app):
+    burst_list = spi_bursts(app)
+    app.spi_schedule_defer()
+    for address in range(100):
+        schedule_aq600(app, 0x0100 + address, address)
+    app.spi_schedule_barrier()
+    for address in range(100, 200):
+        schedule_aq600(app, 0x0100 + address, address)
+    assert app.spi_schedule_run() == 2 # same slave phases merged, 400 words split in FIFO sized bursts
+    assert [len(words) for slave, words in burst_list] == [SPI_FIFO_DEPTH - 1, 400 - (SPI_FIFO_DEPTH - 1)]
+    assert all(app.ser.reg_aq600[0x0100 + address] == address for address in range(200))
+
+def test_schedule_before_read(app):
+    app.spi_schedule_defer()
+    schedule_aq600(app, 0x0B07, 0x1234)
+    assert app.ev12aq600_get_register_value(0x0B07) == 0x1234
+    assert not any(app.spi_schedule_list)
+
+@pytest.mark.parametrize("first, last", [(140, 290), (0, 40), (400, 511), (200, 240)])
+def test_sync_eye_search(first, last):
+    probe_list = []
+    def probe(tap):
+        probe_list.append(tap)
+        return first <= tap <= last
+    assert sync_eye_search(probe, 511, 32) == (first, last)
+    assert len(set(probe_list)) < 60
+
+def test_sync_eye_search_no_eye():
+    assert sync_eye_search(lambda tap: False, 511, 32) is None
+
+def test_sync_calibration(app, tmp_path):
+    cache_file = str(tmp_path / "sync_calibration.json")
+    result = app.sync_calibration("board", 25.0, cache_file)
+    first, last = max(LOOPBACK_SYNC_EYE_LIST, key=lambda eye: eye[1] - eye[0])
+    assert result["tap"] == (first + last) // 2 and list(result["eye"]) == [first, last]
+    assert app.get_sync_odelay() == result["tap"]
+    cached = app.sync_calibration("board", 29.0, cache_file)
+    assert cached["cache"] == "board/2" and cached["tap"] == result["tap"]
+    assert "cache board/2" in sync_calibration_summary(cached)
+    app.ser.sync_eye_list = [(0, -1), (0, -1)]
+    assert app.sync_calibration() is None
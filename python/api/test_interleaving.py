@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import interleaving
+
+FS = interleaving.INTERLEAVING_FS
+OFFSET_LIST = [3.0, -2.0, 0.5, -1.5]
+GAIN_LIST = [1.01, 0.99, 1.0, 1.0]
+SKEW_LIST = [1e-12, -1e-12, 0.5e-12, -0.5e-12]
+
+def sine(size=2**18, fin=1.123e9, amplitude=1800.0):
+    n = np.arange(size)
+    core = n % interleaving.NB_CORES
+    gain, offset, skew = np.array(GAIN_LIST)[core], np.array(OFFSET_LIST)[core], np.array(SKEW_LIST)[core]
+    x = offset + amplitude * gain * np.sin(2 * np.pi * fin * (n / FS + skew) + 0.3)
+    return np.round(x).astype('<i2')
+
+def test_estimate_frequency():
+    omega = interleaving.estimate_frequency(sine(2**16))
+    assert omega * FS / (2 * np.pi) == pytest.approx(1.123e9, rel=1e-6)
+
+def test_mismatch_estimate():
+    mismatch_list = interleaving.mismatch_estimate(sine(), FS)
+    for core, mismatch in enumerate(mismatch_list):
+        assert mismatch["offset"] == pytest.approx(OFFSET_LIST[core], abs=0.05)
+        assert mismatch["gain"] == pytest.approx(GAIN_LIST[core] / np.mean(GAIN_LIST), abs=1e-4)
+        assert mismatch["skew"] == pytest.approx(SKEW_LIST[core] - np.mean(SKEW_LIST), abs=0.05e-12)
+
+def test_mismatch_estimate_chunks():
+    samples = sine(2**16 + 12)
+    reference = interleaving.mismatch_estimate(samples, FS, chunk=samples.size)
+    chunked = interleaving.mismatch_estimate(samples, FS, chunk=1000)
+    for core in range(interleaving.NB_CORES):
+        for name in ["offset", "gain", "skew"]:
+            assert chunked[core][name] == pytest.approx(reference[core][name], rel=1e-6, abs=1e-15)
+
+def test_mismatch_estimate_bad_frequency():
+    with pytest.raises(ValueError):
+        interleaving.mismatch_estimate(sine(2**14), FS, omega=2 * np.pi / interleaving.NB_CORES * 2)
+
+def test_correction_table():
+    mismatch_list = [{"offset": 2.0, "gain": 1.25, "skew": 1e-12}]
+    assert interleaving.correction_table(mismatch_list) == [{"offset": -2.0, "gain": 0.8, "skew": -1e-12}]
+
+def test_core_correction(app):
+    correction_list = [{"offset": -2.0, "gain": 0.99, "skew": 1e-12}, {"offset": 1.0, "gain": 1.01, "skew": -2e-12}]
+    address_list = [(0x0100, 0x0101, 0x0102), (0x0110, 0x0111, 0x0112)]
+    code_list = app.ev12aq600_core_correction(correction_list, address_list, 0.5, 1e-4, 1e-13)
+    assert code_list == [(-4, -100, 10), (2, 100, -20)]
+    assert app.ser.reg_aq600[0x0100] == (-4) & 0xFFFF and app.ser.reg_aq600[0x0112] == (-20) & 0xFFFF
@@ -0,0 +1,66 @@
+import os
+import journal
+from ev12aq600 import ev12aq600
+
+def record_session(filename):
+    app = ev12aq600()
+    app.start_serial("loop://", journal_file=filename)
+    app.deactivate_ev12aq600_rstn()
+    app.external_pll_configuration_6400()
+    app.ev12aq600_configuration_ramp_mode()
+    app.ev12aq600_dump_registers()
+    app.stop_serial()
+
+def test_journal_records(tmp_path):
+    filename = str(tmp_path / "journal.bin")
+    record_session(filename)
+    record_list = journal.journal_read(filename)
+    assert record_list[0][1] == journal.JOURNAL_SESSION
+    tx_list = [record for record in record_list if record[1] == journal.JOURNAL_TX]
+    rx_list = [record for record in record_list if record[1] == journal.JOURNAL_RX]
+    assert [record[2] for record in tx_list] == list(range(1, len(tx_list) + 1))
+    assert {record[2] for record in rx_list} == {record[2] for record in tx_list}
+    assert all(len(record[3]) in [journal.UART_READ_FRAME_LENGTH, journal.UART_WRITE_FRAME_LENGTH] for record in tx_list)
+
+def test_journal_replay(tmp_path):
+    filename = str(tmp_path / "journal.bin")
+    record_session(filename)
+    record_session(filename)
+    assert len(journal.journal_sessions(journal.journal_read(filename))) == 2
+    result = journal.journal_replay(filename)
+    assert result["frames"] > 0 and result["mismatches"] == 0
+
+def test_journal_split_frames(tmp_path):
+    log = journal.journal(str(tmp_path / "journal.bin"))
+    log.record_tx(b'\x80\x08\x00') # read frame and first byte of a write frame
+    log.record_tx(b'\x07\x00\x00\x00\x01')
+    log.record_rx(b'\x00\x00\x03\x01\xAC\xAC')
+    log.close()
+    record_list = journal.journal_read(log.filename)[1:]
+    assert record_list[0][1:] == (journal.JOURNAL_TX, 1, b'\x80\x08')
+    assert record_list[1][1:] == (journal.JOURNAL_TX, 2, b'\x00\x07\x00\x00\x00\x01')
+    assert record_list[2][1:] == (journal.JOURNAL_RX, 1, b'\x00\x00\x03\x01\xAC')
+    assert record_list[3][1:] == (journal.JOURNAL_RX, 2, b'\xAC')
+
+def test_journal_ring_full(tmp_path):
+    log = journal.journal(str(tmp_path / "journal.bin"), records=8)
+    log.running = False # background flush stopped, after the session record
+    log.event.set()
+    log.thread.join()
+    for sequence in range(20):
+        log.record_tx(b'\x80\x08')
+    assert log.dropped == 20 - 8
+    log.close()
+    assert len(journal.journal_read(log.filename)) == 1 + 8
+
+def test_journal_rotate(tmp_path):
+    filename = str(tmp_path / "journal.bin")
+    log = journal.journal(filename, max_size=10 * journal.JOURNAL_RECORD_LENGTH, backups=2)
+    for cycle in range(3):
+        for sequence in range(8):
+            log.record_tx(b'\x80\x08')
+        log.flush()
+    log.close()
+    assert os.path.exists(filename + ".1") and os.path.exists(filename + ".2")
+    assert not os.path.exists(filename + ".3")
+    assert os.path.getsize(filename) <= 10 * journal.JOURNAL_RECORD_LENGTH
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import esistream
+import latency
+from ev12aq600 import RESYNC_OUTCOME_LIST, RESYNC_PASS, RESYNC_NOT_READY
+from transport import LOOPBACK_SYNC_LATENCY
+
+SKEW_LIST = [0, 1, 0, 2, 0, 0, 3, 0]
+
+def ramp_capture(skew_list=SKEW_LIST, cycles=256):
+    frames = esistream.ramp_data(cycles, len(skew_list), latency.WORDS_PER_FRAME)
+    frames -= (np.array(skew_list, dtype=np.uint16) * latency.RAMP_STEP)[None, :, None]
+    return frames & esistream.SAMPLE_MASK
+
+def record(outcome=RESYNC_PASS, latency_value=42, skew=None):
+    return {"outcome": outcome, "latency": latency_value, "skew": skew}
+
+def test_lane_skew_ramp():
+    assert latency.lane_skew_ramp(ramp_capture()) == SKEW_LIST
+
+def test_lane_skew_ramp_bit_errors():
+    frames = ramp_capture()
+    frames[::17, 3, 1] ^= 0x40
+    assert latency.lane_skew_ramp(frames) == SKEW_LIST
+
+def test_statistics_deterministic():
+    statistics = latency.latency_statistics([record(skew=SKEW_LIST) for iteration in range(10)])
+    assert statistics["deterministic"] and statistics["failures"] == 0
+    assert statistics["latency"] == {42: 10} and statistics["skew_max"] == 3
+
+def test_statistics_latency_change():
+    statistics = latency.latency_statistics([record(), record(latency_value=43)])
+    assert not statistics["deterministic"]
+    assert (statistics["latency_min"], statistics["latency_max"]) == (42, 43)
+
+def test_statistics_failed_resync():
+    statistics = latency.latency_statistics([record(), record(RESYNC_NOT_READY, None)])
+    assert not statistics["deterministic"] and statistics["failures"] == 1
+    assert statistics["outcomes"][RESYNC_OUTCOME_LIST[RESYNC_NOT_READY]] == 1
+    assert "1 failed resyncs" in latency.latency_summary(statistics)
+
+def test_latency_check(app):
+    statistics, record_list = app.latency_check(5, ramp_capture, settle=0, dwell=0)
+    assert [result["outcome"] for result in record_list] == [RESYNC_PASS] * 5
+    assert statistics["deterministic"] and statistics["latency"] == {LOOPBACK_SYNC_LATENCY: 5}
+    assert all(result["skew"] == SKEW_LIST for result in record_list)
+
+def test_latency_check_not_ready(app):
+    app.ser.sync_failure_rate = 1.0
+    statistics, record_list = app.latency_check(2, ramp_capture, settle=0, dwell=0, timeOut=0.05)
+    assert [result["outcome"] for result in record_list] == [RESYNC_NOT_READY] * 2
+    assert all(result["latency"] is None and result["skew"] is None for result in record_list)
+    assert not statistics["deterministic"] and statistics["failures"] == 2
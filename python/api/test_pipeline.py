@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import esistream
+import pipeline
+
+CYCLES = 5000
+WORKERS = {"descramble": 1, "check": 1, "payload": 1}
+
+@pytest.fixture(scope="module")
+def config():
+    return pipeline.pipeline_config(chunk_cycles=1024)
+
+@pytest.fixture
+def capture_file(tmp_path, config):
+    frames = esistream.synthetic_capture(CYCLES, config["nb_lanes"], config["words"], index=[1000 * lane for lane in range(config["nb_lanes"])], disparity=0.1)
+    filename = str(tmp_path / "capture.bin")
+    frames.tofile(filename)
+    return filename
+
+def ramp_samples(config):
+    data = esistream.ramp_data(CYCLES, config["nb_lanes"], config["words"])
+    return esistream.payload(data, np.empty(data.size, dtype=pipeline.SAMPLE_DTYPE))
+
+def test_pipeline(tmp_path, config, capture_file):
+    sync = esistream.sync_prbs_cycles(config["ser_width"])
+    output_file = str(tmp_path / "samples.bin")
+    summary = pipeline.pipeline_run(capture_file, dict(config, output_file=output_file), WORKERS)
+    assert summary["cycles"] == CYCLES + 2 * sync
+    assert not summary["be"].any() and not summary["cb"].any()
+    assert all(stats["chunks"] == -(-summary["cycles"] // config["chunk_cycles"]) for stats in summary["stages"].values())
+    samples = np.fromfile(output_file, dtype=pipeline.SAMPLE_DTYPE)
+    np.testing.assert_array_equal(samples[2 * sync * config["nb_lanes"] * config["words"]:], ramp_samples(config))
+
+def test_pipeline_bit_error(config, capture_file):
+    frames = np.memmap(capture_file, dtype=pipeline.CAPTURE_DTYPE, mode='r+').reshape(-1, config["nb_lanes"], config["words"])
+    frames[3000, 2, 1] ^= 0x4 # data bit: the frame differs from the previous and the next cycle
+    frames.flush()
+    del frames
+    summary = pipeline.pipeline_run(capture_file, config, WORKERS)
+    assert summary["be"].tolist() == [0, 0, 2] + [0] * (config["nb_lanes"] - 3)
+
+def test_pipeline_no_sync(tmp_path, config):
+    filename = str(tmp_path / "capture.bin")
+    np.zeros((100, config["nb_lanes"], config["words"]), dtype=pipeline.CAPTURE_DTYPE).tofile(filename)
+    assert pipeline.pipeline_run(filename, config, WORKERS) is None
+
+def test_pipeline_worker_failure(config, capture_file):
+    # PRBS index of the first lane only: descramble worker exception
+    assert pipeline.pipeline_run(capture_file, dict(config, prbs_index=[0]), WORKERS) is None
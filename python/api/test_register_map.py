@@ -0,0 +1,28 @@
+import pytest
+import register_map
+import register_table
+
+GENERIC_DICT = {"NB_LANES": 8, "DESER_WIDTH": 64}
+
+@pytest.mark.parametrize("text, value", [("3", 3), ("NB_LANES", 8), ("NB_LANES-1", 7), ("2*DESER_WIDTH - 1", 127),
+                                         ("8 - 2 * 3 + 1", 3), ("NB_LANES*DESER_WIDTH", 512)])
+def test_vhdl_expression(text, value):
+    assert register_map.vhdl_expression(text, GENERIC_DICT) == value
+
+@pytest.mark.parametrize("text", ["", "-1", "1 +", "* 2", "1 2", "DESER_WIDTH/2", "DESER_WIDTH**2", "(1)",
+                                  "UNKNOWN", "__import__('os')", "NB_LANES.real"])
+def test_vhdl_expression_invalid(text):
+    with pytest.raises(ValueError):
+        register_map.vhdl_expression(text, GENERIC_DICT)
+
+def test_vhdl_range():
+    assert register_map.vhdl_range("5", GENERIC_DICT) == (5, 1)
+    assert register_map.vhdl_range("NB_LANES-1 downto 0", GENERIC_DICT) == (0, 8)
+    assert register_map.vhdl_range("2*DESER_WIDTH-1 DOWNTO DESER_WIDTH", GENERIC_DICT) == (64, 64)
+
+def test_register_table_up_to_date():
+    register_list = register_map.parse_register_map()
+    field_list = register_map.parse_top_level(register_list)
+    with open(register_map.REGISTER_TABLE_FILE) as f:
+        assert register_map.register_table_source(register_list, field_list) == f.read()
+    assert register_table.FIELD_DICT["aq600_rstn"].address == 2
@@ -0,0 +1,45 @@
+import pytest
+from ev12aq600 import snapshot_pack, snapshot_unpack, FIELD_DICT
+
+def configure(app, rstn=True):
+    app.external_pll_configuration_6400()
+    app.ev12aq600_configuration_ramp_mode()
+    if not rstn:
+        app.active_ev12aq600_rstn()
+    return app.get_snapshot()
+
+def test_pack_unpack(app):
+    snapshot = configure(app)
+    assert snapshot_unpack(snapshot_pack(snapshot)) == snapshot
+
+def test_unpack_bad_magic(app):
+    data = bytearray(snapshot_pack(configure(app)))
+    data[0] ^= 0xFF
+    with pytest.raises(ValueError):
+        snapshot_unpack(bytes(data))
+
+@pytest.mark.parametrize("rstn", [True, False])
+def test_restore_round_trip(app, rstn):
+    snapshot = configure(app, rstn)
+    app.ev12aq600_configuration_pattern0_mode()
+    app.deactivate_ev12aq600_rstn()
+    app.snapshot_restore(snapshot)
+    assert app.get_snapshot() == snapshot
+    rstn_field = FIELD_DICT["aq600_rstn"]
+    assert bool(app.read_register(rstn_field.address) & rstn_field.mask) == rstn
+
+def test_restore_converges(app):
+    snapshot = configure(app)
+    app.snapshot_restore(snapshot)
+    assert app.snapshot_restore(snapshot, live=app.get_snapshot()) == 0
+
+def test_restore_minimal_writes(app):
+    snapshot = configure(app)
+    app.snapshot_restore(snapshot)
+    app.ev12aq600_configuration_pattern0_mode()
+    live = app.get_snapshot()
+    # only the ADC test mode registers differ, the PLL plan is known
+    expected = sum(1 for addr, data in snapshot["reg_aq600"].items() if live["reg_aq600"].get(addr) != data)
+    assert expected > 0
+    assert app.snapshot_restore(snapshot, live=live) == expected
+    assert app.get_snapshot() == snapshot
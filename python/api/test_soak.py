@@ -0,0 +1,29 @@
+import soak
+from ev12aq600 import RESYNC_OUTCOME_LIST, RESYNC_PASS, RESYNC_NOT_READY, RESYNC_ERRORS
+from transport import LOOPBACK_SYNC_LATENCY
+
+def result(outcome=RESYNC_PASS, be=0, cb=0):
+    return {"outcome": outcome, "ready": None if outcome == RESYNC_NOT_READY else 1e-4,
+            "latency": None if outcome == RESYNC_NOT_READY else 42, "be": be, "cb": cb, "duration": 0.02}
+
+def test_soak_log(tmp_path):
+    log = soak.soak_log()
+    for cycle_result in [result(), result(RESYNC_NOT_READY), result(RESYNC_ERRORS, be=0x5, cb=0x4)]:
+        log.append(cycle_result)
+    assert log.cycles == 3 and log.outcome_count == [1, 1, 1, 0]
+    assert log.be_count == [1, 0, 1, 0, 0, 0, 0, 0] and log.cb_count == [0, 0, 1, 0, 0, 0, 0, 0]
+    summary = log.summary()
+    assert "2 failures" in summary and "not ready 1" in summary and "lane errors" in summary
+    filename = str(tmp_path / "soak_log.bin")
+    log.save(filename)
+    header, column_dict = soak.soak_log_read(filename)
+    assert header["cycles"] == 3 and header["outcomes"] == RESYNC_OUTCOME_LIST
+    assert list(column_dict["outcome"]) == [RESYNC_PASS, RESYNC_NOT_READY, RESYNC_ERRORS]
+    assert list(column_dict["latency"]) == [42, -1, 42] and list(column_dict["be"]) == [0, 0, 0x5]
+
+def test_soak(app):
+    app.ser.sync_failure_rate = 0.5
+    log = soak.soak(app, 20, summary_period=0, settle=0, dwell=0, timeOut=0.01)
+    assert log.cycles == 20
+    assert log.outcome_count[RESYNC_PASS] + log.outcome_count[RESYNC_NOT_READY] == 20
+    assert all(latency in [-1, LOOPBACK_SYNC_LATENCY] for latency in log.column_dict["latency"])
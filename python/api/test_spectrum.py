@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+import spectrum
+
+NFFT = 2**12
+
+def tone(fin_bin, segments=32, harmonic=None, spur=None, nfft=NFFT):
+    index = np.arange((segments + 1) * nfft // 2)
+    signal = np.sin(2 * np.pi * fin_bin / nfft * index)
+    if harmonic is not None:
+        signal += 10**(harmonic / 20) * np.sin(2 * np.pi * 3 * fin_bin / nfft * index)
+    if spur is not None:
+        signal += 10**(spur / 20) * np.sin(2 * np.pi * (nfft // 7 + 0.3) / nfft * index)
+    return np.round((spectrum.SPECTRUM_FULL_SCALE - 1) / np.abs(signal).max() * signal).astype('<i2')
+
+def metrics(samples, nfft=NFFT):
+    analyzer = spectrum.spectrum_analyzer(nfft)
+    analyzer.update(samples)
+    return analyzer.metrics()
+
+def test_spectrum_check():
+    assert all(spectrum.spectrum_check().values())
+
+@pytest.mark.parametrize("offset", [0.0, 0.25, 0.5, 0.75])
+def test_clean_tone_sfdr(offset):
+    result = metrics(tone(NFFT // 53 + offset))
+    assert abs(result["fin"] * NFFT / spectrum.SPECTRUM_FS - (NFFT // 53 + offset)) <= 0.5
+    assert result["sfdr"] > spectrum.SPECTRUM_CHECK_SFDR
+    assert 70 < result["snr"] < 76 # 12-bit quantization noise
+
+def test_harmonic_sets_sfdr():
+    result = metrics(tone(NFFT // 53 + 0.5, harmonic=-60.0, spur=-80.0))
+    assert result["sfdr"] == pytest.approx(60.0, abs=1.0)
+    assert [order for order, frequency, level in result["harmonics"] if level > -70] == [3]
+    assert result["spurs"][0][1] == pytest.approx(-80.0, abs=1.0)
+    assert result["sinad"] < result["snr"]
+
+def test_spur_sets_sfdr():
+    result = metrics(tone(NFFT // 53, harmonic=-85.0, spur=-70.0))
+    assert result["sfdr"] == pytest.approx(70.0, abs=1.0)
+
+def test_streaming_update():
+    samples = tone(NFFT // 53 + 0.3)
+    reference = spectrum.spectrum_analyzer(NFFT)
+    reference.update(samples)
+    analyzer = spectrum.spectrum_analyzer(NFFT)
+    for start in range(0, samples.size, 1000):
+        analyzer.update(samples[start:start + 1000])
+    assert analyzer.segments == reference.segments
+    np.testing.assert_allclose(analyzer.power, reference.power, rtol=1e-9)
+
+def test_welch_file(tmp_path):
+    samples = tone(NFFT // 53 + 0.3)
+    filename = str(tmp_path / "samples.bin")
+    samples.tofile(filename)
+    single = spectrum.welch_file(filename, nfft=NFFT)
+    pool = spectrum.welch_file(filename, nfft=NFFT, processes=2)
+    assert pool.segments == single.segments
+    np.testing.assert_allclose(pool.power, single.power, rtol=1e-9)
@@ -0,0 +1,96 @@
+import socket
+import threading
+import pytest
+import transport
+from register_table import read_frame, write_frame
+
+def read_response(ser, address):
+    ser.write(read_frame(address))
+    response = ser.read(5)
+    assert response[4:] == transport.LOOPBACK_ACK
+    return int.from_bytes(response[:4], byteorder='big')
+
+def test_loopback_registers():
+    ser = transport.open_transport(transport.LOOPBACK_URL, timeout=0)
+    assert isinstance(ser, transport.loopback_transport) and ser.isOpen()
+    assert read_response(ser, 8) == transport.LOOPBACK_HDL_VERSION
+    assert read_response(ser, 255) == transport.LOOPBACK_STATUS
+    ser.write(write_frame(7, 0x1234))
+    assert ser.read(1) == transport.LOOPBACK_ACK
+    assert read_response(ser, 7) == 0x1234
+    ser.write(write_frame(8, 0)) # read-only register
+    assert ser.read(1) == transport.LOOPBACK_ACK
+    assert read_response(ser, 8) == transport.LOOPBACK_HDL_VERSION
+    ser.close()
+    assert not ser.isOpen()
+
+def test_loopback_partial_frames():
+    ser = transport.loopback_transport()
+    frame = write_frame(12, 0x55) + read_frame(12)
+    for offset in range(len(frame)):
+        ser.send(frame[offset:offset + 1])
+    assert ser.read(6) == transport.LOOPBACK_ACK + (0x55).to_bytes(4, byteorder='big') + transport.LOOPBACK_ACK
+
+def test_write_buffer():
+    ser = transport.loopback_transport()
+    sent = []
+    send = ser.send
+    ser.send = lambda data: (sent.append(data), send(data))
+    for address in range(3):
+        ser.write(write_frame(12, address))
+    assert not sent
+    assert ser.inWaiting() == 3 and len(sent) == 1
+    ser.write_buffer_length = 12
+    ser.write(write_frame(12, 3))
+    ser.write(write_frame(12, 4)) # buffer full, sent
+    assert len(sent) == 2
+
+def test_read_timeout():
+    ser = transport.loopback_transport(timeout=0.01)
+    ser.write(write_frame(12, 0))
+    assert ser.read(5) == transport.LOOPBACK_ACK
+
+def test_loopback_spi():
+    ser = transport.loopback_transport()
+    for command in [0x8001, 0x1234, 0x0001, 0x0000]: # write then read ADC register 0x0001
+        ser.write(write_frame(4, command))
+    ser.write(write_frame(3, 0x2))
+    ser.read(5)
+    assert read_response(ser, 10) == 0x1234
+    assert read_response(ser, 9) & 0x2 # FIFO out empty
+
+def test_tcp_bridge():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    device = transport.loopback_transport()
+    def bridge():
+        connection, address = server.accept()
+        with connection:
+            while True:
+                data = connection.recv(4096)
+                if not data:
+                    break
+                device.send(data)
+                connection.sendall(bytes(device.read_buffer))
+                del device.read_buffer[:]
+    thread = threading.Thread(target=bridge, daemon=True)
+    thread.start()
+    ser = transport.open_transport("tcp://127.0.0.1:%d" %(server.getsockname()[1]), timeout=1)
+    assert isinstance(ser, transport.tcp_transport)
+    for address in range(100):
+        ser.write(write_frame(12, address))
+    assert ser.read(100) == transport.LOOPBACK_ACK * 100
+    assert read_response(ser, 12) == 99
+    ser.close()
+    thread.join(1)
+    server.close()
+    assert not ser.isOpen()
+
+def test_journal(tmp_path):
+    filename = str(tmp_path / "journal.bin")
+    ser = transport.open_transport(transport.LOOPBACK_URL, journal_file=filename)
+    assert ser.journal is not None
+    read_response(ser, 8)
+    ser.close()
+    assert ser.journal is None
@@ -0,0 +1,319 @@
+import math
+import time
+import random
+import socket
+import select
+import logging
+
+## CONSTANTS:
+TCP_URL_PREFIX = "tcp://"
+LOOPBACK_URL = "loop://"
+RECV_CHUNK_LENGTH = 4096
+# Loopback device (rx_esistream_top.vhd, register_map.vhd):
+LOOPBACK_REG_NUMBER = 20
+LOOPBACK_HDL_VERSION = 0x00000301
+LOOPBACK_STATUS = 0x20152018
+LOOPBACK_READ_LIST = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 18, 19, 255]
+LOOPBACK_WRITE_LIST = [0, 1, 2, 3, 4, 5, 6, 7, 12, 13, 14, 15, 16, 17]
+LOOPBACK_SPI_FIFO_DEPTH = 2**8-1
+LOOPBACK_ACK = b'\xAC'
+LOOPBACK_NB_LANES = 8
+LOOPBACK_LANE_RATE = 12.8e9
+LOOPBACK_SYNC_LATENCY = 42 # SYNC to lanes ready [rx_clk cycles].
+LOOPBACK_SYNC_EYE_LIST = [(140, 290), (300, 480)] # Valid SYNC ODELAYE3 taps, positive and negative sampling edges.
+
+## FUNCTIONS:
+def open_transport(port, baudrate=115200, timeout=1, journal_file=None):
+    """
+    Parameters:
+    * port         : string  : serial port name ("COM16", "/dev/ttyUSB0"),
+                               "tcp://host:port" for a serial-over-IP bridge (raw TCP socket),
+                               "loop://" for the in-process loopback device.
+    * baudrate     : integer : serial port baud rate, standard or not (must match the FPGA UART configuration).
+    * timeout      : float   : read timeout [s].
+    * journal_file : string  : UART frames journal file (see journal.py), None or "" to disable the journal.
+    Return the transport object, see serial_transport, tcp_transport and loopback_transport.
+    """
+    if port.startswith(TCP_URL_PREFIX):
+        host, tcp_port = port[len(TCP_URL_PREFIX):].rsplit(":", 1)
+        ser = tcp_transport(host, int(tcp_port), timeout)
+    elif port == LOOPBACK_URL:
+        ser = loopback_transport(timeout)
+    else:
+        ser = serial_transport(port, baudrate, timeout)
+    if journal_file:
+        from journal import journal
+        ser.journal = journal(journal_file)
+    return ser
+
+## CLASS:
+class transport:
+    """
+    UART frames transport base class.
+    The ev12aq600 class uses the pyserial subset: write, read, inWaiting, isOpen and close.
+    -       write buffers the data, the buffer is sent by flush, before each read and when it
+            reaches write_buffer_length. A batch of frames is sent with a single system call.
+    -       read(size) blocks until size bytes are received or the timeout is reached and
+            receives as much data as available with each system call.
+    -       journal records the written and read data when enabled (see journal.py).
+    """
+    def __init__(self, timeout=1, write_buffer_length=4096):
+        self.journal = None
+        self.timeout = timeout
+        self.write_buffer_length = write_buffer_length
+        self.write_buffer = bytearray()
+        self.read_buffer = bytearray()
+
+    def write(self, data):
+        if self.journal:
+            self.journal.record_tx(data)
+        self.write_buffer += data
+        if len(self.write_buffer) >= self.write_buffer_length:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if self.write_buffer:
+            self.send(bytes(self.write_buffer))
+            self.write_buffer = bytearray()
+
+    def read(self, size=1):
+        self.flush()
+        deadline = time.time() + self.timeout
+        while len(self.read_buffer) < size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            self.receive(remaining)
+        data = bytes(self.read_buffer[:size])
+        del self.read_buffer[:size]
+        if self.journal and data:
+            self.journal.record_rx(data)
+        return data
+
+    def inWaiting(self):
+        self.flush()
+        self.receive(0)
+        return len(self.read_buffer)
+
+    def send(self, data):
+        raise NotImplementedError
+
+    def receive(self, timeout):
+        """
+        Append the received data to read_buffer, wait up to timeout [s] for the first byte.
+        """
+        raise NotImplementedError
+
+    def isOpen(self):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def close_journal(self):
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
+class serial_transport(transport):
+    """
+    Local serial port (pyserial).
+    """
+    def __init__(self, port, baudrate=115200, timeout=1):
+        import serial
+        transport.__init__(self, timeout)
+        self.ser = serial.Serial(port, baudrate, timeout=timeout)
+
+    def send(self, data):
+        self.ser.write(data)
+
+    def read(self, size=1):
+        # pyserial read already blocks until size bytes are received or the timeout is reached
+        self.flush()
+        if len(self.read_buffer) < size:
+            self.read_buffer += self.ser.read(size - len(self.read_buffer))
+        data = bytes(self.read_buffer[:size])
+        del self.read_buffer[:size]
+        if self.journal and data:
+            self.journal.record_rx(data)
+        return data
+
+    def receive(self, timeout):
+        self.read_buffer += self.ser.read(self.ser.inWaiting())
+
+    def isOpen(self):
+        return self.ser.isOpen()
+
+    def close(self):
+        self.flush()
+        self.ser.close()
+        self.close_journal()
+
+class tcp_transport(transport):
+    """
+    Raw TCP socket to a serial-over-IP bridge (RFC 2217 negotiation not used, the bridge
+    serial port must be configured as the FPGA UART).
+    """
+    def __init__(self, host, port, timeout=1):
+        transport.__init__(self, timeout)
+        self.sock = socket.create_connection((host, port), timeout)
+        # frames are already gathered by the write buffer
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.recv_buffer = bytearray(RECV_CHUNK_LENGTH)
+        self.open = True
+
+    def send(self, data):
+        self.sock.sendall(data)
+
+    def receive(self, timeout):
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        if readable:
+            length = self.sock.recv_into(self.recv_buffer)
+            if length == 0:
+                logging.error("-- tcp_transport: connection closed by the serial bridge")
+                self.open = False
+            self.read_buffer += memoryview(self.recv_buffer)[:length]
+
+    def isOpen(self):
+        return self.open
+
+    def close(self):
+        self.flush()
+        self.sock.close()
+        self.open = False
+        self.close_journal()
+
+class loopback_transport(transport):
+    """
+    In-process stand-in of the FPGA design for testing without hardware:
+    UART frames layer protocol, register map, dual SPI master FIFOs, EV12AQ600 ADC registers
+    and external PLL LMX2592 registers.
+    """
+    def __init__(self, timeout=0):
+        transport.__init__(self, timeout)
+        self.open = True
+        self.rx = bytearray()
+        self.reg_array = [0] * LOOPBACK_REG_NUMBER
+        self.reg_array[5] = 0x00000001
+        self.reg_array[8] = LOOPBACK_HDL_VERSION
+        self.reg_rdata = 0
+        self.spi_fifo_in = []
+        self.spi_fifo_out = []
+        self.reg_aq600 = {0x0011: 0x0914} # Chip ID
+        self.reg_pll = {}
+        self.sync_eye_list = list(LOOPBACK_SYNC_EYE_LIST)
+        self.lane_ber_list = [0.0] * LOOPBACK_NB_LANES # Bit error rate of each lane.
+        self.lane_rate = LOOPBACK_LANE_RATE
+        self.lane_check_time = time.time()
+        self.sync_latency = LOOPBACK_SYNC_LATENCY
+        self.sync_failure_rate = 0.0 # Probability of a SYNC without valid link.
+        self.link_valid = True
+
+    def send(self, data):
+        self.rx += data
+        while self.rx:
+            if self.rx[0] & 0x80:
+                if len(self.rx) < 2:
+                    break
+                address = int.from_bytes(self.rx[:2], byteorder='big') & 0x7FFF
+                del self.rx[:2]
+                self.read_buffer += self.register_read(address).to_bytes(4, byteorder='big') + LOOPBACK_ACK
+            else:
+                if len(self.rx) < 6:
+                    break
+                address = int.from_bytes(self.rx[:2], byteorder='big')
+                data = int.from_bytes(self.rx[2:6], byteorder='big')
+                del self.rx[:6]
+                self.register_write(address, data)
+                self.read_buffer += LOOPBACK_ACK
+
+    def receive(self, timeout):
+        pass
+
+    def register_read(self, address):
+        if address in LOOPBACK_READ_LIST:
+            if address == 9:
+                self.reg_rdata = (len(self.spi_fifo_in) >= LOOPBACK_SPI_FIFO_DEPTH) | ((not self.spi_fifo_out) << 1)
+            elif address == 10:
+                # FIFO OUT data port, the read operation also pops the FIFO
+                if self.spi_fifo_out:
+                    self.reg_array[10] = self.spi_fifo_out.pop(0)
+                self.reg_rdata = self.reg_array[10]
+            elif address == 18:
+                self.reg_rdata = self.lane_status()
+            elif address == 255:
+                self.reg_rdata = LOOPBACK_STATUS
+            else:
+                self.reg_rdata = self.reg_array[address]
+        # else: register_map read data is not updated
+        return self.reg_rdata
+
+    def register_write(self, address, data):
+        if address not in LOOPBACK_WRITE_LIST:
+            return
+        spi_start_re = address == 3 and (data & 0x2) and not (self.reg_array[3] & 0x2)
+        send_sync_re = address == 6 and (data & 0x1) and not (self.reg_array[6] & 0x1)
+        self.reg_array[address] = data
+        if address == 2 and data & 0x2:
+            self.reg_array[18] = 0 # rst_check
+            self.lane_check_time = time.time()
+        if address == 2 and data & 0x1:
+            self.link_valid = False # rst
+        if address == 12:
+            self.reg_array[11] = (self.reg_array[11] & 0xFE00FFFF) | ((data & 0x1FF) << 16)
+        if send_sync_re:
+            # EV12AQ600 SYNC flag (0x000D): timing violation outside of the SYNC timing eye
+            first, last = self.sync_eye_list[self.reg_aq600.get(0x000C, 0) & 0x1]
+            if not first <= (self.reg_array[12] & 0x1FF) <= last:
+                self.reg_aq600[0x000D] = 0x1
+            self.link_valid = random.random() >= self.sync_failure_rate
+            # SYNC counter (sync_generator.vhd): training mode, SYNC to lanes ready; normal mode, wr_counter
+            counter = self.sync_latency if self.reg_array[5] & 0x1 else self.reg_array[7] & 0xFF
+            self.reg_array[11] = (self.reg_array[11] & ~0x1FF) | (counter & 0xFF)
+        if address == 4 and len(self.spi_fifo_in) < LOOPBACK_SPI_FIFO_DEPTH:
+            self.spi_fifo_in.append(data & 0x00FFFFFF)
+        if spi_start_re:
+            self.spi_start()
+
+    def lane_status(self):
+        """
+        Register 18 (txrx_frame_checking.vhd): sticky bit error status of each lane, Poisson distributed errors
+        at lane_ber_list rates since the last update, and valid status.
+        """
+        now = time.time()
+        bits = (now - self.lane_check_time) * self.lane_rate
+        self.lane_check_time = now
+        for lane, ber in enumerate(self.lane_ber_list):
+            if random.random() < -math.expm1(-ber * bits):
+                self.reg_array[18] |= 1 << lane
+        return self.reg_array[18] | (0x80000000 if self.link_valid else 0)
+
+    def spi_start(self):
+        """
+        Send the SPI Master input FIFO commands to the selected slave (spi_dual_master_fsm.vhd).
+        EV12AQ600: 16-bit address word (bit 15 high for write operation), then 16-bit data word.
+        LMX2592: 24-bit command, 8-bit address and 16-bit data.
+        """
+        fifo_in = self.spi_fifo_in
+        self.spi_fifo_in = []
+        if self.reg_array[3] & 0x1:
+            for command in fifo_in:
+                self.reg_pll[command >> 16] = command & 0xFFFF
+        else:
+            for idx in range(0, len(fifo_in)-1, 2):
+                address = fifo_in[idx] & 0xFFFF
+                data = fifo_in[idx+1] & 0xFFFF
+                if address == 0x800E:
+                    self.reg_aq600[0x000D] = 0x0 # SYNC flag reset
+                elif address & 0x8000:
+                    self.reg_aq600[address & 0x7FFF] = data
+                elif len(self.spi_fifo_out) < LOOPBACK_SPI_FIFO_DEPTH:
+                    self.spi_fifo_out.append(self.reg_aq600.get(address, 0))
+
+    def isOpen(self):
+        return self.open
+
+    def close(self):
+        self.open = False
+        self.close_journal()
@@ -38,15 +38,17 @@ entity txrx_frame_checking is
     NB_LANES : natural
     );
   port (
-    rst          : in  std_logic;                     -- Active high reset. 
-    clk          : in  std_logic;                     -- 
-    d_ctrl       : in  std_logic_vector(1 downto 0);  -- 
-    lanes_on     : in  std_logic_vector(NB_LANES-1 downto 0);
-    frame_out    : in  rx_frame_array(NB_LANES-1 downto 0);
-    valid_out    : in  std_logic_vector(NB_LANES-1 downto 0);
-    be_status    : out std_logic;                     -- Active high, bit error detected.
-    cb_status    : out std_logic;                     -- Active high, clock bit error detected.
-    valid_status : out std_logic
+    rst            : in  std_logic;                     -- Active high reset. 
+    clk            : in  std_logic;                     -- 
+    d_ctrl         : in  std_logic_vector(1 downto 0);  -- 
+    lanes_on       : in  std_logic_vector(NB_LANES-1 downto 0);
+    frame_out      : in  rx_frame_array(NB_LANES-1 downto 0);
+    valid_out      : in  std_logic_vector(NB_LANES-1 downto 0);
+    be_status      : out std_logic;                     -- Active high, bit error detected.
+    cb_status      : out std_logic;                     -- Active high, clock bit error detected.
+    be_lane_status : out std_logic_vector(NB_LANES-1 downto 0);  -- Active high, bit error detected, one bit per lane.
+    cb_lane_status : out std_logic_vector(NB_LANES-1 downto 0);  -- Active high, clock bit error detected, one bit per lane.
+    valid_status   : out std_logic
     );
 end entity txrx_frame_checking;
 
@@ -226,6 +228,25 @@ begin
     end if;
   end process;
 
+  p_lane_status : process(clk)
+  begin
+    if rising_edge(clk) then
+      for i in 0 to NB_LANES-1 loop
+        if rst = '1' or and1(valid_out_d1) = '0' then
+          be_lane_status(i) <= '0';
+          cb_lane_status(i) <= '0';
+        else
+          if data_check_all_lane(i) = '1' then
+            be_lane_status(i) <= '1';
+          end if;
+          if cb_check_all_lane(i) = '1' then
+            cb_lane_status(i) <= '1';
+          end if;
+        end if;
+      end loop;
+    end if;
+  end process;
+
   valid_status <= and1(valid_out_d6);
 
 end architecture rtl;
@@ -177,6 +177,11 @@ architecture rtl of rx_esistream_top is
   signal be_status                       : std_logic                             := '0';
   signal cb_status                       : std_logic                             := '0';
   signal valid_status                    : std_logic                             := '0';
+  signal be_lane_status                  : std_logic_vector(NB_LANES-1 downto 0) := (others => '0');
+  signal cb_lane_status                  : std_logic_vector(NB_LANES-1 downto 0) := (others => '0');
+  signal be_lane_status_rs               : std_logic_vector(NB_LANES-1 downto 0) := (others => '0');
+  signal cb_lane_status_rs               : std_logic_vector(NB_LANES-1 downto 0) := (others => '0');
+  signal valid_status_rs                 : std_logic                             := '0';
   --
   signal aq600_prbs_en                   : std_logic                             := '1';
   signal clk_acq                         : std_logic                             := '0';
@@ -465,15 +470,44 @@ begin
     generic map (
       NB_LANES => NB_LANES)
     port map (
-      rst          => rst_check_rs,
-      clk          => rx_clk,
-      d_ctrl       => tx_emu_d_ctrl,
-      lanes_on     => rx_lanes_on,
-      frame_out    => frame_out_d,
-      valid_out    => valid_out,
-      be_status    => be_status,
-      cb_status    => cb_status,
-      valid_status => valid_status);
+      rst            => rst_check_rs,
+      clk            => rx_clk,
+      d_ctrl         => tx_emu_d_ctrl,
+      lanes_on       => rx_lanes_on,
+      frame_out      => frame_out_d,
+      valid_out      => valid_out,
+      be_status      => be_status,
+      cb_status      => cb_status,
+      be_lane_status => be_lane_status,
+      cb_lane_status => cb_lane_status,
+      valid_status   => valid_status);
+
+  --------------------------------------------------------------------------------------------
+  -- Per lane data check status to sysclk (register 18):
+  --------------------------------------------------------------------------------------------
+  ff_synchronizer_array_be : entity work.ff_synchronizer_array
+    generic map (
+      REG_WIDTH => NB_LANES)
+    port map (
+      clk       => sysclk,
+      reg_async => be_lane_status,
+      reg_sync  => be_lane_status_rs);
+
+  ff_synchronizer_array_cb : entity work.ff_synchronizer_array
+    generic map (
+      REG_WIDTH => NB_LANES)
+    port map (
+      clk       => sysclk,
+      reg_async => cb_lane_status,
+      reg_sync  => cb_lane_status_rs);
+
+  ff_synchronizer_array_valid : entity work.ff_synchronizer_array
+    generic map (
+      REG_WIDTH => 1)
+    port map (
+      clk          => sysclk,
+      reg_async(0) => valid_status,
+      reg_sync(0)  => valid_status_rs);
 
   ---------------------------------
   -- Integrated Logic Analyzer:
@@ -706,6 +740,10 @@ begin
   fifo_in_wr_en        <= reg_4_os;
   fifo_out_rd_en       <= reg_10_os;
   sync_set_odelay      <= reg_12_os;
+  --
+  reg_18(NB_LANES-1 downto 0)      <= be_lane_status_rs;
+  reg_18(16+NB_LANES-1 downto 16)  <= cb_lane_status_rs;
+  reg_18(31)                       <= valid_status_rs;
   ------------------------------------------------------------------------------------
   -- ref clk source switch:
   ------------------------------------------------------------------------------------